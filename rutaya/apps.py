@@ -0,0 +1,10 @@
+# rutaya/apps.py
+from django.apps import AppConfig
+
+
+class RutayaConfig(AppConfig):
+    name = 'rutaya'
+
+    def ready(self):
+        # Registrar las señales de invalidación
+        from rutaya import signals  # noqa: F401
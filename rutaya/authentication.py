@@ -0,0 +1,196 @@
+# rutaya/authentication.py
+"""
+Autenticación JWT sin consultas en el camino habitual.
+
+- Los tokens llevan email y username como claims (ClaimsRefreshToken), así
+  las peticiones de lectura pueden usar un TokenUser sin leer `users`. Para
+  que un usuario desactivado o borrado no siga leyendo hasta que venza su
+  access token, su id se busca en un set en memoria de usuarios revocados
+  que se recarga al cambiar la versión 'revoked_users'.
+- Los User cargados se guardan en un LRU en memoria con TTL
+  (AUTH_USER_CACHE_SIZE / AUTH_USER_CACHE_TTL) que rutaya.signals vacía
+  al guardar o borrar el usuario. Con varios procesos, el TTL acota cuánto
+  tarda en verse un cambio hecho en otro proceso.
+- La lista negra de refresh tokens se consulta en un set en memoria que se
+  recarga al cambiar la versión 'token_blacklist' (rutaya.utils.versions).
+- prune_expired_tokens() borra los OutstandingToken/BlacklistedToken
+  vencidos; se ejecuta como mucho cada AUTH_TOKEN_PRUNE_INTERVAL segundos
+  desde logout, o con el comando flushexpiredtokens de simplejwt.
+"""
+import copy
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from rutaya.models import User
+from rutaya.utils.versions import bump_version, get_version
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Claims del usuario copiados al token (y del refresh al access)
+USER_CLAIMS = ('email', 'username')
+
+PRUNE_LOCK_KEY = 'rutaya:tokens:pruned'
+DELETED_USERS_KEY = 'rutaya:users:deleted'
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token con los datos públicos del usuario y lista negra cacheada."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("El token está en la lista negra")
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que resuelve el usuario desde el LRU; si no está, las
+    lecturas usan los claims del token y las escrituras leen la base (y
+    llenan el LRU).
+    """
+
+    def authenticate(self, request):
+        self.read_only = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = _cached_user(user_id)
+        if user is None:
+            if getattr(self, 'read_only', False) and all(claim in validated_token for claim in USER_CLAIMS):
+                if user_id in revoked_user_ids():
+                    raise AuthenticationFailed("Usuario inactivo", code="user_inactive")
+                return TokenUser(validated_token)
+            user = super().get_user(validated_token)
+            _store_user(user)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("Usuario inactivo", code="user_inactive")
+
+        # Copia: el objeto cacheado se comparte entre peticiones
+        return copy.copy(user)
+
+
+# --- LRU de usuarios
+
+_users = None
+_users_lock = threading.Lock()
+
+
+def _user_cache():
+    global _users
+    if _users is None:
+        _users = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+    return _users
+
+
+def _cached_user(user_id):
+    with _users_lock:
+        return _user_cache().get(user_id)
+
+
+def _store_user(user):
+    with _users_lock:
+        _user_cache()[user.pk] = user
+
+
+def evict_user(user_id):
+    with _users_lock:
+        _user_cache().pop(user_id, None)
+
+
+# --- Usuarios revocados
+
+_revoked = (None, frozenset())
+_revoked_lock = threading.Lock()
+
+
+def revoked_user_ids():
+    """
+    Ids de los usuarios inactivos y de los borrados en la última vida de un
+    access token: los que no pueden usar el TokenUser de sus claims.
+    """
+    global _revoked
+    version = get_version('revoked_users')
+    loaded_version, ids = _revoked
+    if loaded_version != version:
+        with _revoked_lock:
+            loaded_version, ids = _revoked
+            if loaded_version != version:
+                ids = frozenset(User.objects.filter(is_active=False).values_list('pk', flat=True))
+                ids |= frozenset(cache.get(DELETED_USERS_KEY) or ())
+                _revoked = (version, ids)
+    return ids
+
+
+def revoke_deleted_user(user_id):
+    """
+    Recuerda un usuario borrado (al confirmar la transacción) mientras
+    puedan quedar access tokens suyos vigentes.
+    """
+    def remember():
+        lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        now = timezone.now().timestamp()
+        deleted = {
+            pk: deleted_at for pk, deleted_at in (cache.get(DELETED_USERS_KEY) or {}).items()
+            if now - deleted_at < lifetime
+        }
+        deleted[user_id] = now
+        cache.set(DELETED_USERS_KEY, deleted, timeout=lifetime)
+
+    transaction.on_commit(remember)
+    bump_version('revoked_users')
+
+
+# --- Lista negra
+
+_blacklist = (None, frozenset())
+_blacklist_lock = threading.Lock()
+
+
+def is_blacklisted(jti):
+    global _blacklist
+    version = get_version('token_blacklist')
+    loaded_version, jtis = _blacklist
+    if loaded_version != version:
+        with _blacklist_lock:
+            loaded_version, jtis = _blacklist
+            if loaded_version != version:
+                # Los vencidos no hace falta tenerlos: su exp ya los invalida
+                jtis = frozenset(
+                    BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+                    .values_list('token__jti', flat=True)
+                )
+                _blacklist = (version, jtis)
+    return jti in jtis
+
+
+def prune_expired_tokens():
+    """Borra los tokens vencidos (la lista negra cae en cascada)."""
+    deleted, _ = OutstandingToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def maybe_prune_expired_tokens():
+    # cache.add solo gana en un proceso por intervalo
+    if cache.add(PRUNE_LOCK_KEY, 1, timeout=settings.AUTH_TOKEN_PRUNE_INTERVAL):
+        prune_expired_tokens()
@@ -0,0 +1,94 @@
+# rutaya/gunicorn_conf.py
+"""
+Configuración de gunicorn para un grupo de SERVER_POOLS:
+
+    RUTAYA_SERVER_POOL=chat gunicorn -c python:rutaya.gunicorn_conf
+
+(`manage.py serve` lanza un master por grupo). Con SERVER_PRELOAD el master
+carga la app y la precalienta antes de crear los workers, que la heredan
+ya armada; cada worker termina de prepararse (rutaya.utils.warmup) antes de
+aceptar conexiones. Los workers se reciclan tras max_requests peticiones
+(con jitter). Con kill -HUP al master gunicorn vuelve a ejecutar este
+módulo: el tamaño se recalcula con la espera observada hasta ese momento y
+los workers se reemplazan sin cortar las peticiones en curso
+(graceful_timeout).
+
+Todos los procesos tienen que compartir el cache de Django (versiones,
+lista negra, cuotas): si RUTAYA_CACHE_URL no está definida se usa un
+FileBasedCache en .cache/ del proyecto.
+"""
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from rutaya.utils import server_profile
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rutaya.settings')
+# Antes de cargar los settings, que arman CACHES con ella
+os.environ.setdefault('RUTAYA_CACHE_URL', f"file://{Path(__file__).resolve().parent.parent / '.cache'}")
+profile = server_profile.tune(os.environ.get('RUTAYA_SERVER_POOL', 'crud'))
+
+wsgi_app = 'rutaya.wsgi:application'
+proc_name = f"rutaya-{profile['pool']}"
+bind = profile['bind']
+worker_class = profile['worker_class']
+workers = profile['workers']
+threads = profile['threads']
+timeout = profile['timeout']
+graceful_timeout = profile['graceful_timeout']
+max_requests = profile['max_requests']
+max_requests_jitter = profile['max_requests_jitter']
+keepalive = 5
+preload_app = settings.SERVER_PRELOAD
+
+
+def _describe(profile):
+    source = 'observada' if profile['observed'] else 'supuesta'
+    return (
+        f"grupo {profile['pool']} en {profile['bind']}: {profile['workers']} workers "
+        f"{profile['worker_class']} x {profile['threads']} hilos ({profile['cpus']} CPUs, "
+        f"espera/CPU {profile['io_wait']} {source})"
+    )
+
+
+def on_starting(server):
+    server.log.info("Iniciando %s", _describe(profile))
+    if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        server.log.warning(
+            "Cache de Django por proceso (RUTAYA_CACHE_URL vacía): las invalidaciones no llegan a los demás workers"
+        )
+
+
+def on_reload(server):
+    # gunicorn ya volvió a leer este módulo: el perfil es el recalculado
+    server.log.info("Recargando %s", _describe(server_profile.tune(profile['pool'])))
+
+
+def when_ready(server):
+    if preload_app:
+        # La app ya está cargada en el master; los workers aún no existen
+        from rutaya.utils.warmup import prepare_fork
+
+        start = time.perf_counter()
+        report = prepare_fork()
+        server.log.info(
+            "App precalentada en el master en %.0f ms (%s)",
+            (time.perf_counter() - start) * 1000, ', '.join(report['timings']) or 'nada',
+        )
+
+
+def post_worker_init(worker):
+    from rutaya.utils.warmup import warm_up
+
+    start = time.perf_counter()
+    report = warm_up()
+    if report['ready']:
+        worker.log.info("Worker %s listo en %.0f ms", worker.pid, (time.perf_counter() - start) * 1000)
+    else:
+        worker.log.error("Worker %s sin preparar: %s", worker.pid, report['errors'])
+
+
+def worker_exit(server, worker):
+    server_profile.save_observations()
@@ -0,0 +1,120 @@
+# rutaya/management/commands/benchmark_matching.py
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from rutaya.utils.matching import MatchIndex
+
+# (min_days, min_shared) de las consultas medidas
+QUERY_PROFILES = [(1, 1), (3, 2), (5, 0), (0, 3)]
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el motor de emparejamiento de viajeros con datos sintéticos en memoria "
+        "(por defecto 100k usuarios), sin tocar la base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--destinations', type=int, default=10000)
+        parser.add_argument('--favorites-per-user', type=int, default=50)
+        parser.add_argument('--queries', type=int, default=200, help='Consultas por perfil')
+        parser.add_argument('--naive-queries', type=int, default=10,
+                            help='Consultas con la comparación usuario contra usuario, como referencia (0 = omitir)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        today = date.today()
+        availability, favorites = self._generate(rng, today, options)
+        self.stdout.write(
+            f"Datos: {options['users']} usuarios, {len(availability)} rangos, {len(favorites)} favoritos"
+        )
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        index = MatchIndex.build(availability, favorites, today=today)
+        build_seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write(f"Construcción del índice: {build_seconds:.2f}s, pico {peak / 2 ** 20:.1f} MiB")
+
+        ranges_by_user, favorites_by_user = {}, {}
+        for user_id, start, end in availability:
+            ranges_by_user.setdefault(user_id, []).append((start, end))
+        for user_id, destination_id in favorites:
+            favorites_by_user.setdefault(user_id, set()).add(destination_id)
+
+        header = f"{'min_days':>9}{'min_shared':>12}{'p50_ms':>10}{'p95_ms':>10}{'resultados':>12}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for min_days, min_shared in QUERY_PROFILES:
+            latencies, found = [], []
+            for _ in range(options['queries']):
+                user_id = rng.randrange(options['users'])
+                start = time.perf_counter()
+                matches = index.find(
+                    user_id, ranges_by_user.get(user_id, []), favorites_by_user.get(user_id, ()),
+                    min_days=min_days, min_shared=min_shared,
+                )
+                latencies.append(time.perf_counter() - start)
+                found.append(len(matches))
+            self.stdout.write(
+                f"{min_days:>9}{min_shared:>12}{_percentile(latencies, 50) * 1000:>10.2f}"
+                f"{_percentile(latencies, 95) * 1000:>10.2f}{statistics.mean(found):>12.1f}"
+            )
+
+        if options['naive_queries']:
+            self._naive(rng, index, ranges_by_user, favorites_by_user, options)
+
+    def _generate(self, rng, today, options):
+        destination_ids = list(range(1, options['destinations'] + 1))
+        # Popularidad sesgada: la mitad de los favoritos cae en el 10% de destinos
+        hot = destination_ids[:max(1, len(destination_ids) // 10)]
+        availability, favorites = [], []
+        for user_id in range(options['users']):
+            for _ in range(rng.randint(1, 2)):
+                start = today + timedelta(days=rng.randint(0, 300))
+                availability.append((user_id, start, start + timedelta(days=rng.randint(0, 20))))
+            per_user = rng.randint(1, options['favorites_per_user'])
+            chosen = set(rng.sample(hot, min(len(hot), per_user // 2)))
+            while len(chosen) < per_user:
+                chosen.add(rng.choice(destination_ids))
+            favorites.extend((user_id, destination_id) for destination_id in chosen)
+        return availability, favorites
+
+    def _naive(self, rng, index, ranges_by_user, favorites_by_user, options):
+        """Referencia: comparar contra cada usuario con sets de Python."""
+        days_by_user = {
+            user_id: {
+                day for start, end in ranges
+                for day in range((start - index.today).days, (end - index.today).days + 1)
+            }
+            for user_id, ranges in ranges_by_user.items()
+        }
+        latencies = []
+        for _ in range(options['naive_queries']):
+            user_id = rng.randrange(options['users'])
+            my_days = days_by_user.get(user_id, set())
+            my_favorites = favorites_by_user.get(user_id, set())
+            start = time.perf_counter()
+            [
+                other for other, days in days_by_user.items()
+                if other != user_id and len(my_days & days) >= 1
+                and len(my_favorites & favorites_by_user.get(other, set())) >= 1
+            ]
+            latencies.append(time.perf_counter() - start)
+        self.stdout.write(
+            f"Referencia usuario contra usuario (min_days=1, min_shared=1): "
+            f"p50 {_percentile(latencies, 50) * 1000:.2f}ms"
+        )
@@ -0,0 +1,141 @@
+# rutaya/management/commands/check_query_plans.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from rutaya.models import (
+    Destination, DestinationRate, Favorite, ItineraryItem, TourPackage,
+    TourPackageRate, TravelAvailability, User,
+)
+
+
+def hot_queries():
+    """
+    Consultas calientes de rutaya/views/ junto con las columnas del índice
+    que deben usar. Cada entrada: (nombre, queryset, tabla, [columnas aceptadas]).
+    """
+    return [
+        (
+            'favoritos del usuario',
+            Favorite.objects.filter(user_id=1).values_list('destination_id', flat=True),
+            'favorites', [('user_id', 'destination_id')],
+        ),
+        (
+            'popularidad por destino',
+            Favorite.objects.filter(destination_id=1).values('user_id'),
+            'favorites', [('destination_id', 'user_id')],
+        ),
+        (
+            'disponibilidad del usuario',
+            TravelAvailability.objects.filter(user_id=1).order_by('start_date'),
+            'travel_availabilities', [('user_id', 'start_date')],
+        ),
+        (
+            'paquetes del usuario',
+            TourPackage.objects.filter(user_id=1),
+            'tour_packages', [('user_id', 'start_date')],
+        ),
+        (
+            'paquetes pagados del usuario',
+            TourPackage.objects.filter(user_id=1, is_paid=True).order_by().values('id'),
+            'tour_packages', [('user_id', 'is_paid')],
+        ),
+        (
+            'itinerario de paquetes (prefetch)',
+            ItineraryItem.objects.filter(tour_package_id__in=[1, 2, 3]),
+            'itinerary_items', [('tour_package_id', 'order', 'id')],
+        ),
+        (
+            'destinos por categoría (prefetch)',
+            Destination.objects.filter(category_id__in=[1, 2, 3]).order_by('id'),
+            'destinations', [('category_id', 'id')],
+        ),
+        (
+            'calificaciones por destino',
+            DestinationRate.objects.filter(destination_id=1),
+            'destination_rates', [('destination_id', 'id'), ('destination_id', 'user_id')],
+        ),
+        (
+            'calificaciones de destinos por usuario',
+            DestinationRate.objects.filter(user_id=1),
+            'destination_rates', [('user_id', 'id')],
+        ),
+        (
+            'calificaciones por paquete',
+            TourPackageRate.objects.filter(tour_package_id=1),
+            'tour_package_rates', [('tour_package_id', 'id'), ('tour_package_id', 'user_id')],
+        ),
+        (
+            'calificaciones de paquetes por usuario',
+            TourPackageRate.objects.filter(user_id=1),
+            'tour_package_rates', [('user_id', 'id')],
+        ),
+        (
+            'login por email',
+            User.objects.filter(email='usuario@example.com'),
+            'users', [('email',)],
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre las consultas calientes y verifica que cada una "
+        "use el índice esperado (SQLite y PostgreSQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Mostrar el plan completo de cada consulta'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"Motor no soportado: {connection.vendor}")
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Con tablas pequeñas el planner prefiere seq scan; lo desactivamos
+                # para verificar que existe un índice utilizable.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset, table, accepted in hot_queries():
+                expected = self._index_names(table, accepted)
+                plan = queryset.explain()
+
+                if options['verbose_plans']:
+                    self.stdout.write(f"--- {name}\n{plan}")
+
+                used = [index for index in expected if index in plan]
+                if used:
+                    self.stdout.write(self.style.SUCCESS(f"✅ {name}: {used[0]}"))
+                else:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(
+                        f"❌ {name}: no usa ninguno de {expected or accepted}\n{plan}"
+                    ))
+
+        if failures:
+            raise CommandError(f"{len(failures)} consultas sin el índice esperado: {', '.join(failures)}")
+
+    def _index_names(self, table, accepted):
+        """Resolver los nombres reales de los índices a partir de sus columnas."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                # La introspección de Django no expone el nombre de los
+                # sqlite_autoindex_* creados por unique=True
+                cursor.execute(f'PRAGMA index_list({connection.ops.quote_name(table)})')
+                indexes = {}
+                for row in cursor.fetchall():
+                    cursor.execute(f'PRAGMA index_info({connection.ops.quote_name(row[1])})')
+                    indexes[row[1]] = [info[2] for info in sorted(cursor.fetchall())]
+            else:
+                constraints = connection.introspection.get_constraints(cursor, table)
+                indexes = {
+                    name: info['columns'] for name, info in constraints.items()
+                    if info['index'] or info['unique']
+                }
+
+        return [name for name, columns in indexes.items() if tuple(columns) in accepted]
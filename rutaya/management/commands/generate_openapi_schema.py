@@ -0,0 +1,40 @@
+# rutaya/management/commands/generate_openapi_schema.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from rutaya.utils.api_docs import DOCUMENTS, fingerprint, read_manifest, write_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera el esquema OpenAPI (JSON y YAML) y las páginas de Swagger UI y ReDoc en "
+        "OPENAPI_SCHEMA_DIR, para servirlos sin introspección por petición. Correr en el build."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None, help='Directorio (por defecto OPENAPI_SCHEMA_DIR)')
+        parser.add_argument('--check', action='store_true',
+                            help='No generar: fallar si lo guardado no corresponde al código actual')
+
+    def handle(self, *args, **options):
+        directory = options['output'] or settings.OPENAPI_SCHEMA_DIR
+
+        if options['check']:
+            manifest = read_manifest(directory)
+            if not manifest or manifest.get('fingerprint') != fingerprint():
+                raise CommandError(
+                    f"La documentación en {directory} está desactualizada; correr generate_openapi_schema"
+                )
+            self.stdout.write(self.style.SUCCESS("La documentación guardada está al día"))
+            return
+
+        start = time.perf_counter()
+        manifest = write_documents(directory)
+        elapsed = time.perf_counter() - start
+        files = ', '.join(filename for filename, _ in DOCUMENTS.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Documentación generada en {directory} ({files}) en {elapsed:.2f}s, "
+            f"huella {manifest['fingerprint'][:12]}"
+        ))
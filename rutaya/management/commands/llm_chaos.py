@@ -0,0 +1,125 @@
+# rutaya/management/commands/llm_chaos.py
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from rutaya.utils.llm_client import CircuitBreaker, LLMError, ResilientClient, LLMUnavailable
+
+
+class FlakyBackendError(Exception):
+    """Error transitorio inyectado (como un 503 del proveedor)."""
+
+
+class FaultyModel:
+    """
+    Backend falso: latencia lognormal alrededor de `latency`, una fracción de
+    llamadas lentas (`slow_rate`, `slow_factor` veces más lentas) y otra que
+    falla (`error_rate`). Con `outage` segundos, falla todo desde el inicio
+    durante ese tiempo, para ver abrirse y cerrarse el circuito.
+    """
+
+    def __init__(self, rng, latency, slow_rate, slow_factor, error_rate, outage):
+        self.rng = rng
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.error_rate = error_rate
+        self.outage_until = time.monotonic() + outage
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, timeout=None):
+        with self._lock:
+            self.calls += 1
+            delay = self.rng.lognormvariate(0, 0.3) * self.latency
+            if self.rng.random() < self.slow_rate:
+                delay *= self.slow_factor
+            failing = time.monotonic() < self.outage_until or self.rng.random() < self.error_rate
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("timeout del backend falso")
+        time.sleep(delay)
+        if failing:
+            raise FlakyBackendError("falla inyectada")
+        return f"respuesta a {prompt}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejercita el cliente resiliente de LLM (plazos, reintentos, hedging, circuit breaker) "
+        "contra un backend falso en memoria que inyecta demoras y fallas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--latency', type=float, default=0.05, help='Latencia típica del backend (s)')
+        parser.add_argument('--slow-rate', type=float, default=0.05)
+        parser.add_argument('--slow-factor', type=float, default=20.0)
+        parser.add_argument('--error-rate', type=float, default=0.1)
+        parser.add_argument('--outage', type=float, default=0.0, help='Segundos iniciales con el backend caído')
+        parser.add_argument('--timeout', type=float, default=1.0)
+        parser.add_argument('--retries', type=int, default=2)
+        parser.add_argument('--hedge-percentile', type=float, default=None)
+        parser.add_argument('--breaker-failures', type=int, default=5)
+        parser.add_argument('--breaker-reset', type=float, default=1.0)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        model = FaultyModel(
+            random.Random(options['seed']), options['latency'], options['slow_rate'],
+            options['slow_factor'], options['error_rate'], options['outage'],
+        )
+        client = ResilientClient(
+            'chaos', model,
+            timeout=options['timeout'],
+            retries=options['retries'],
+            backoff=(options['latency'], options['latency'] * 8),
+            hedge_percentile=options['hedge_percentile'],
+            hedge_min_samples=10,
+            breaker=CircuitBreaker('chaos', options['breaker_failures'], options['breaker_reset']),
+            retryable=(FlakyBackendError, TimeoutError),
+        )
+
+        outcomes = {'ok': 0, 'error': 0, 'unavailable': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def run(index):
+            start = time.perf_counter()
+            try:
+                client(f"mensaje {index}")
+                outcome = 'ok'
+            except LLMUnavailable:
+                outcome = 'unavailable'
+            except (LLMError, FlakyBackendError, TimeoutError):
+                outcome = 'error'
+            with lock:
+                outcomes[outcome] += 1
+                if outcome == 'ok':
+                    latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(run, range(options['calls'])))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Llamadas: {options['calls']} en {elapsed:.2f}s, intentos al backend: {model.calls}"
+        )
+        self.stdout.write(
+            f"Resultados: {outcomes['ok']} ok, {outcomes['error']} con error, "
+            f"{outcomes['unavailable']} rechazadas por el circuito"
+        )
+        if latencies:
+            ordered = sorted(latencies)
+            self.stdout.write(
+                f"Latencia ok: p50 {statistics.median(ordered) * 1000:.1f}ms, "
+                f"p95 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000:.1f}ms, "
+                f"máx {ordered[-1] * 1000:.1f}ms"
+            )
+        self.stdout.write(f"Estado final del circuito: {client.breaker.state}")
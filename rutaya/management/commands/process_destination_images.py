@@ -0,0 +1,67 @@
+# rutaya/management/commands/process_destination_images.py
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rutaya.models import Destination
+from rutaya.utils.images import ImageProcessingError, fetch_image, save_destination_image
+
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff')
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las variantes (WebP/JPEG), el blurhash y las dimensiones de las imágenes de destinos. "
+        "Con --source-dir lee los originales de un directorio (archivos <id_destino>.<ext>); "
+        "si no, los descarga de image_url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source-dir', help='Directorio con los originales nombrados por id de destino')
+        parser.add_argument('--ids', type=int, nargs='*', help='Procesar solo estos destinos')
+        parser.add_argument('--force', action='store_true', help='Reprocesar aunque el original no haya cambiado')
+
+    def handle(self, *args, **options):
+        destinations = Destination.objects.order_by('id').only('id', 'image_url')
+        if options['ids']:
+            destinations = destinations.filter(id__in=options['ids'])
+
+        sources = None
+        if options['source_dir']:
+            directory = Path(options['source_dir'])
+            if not directory.is_dir():
+                raise CommandError(f"No existe el directorio {directory}")
+            sources = {
+                path.stem: path for path in sorted(directory.iterdir())
+                if path.suffix.lower() in SOURCE_EXTENSIONS
+            }
+            destinations = destinations.filter(id__in=[int(stem) for stem in sources if stem.isdigit()])
+
+        processed = skipped = failed = 0
+        for destination in destinations.iterator():
+            try:
+                if sources is not None:
+                    path = sources[str(destination.id)]
+                    data, source = path.read_bytes(), str(path)
+                elif destination.image_url:
+                    data, source = fetch_image(destination.image_url), destination.image_url
+                else:
+                    skipped += 1
+                    continue
+                image, changed = save_destination_image(destination, data, source, force=options['force'])
+            except (ImageProcessingError, OSError) as e:
+                failed += 1
+                self.stderr.write(f"❌ Destino {destination.id}: {e}")
+                continue
+
+            if changed:
+                processed += 1
+                self.stdout.write(
+                    f"  Destino {destination.id}: {image.width}x{image.height}, {len(image.variants)} variantes"
+                )
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imágenes procesadas: {processed}, sin cambios/sin origen: {skipped}, con error: {failed}"
+        ))
@@ -0,0 +1,144 @@
+# rutaya/management/commands/profile_cold_start.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Corre en un intérprete nuevo: carga la app WSGI como lo hace Vercel,
+# opcionalmente la precalienta como un worker de gunicorn, y atiende dos
+# peticiones a la misma ruta (la primera paga lo que quedó perezoso, la
+# segunda es el estado estable)
+PROBE = r'''
+import io, json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+from rutaya.wsgi import application
+loaded = time.perf_counter()
+if {warm_up!r}:
+    from rutaya.utils.warmup import warm_up
+    warm_up()
+warmed = time.perf_counter()
+
+def request(path):
+    environ = {{
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0), 'wsgi.multithread': False,
+        'wsgi.multiprocess': True, 'wsgi.run_once': False,
+    }}
+    status = []
+    body = b''.join(application(environ, lambda s, h, e=None: status.append(s)))
+    return status[0].split()[0], len(body)
+
+begin = time.perf_counter()
+first_status, _ = request({path!r})
+first = time.perf_counter()
+request({path!r})
+second = time.perf_counter()
+print(json.dumps({{
+    'load': loaded - start, 'warmup': warmed - loaded, 'first': first - begin, 'second': second - first,
+    'status': first_status, 'modules': len(sys.modules),
+}}))
+'''
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold start: lanza intérpretes nuevos que cargan rutaya.wsgi y atienden una ruta, y reporta "
+        "carga, primera y segunda petición (p50/p95). Con --imports agrega el reporte de "
+        "`python -X importtime` por módulo y por paquete."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/community/list/', help='Ruta a pedir en cada arranque')
+        parser.add_argument('--runs', type=int, default=10)
+        parser.add_argument('--imports', type=int, default=0, metavar='N',
+                            help='Mostrar los N imports más caros (-X importtime)')
+        parser.add_argument('--warm-up', action='store_true',
+                            help='Correr los warmers (rutaya.utils.warmup) antes de la primera petición')
+        parser.add_argument('--json', action='store_true', help='Salida en JSON')
+
+    def _probe(self, path, importtime=False, warm_up=False):
+        code = PROBE.format(
+            settings_module=os.environ.get('DJANGO_SETTINGS_MODULE', 'rutaya.settings'), path=path, warm_up=warm_up
+        )
+        command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+        started = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True, cwd=settings.BASE_DIR)
+        wall = time.perf_counter() - started
+        lines = result.stdout.strip().splitlines()
+        if result.returncode != 0 or not lines:
+            raise CommandError(f"El proceso de prueba falló:\n{result.stderr[-2000:]}")
+        sample = json.loads(lines[-1])
+        sample['wall'] = wall
+        return sample, result.stderr
+
+    def handle(self, *args, **options):
+        samples = [self._probe(options['path'], warm_up=options['warm_up'])[0] for _ in range(options['runs'])]
+        report = {
+            metric: {
+                'p50': statistics.median(s[metric] for s in samples),
+                'p95': _percentile([s[metric] for s in samples], 95),
+            }
+            for metric in ('wall', 'load', 'warmup', 'first', 'second')
+        }
+        report['status'] = samples[-1]['status']
+        report['modules'] = samples[-1]['modules']
+
+        if options['imports']:
+            _, stderr = self._probe(options['path'], importtime=True, warm_up=options['warm_up'])
+            report['imports'] = self._import_report(stderr, options['imports'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"Ruta {options['path']} ({report['status']}), {options['runs']} arranques, "
+            f"{report['modules']} módulos cargados"
+        )
+        self.stdout.write(f"{'etapa':<28}{'p50 ms':>10}{'p95 ms':>10}")
+        labels = {
+            'wall': 'proceso completo', 'load': 'carga de rutaya.wsgi', 'warmup': 'precalentamiento',
+            'first': 'primera petición', 'second': 'segunda petición',
+        }
+        for metric, label in labels.items():
+            self.stdout.write(
+                f"{label:<28}{report[metric]['p50'] * 1000:>10.1f}{report[metric]['p95'] * 1000:>10.1f}"
+            )
+
+        if options['imports']:
+            self.stdout.write("\nImports más caros (acumulado, incluye dependencias):")
+            for name, cumulative in report['imports']['modules']:
+                self.stdout.write(f"  {cumulative / 1000:>8.1f} ms  {name}")
+            self.stdout.write("\nTiempo propio por paquete:")
+            for name, own in report['imports']['packages']:
+                self.stdout.write(f"  {own / 1000:>8.1f} ms  {name}")
+
+    @staticmethod
+    def _import_report(stderr, limit):
+        """Líneas 'import time: propio | acumulado | módulo' (en µs)."""
+        modules = []
+        packages = defaultdict(int)
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+            modules.append((name, int(cumulative)))
+            packages[name.split('.')[0]] += int(own)
+        return {
+            'modules': sorted(modules, key=lambda item: -item[1])[:limit],
+            'packages': sorted(packages.items(), key=lambda item: -item[1])[:limit],
+        }
@@ -0,0 +1,339 @@
+# rutaya/management/commands/run_benchmarks.py
+import json
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from rutaya.management.commands.seed_benchmark_data import BENCH_EMAIL_DOMAIN
+from rutaya.models import Destination, DestinationRate, Favorite, TourPackage, TourPackageRate, User
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class BenchContext:
+    """Ids de muestra y estado compartido entre escenarios (lo creado por uno lo usa otro)."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.user_ids = list(
+            User.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').values_list('id', flat=True)[:2000]
+        ) or list(User.objects.values_list('id', flat=True)[:2000])
+        self.destination_ids = list(Destination.objects.values_list('id', flat=True)[:5000])
+        self.package_ids = list(TourPackage.objects.values_list('id', flat=True)[:5000])
+        if not (self.user_ids and self.destination_ids):
+            raise CommandError("No hay datos; ejecuta primero `manage.py seed_benchmark_data`")
+
+        self.bench_user = User.objects.filter(id__in=self.user_ids).first()
+        self.auth_header = f'Bearer {RefreshToken.for_user(self.bench_user).access_token}'
+        self.added_favorites = []
+        self.destination_rates = []
+        self.package_rates = []
+        self.created_packages = []
+
+    def user(self):
+        return self.rng.choice(self.user_ids)
+
+    def destination(self):
+        return self.rng.choice(self.destination_ids)
+
+    def package(self):
+        return self.rng.choice(self.created_packages or self.package_ids)
+
+    def logout_payload(self):
+        # Cada logout necesita un refresh token nuevo (el anterior queda en blacklist)
+        refresh = RefreshToken.for_user(self.bench_user)
+        self.auth_header = f'Bearer {refresh.access_token}'
+        return {'refresh': str(refresh)}
+
+
+def _free_favorite(ctx):
+    existing = set(Favorite.objects.filter(user_id=ctx.bench_user.id).values_list('destination_id', flat=True))
+    for _ in range(100):
+        destination_id = ctx.destination()
+        if destination_id not in existing:
+            ctx.added_favorites.append(destination_id)
+            return {'userId': ctx.bench_user.id, 'destinationId': destination_id}
+    return {'userId': ctx.bench_user.id, 'destinationId': ctx.destination()}
+
+
+def _package_payload(ctx):
+    return {
+        'user_id': ctx.user(),
+        'title': 'Aventura en Cusco',
+        'description': 'Recorrido por Cusco y el Valle Sagrado',
+        'start_date': '2025-07-17T08:00',
+        'days': 3,
+        'quantity': 2,
+        'price': '1500.00',
+        'itinerary': [
+            {'datetime': f'2025-07-{17 + day}T08:00', 'description': f'Actividad del día {day + 1}'}
+            for day in range(3)
+        ],
+    }
+
+
+def _pop(items, fallback):
+    return items.pop() if items else fallback
+
+
+# (nombre, método, ruta(ctx), payload(ctx) o None, estados aceptados, máximo de consultas o None)
+# El orden importa: los escenarios que eliminan consumen lo creado por los anteriores.
+SCENARIOS = [
+    ('auth.register', 'post', lambda ctx: '/api/v1/auth/register/',
+     lambda ctx: {'email': f'reg-{uuid.uuid4().hex[:12]}@{BENCH_EMAIL_DOMAIN}', 'password': 'Bench12345!'},
+     (201,), None),
+    ('auth.login', 'post', lambda ctx: '/api/v1/auth/login/',
+     lambda ctx: {'email': ctx.bench_user.email, 'password': 'Bench12345!'}, (200,), None),
+    ('user.update', 'put', lambda ctx: f'/api/v1/user/update/{ctx.bench_user.id}',
+     lambda ctx: {'first_name': 'Bench'}, (200,), None),
+    ('categories', 'get', lambda ctx: f'/api/v1/categories/{ctx.user()}/', None, (200,), None),
+    ('home', 'get', lambda ctx: f'/api/v1/home/{ctx.user()}/', None, (200,), None),
+    ('home.fields', 'get', lambda ctx: f'/api/v1/home/{ctx.user()}/?fields=name,image_url,isFavorite',
+     None, (200,), None),
+    # Escrituras: una consulta de verificación + una sentencia (el BEGIN del delete también cuenta)
+    ('favorites.add', 'post', lambda ctx: '/api/v1/favorites/add/', _free_favorite, (201,), 2),
+    ('favorites.remove', 'delete', lambda ctx: '/api/v1/favorites/remove/',
+     lambda ctx: {'userId': ctx.bench_user.id, 'destinationId': _pop(ctx.added_favorites, ctx.destination())},
+     (200, 404), 3),
+    ('batch.favorites', 'post', lambda ctx: '/api/v1/batch/',
+     lambda ctx: {'userId': ctx.bench_user.id, 'operations': [
+         {'op': op, 'destinationId': destination_id}
+         for destination_id in ctx.rng.sample(ctx.destination_ids, min(5, len(ctx.destination_ids)))
+         for op in ('favorite.add', 'favorite.remove')
+     ]}, (200,), None),
+    ('community.list', 'get', lambda ctx: '/api/v1/community/list/', None, (200,), 3),
+    ('community.list.preview', 'get', lambda ctx: '/api/v1/community/list/?preview=1', None, (200,), 3),
+    ('rate-destinations.add', 'post', lambda ctx: '/api/v1/rate-destinations/add/',
+     lambda ctx: {'userId': ctx.user(), 'destinationId': ctx.destination(), 'stars': 5,
+                  'comment': 'Excelente', 'created_at': '2025-06-25T12:00:00'},
+     (201, 400), 2),
+    ('rate-destinations.list', 'get', lambda ctx: '/api/v1/rate-destinations/list/', None, (200,), 1),
+    ('rate-destinations.delete', 'delete',
+     lambda ctx: f'/api/v1/rate-destinations/delete/{_pop(ctx.destination_rates, 0)}/', None, (200, 404), None),
+    ('tour.add', 'post', lambda ctx: '/api/v1/tour/add/', _package_payload, (201,), None),
+    ('tour.user', 'get', lambda ctx: f'/api/v1/tour/user/{ctx.user()}/', None, (200,), None),
+    ('tour.pay', 'put', lambda ctx: f'/api/v1/tour/pay/{ctx.package()}/', None, (200,), None),
+    ('rate-package.add', 'post', lambda ctx: '/api/v1/rate-package/add/',
+     lambda ctx: {'userId': ctx.user(), 'tourPackageId': ctx.package(), 'stars': 4,
+                  'comment': 'Muy bueno', 'created_at': '2025-06-25T12:00:00'},
+     (201, 400), 2),
+    ('rate-package.list', 'get', lambda ctx: '/api/v1/rate-package/list/', None, (200,), 2),
+    ('rate-package.delete', 'delete',
+     lambda ctx: f'/api/v1/rate-package/delete/{_pop(ctx.package_rates, 0)}/', None, (200, 404), None),
+    ('tour.delete', 'delete', lambda ctx: f'/api/v1/tour/delete/{_pop(ctx.created_packages, 0)}/',
+     None, (204, 404), None),
+    ('travels.add', 'post', lambda ctx: '/api/v1/travels/add/',
+     lambda ctx: {'userId': ctx.user(), 'dates': [f'2025-08-{day:02d}' for day in range(1, ctx.rng.randint(2, 28))]},
+     (201,), None),
+    ('travels.user', 'get', lambda ctx: f'/api/v1/travels/user/{ctx.user()}/', None, (200,), None),
+    ('travels.matches', 'get', lambda ctx: f'/api/v1/travels/matches/{ctx.bench_user.id}/?min_days=2',
+     None, (200,), None),
+    ('preferences.save', 'post', lambda ctx: '/api/v1/preferences/',
+     lambda ctx: {'user_id': ctx.user(), 'travel_interests': ['Aventura', 'Cultura'], 'adrenaline_level': 7},
+     (201,), None),
+    ('preferences.user', 'get', lambda ctx: f'/api/v1/preferences/{ctx.user()}/', None, (200, 404), None),
+    ('content.generate', 'post', lambda ctx: '/api/v1/content/generate/',
+     lambda ctx: {'userId': ctx.bench_user.id, 'currentMessage': 'Quiero viajar a Cusco',
+                  'previousMessages': [{'isBot': True, 'message': 'Hola'}]},
+     (200,), None),
+    ('user.change-password', 'put', lambda ctx: f'/api/v1/user/change-password/{ctx.bench_user.id}',
+     lambda ctx: {'new_password': 'Bench12345!'}, (200,), None),
+    ('auth.logout', 'post', lambda ctx: '/api/v1/auth/logout/', lambda ctx: ctx.logout_payload(), (200,), None),
+]
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta carga sobre todas las rutas de rutaya/urls.py (Gemini simulado) y reporta "
+        "p50/p95/p99, consultas por petición y memoria. Permite guardar y comparar baselines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--only', nargs='*', default=None, help='Ejecutar solo escenarios con estos prefijos')
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--llm-latency', type=float, default=0.0,
+                            help='Latencia simulada del modelo en segundos')
+        parser.add_argument('--memory', action='store_true', help='Medir el pico de memoria con tracemalloc')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save-baseline', action='store_true')
+        parser.add_argument('--compare', action='store_true', help='Fallar si hay regresiones frente al baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Regresión de latencia p95 tolerada (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        ctx = BenchContext(rng)
+
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if not options['only'] or any(scenario[0].startswith(prefix) for prefix in options['only'])
+        ]
+
+        results = {}
+        # Sin límites de login ni cuotas de IA: se mide la latencia, no el
+        # throttling (todas las peticiones salen de la misma IP y cuenta).
+        # El modelo es el backend falso, con la latencia pedida
+        bench_settings = override_settings(
+            PASSWORD_THROTTLE_RATES={}, LLM_THROTTLE_RATES={}, LLM_DAILY_TOKEN_BUDGETS={},
+            LLM_BACKENDS={'bench': {'class': 'fake', 'latency': options['llm_latency']}},
+            LLM_ROUTES={'chat': 'bench', 'package': 'bench'},
+        )
+        with bench_settings:
+            for scenario in scenarios:
+                results[scenario[0]] = self._run(scenario, ctx, options)
+
+        self._report(results)
+
+        # Tamaño del dataset: solo tiene sentido comparar corridas sobre el mismo volumen
+        meta = {
+            'users': User.objects.count(),
+            'destinations': Destination.objects.count(),
+            'favorites': Favorite.objects.count(),
+            'packages': TourPackage.objects.count(),
+            'rates': DestinationRate.objects.count() + TourPackageRate.objects.count(),
+            'iterations': options['iterations'],
+        }
+
+        baseline_path = Path(options['baseline'])
+        if options['compare']:
+            self._compare(results, meta, baseline_path, options['tolerance'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({'_meta': meta, **results}, indent=2, sort_keys=True))
+            self.stdout.write(f"💾 Baseline guardado en {baseline_path}")
+
+    def _run(self, scenario, ctx, options):
+        name, method, path_for, payload_for, accepted, max_queries = scenario
+        client = Client()
+        latencies, queries, failures = [], [], 0
+        count_lock = threading.Lock()
+
+        if options['memory']:
+            tracemalloc.start()
+
+        for _ in range(options['iterations']):
+            path = path_for(ctx)
+            payload = payload_for(ctx) if payload_for else None
+            headers = {}
+            if name in ('auth.logout', 'content.generate', 'travels.matches'):
+                headers['HTTP_AUTHORIZATION'] = ctx.auth_header
+
+            # Contador propio: connection.queries se satura en 9000 entradas. Las
+            # secciones en paralelo (rutaya.utils.parallel) lo ejecutan desde otros hilos
+            executed = [0]
+
+            def count_query(execute, sql, params, many, context):
+                with count_lock:
+                    executed[0] += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_query):
+                start = time.perf_counter()
+                if payload is None:
+                    response = getattr(client, method)(path, **headers)
+                else:
+                    response = getattr(client, method)(
+                        path, json.dumps(payload), content_type='application/json', **headers
+                    )
+                latencies.append(time.perf_counter() - start)
+            queries.append(executed[0])
+
+            if response.status_code not in accepted:
+                failures += 1
+            else:
+                self._remember(name, response, ctx)
+
+        peak = None
+        if options['memory']:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        result = {
+            'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(_percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+            'queries_mean': round(statistics.mean(queries), 2),
+            'queries_max': max(queries),
+            'failures': failures,
+        }
+        if peak is not None:
+            result['peak_kib'] = round(peak / 1024, 1)
+        if max_queries is not None and result['queries_max'] > max_queries:
+            result['over_query_budget'] = max_queries
+        return result
+
+    @staticmethod
+    def _remember(name, response, ctx):
+        """Guardar los ids creados para que los escenarios de borrado los consuman."""
+        try:
+            data = response.json()
+        except ValueError:
+            return
+        if name == 'rate-destinations.add' and 'rate' in data:
+            ctx.destination_rates.append(data['rate']['id'])
+        elif name == 'rate-package.add' and 'rate' in data:
+            ctx.package_rates.append(data['rate']['id'])
+        elif name == 'tour.add' and 'package' in data:
+            ctx.created_packages.append(data['package']['id'])
+
+    def _report(self, results):
+        header = f"{'escenario':<26}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}{'fallos':>8}{'KiB':>10}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, result in results.items():
+            line = (
+                f"{name:<26}{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+                f"{result['queries_mean']:>11}{result['failures']:>8}{result.get('peak_kib', '-'):>10}"
+            )
+            style = self.style.ERROR if result['failures'] or 'over_query_budget' in result else self.style.SUCCESS
+            self.stdout.write(style(line))
+
+        over_budget = {name: r['over_query_budget'] for name, r in results.items() if 'over_query_budget' in r}
+        if over_budget:
+            raise CommandError(f"Escenarios por encima de su presupuesto de consultas: {over_budget}")
+
+    def _compare(self, results, meta, baseline_path, tolerance):
+        if not baseline_path.exists():
+            raise CommandError(f"No existe el baseline {baseline_path}; usa --save-baseline")
+        baseline = json.loads(baseline_path.read_text())
+
+        previous_meta = baseline.pop('_meta', {})
+        for key in ('destinations', 'favorites', 'packages', 'rates'):
+            # Tolerar lo que los propios escenarios crean/borran durante la corrida
+            if abs(previous_meta.get(key, 0) - meta[key]) > max(100, meta[key] * 0.05):
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️ El baseline se generó con otro volumen de datos ({key}: "
+                    f"{previous_meta.get(key)} vs {meta[key]}); la comparación puede no ser válida"
+                ))
+                break
+
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            if result['queries_mean'] > previous['queries_mean']:
+                regressions.append(f"{name}: consultas {previous['queries_mean']} → {result['queries_mean']}")
+            if result['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{name}: p95 {previous['p95_ms']} ms → {result['p95_ms']} ms")
+
+        if regressions:
+            raise CommandError("Regresiones frente al baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("✅ Sin regresiones frente al baseline"))
@@ -0,0 +1,123 @@
+# rutaya/management/commands/run_fake_llm_server.py
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from rutaya.utils.llm_backends import FakeBackend
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """POST /v1/chat/completions al estilo OpenAI, con o sin stream."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self._send_json(404, {'error': {'message': 'ruta desconocida'}})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            prompt = payload['messages'][-1]['content']
+        except (ValueError, KeyError, IndexError, TypeError):
+            self._send_json(400, {'error': {'message': 'cuerpo inválido'}})
+            return
+
+        server = self.server
+        with server.lock:
+            delay = max(0.0, server.delay + server.rng.uniform(-server.jitter, server.jitter))
+            failing = server.rng.random() < server.error_rate
+        time.sleep(delay)
+        if failing:
+            self._send_json(503, {'error': {'message': 'falla inyectada'}})
+            return
+
+        answer = server.backend.generate(prompt)
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:12]}'
+        model = payload.get('model', 'fake')
+        if payload.get('stream'):
+            self._send_stream(completion_id, model, server.backend.stream(prompt))
+            return
+        self._send_json(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': answer},
+                'finish_reason': 'stop',
+            }],
+        })
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, completion_id, model, chunks):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for chunk in chunks:
+            event = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}],
+            }
+            self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.chunk_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class Command(BaseCommand):
+    help = (
+        "Servidor falso compatible con la API de OpenAI (/v1/chat/completions), con demoras y "
+        "fallas configurables, para pruebas de carga sin red. Usar con el backend 'local' "
+        "(RUTAYA_LLM_LOCAL_URL=http://127.0.0.1:<puerto>/v1)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8080)
+        parser.add_argument('--delay', type=float, default=0.2, help='Latencia por respuesta (s)')
+        parser.add_argument('--jitter', type=float, default=0.05, help='Variación uniforme de la latencia (s)')
+        parser.add_argument('--chunk-delay', type=float, default=0.02, help='Pausa entre fragmentos con stream (s)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas 503')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--verbose', action='store_true', help='Registrar cada petición')
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer((options['host'], options['port']), FakeLLMHandler)
+        server.daemon_threads = True
+        server.backend = FakeBackend()
+        server.rng = random.Random(options['seed'])
+        server.lock = threading.Lock()
+        server.delay = options['delay']
+        server.jitter = options['jitter']
+        server.chunk_delay = options['chunk_delay']
+        server.error_rate = options['error_rate']
+        server.verbose = options['verbose']
+
+        self.stdout.write(f"LLM falso en http://{options['host']}:{options['port']}/v1 (Ctrl+C para salir)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
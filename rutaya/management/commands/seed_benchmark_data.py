@@ -0,0 +1,219 @@
+# rutaya/management/commands/seed_benchmark_data.py
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rutaya.models import (
+    Category, Destination, DestinationRate, Favorite, ItineraryItem, TourPackage,
+    TourPackageRate, TravelAvailability, User, UserPreferences,
+)
+from rutaya.utils.versions import bump_version
+
+BENCH_EMAIL_DOMAIN = 'bench.rutaya.test'
+BENCH_CATEGORY_PREFIX = 'Bench '
+
+# Volúmenes de producción a escala 1.0
+DEFAULT_SIZES = {
+    'users': 20000,
+    'destinations': 10000,
+    'favorites': 1000000,
+    'packages': 100000,
+    'itinerary_per_package': 5,
+    'rates': 500000,
+    'availability_per_user': 30,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos con volumen de producción para benchmarks: "
+        "destinos, usuarios, favoritos, paquetes con itinerario y calificaciones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiplicador de los volúmenes por defecto (ej: 0.01 para una corrida rápida)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true',
+                            help='Eliminar los datos de benchmark existentes antes de generar')
+        parser.add_argument('--flush-only', action='store_true',
+                            help='Solo eliminar los datos de benchmark')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+
+        if options['flush'] or options['flush_only']:
+            self._flush()
+            if options['flush_only']:
+                return
+
+        if User.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').exists():
+            raise CommandError("Ya existen datos de benchmark; usa --flush para regenerarlos")
+
+        sizes = {
+            key: max(1, int(value * options['scale'])) if key not in ('itinerary_per_package', 'availability_per_user')
+            else value
+            for key, value in DEFAULT_SIZES.items()
+        }
+        self.stdout.write(f"Generando: {sizes}")
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            categories = self._categories()
+            destination_ids = self._destinations(categories, sizes['destinations'])
+            user_ids = self._users(sizes['users'])
+            self._favorites(user_ids, destination_ids, sizes['favorites'])
+            self._availability(user_ids, sizes['availability_per_user'])
+            self._preferences(user_ids)
+            package_ids = self._packages(user_ids, sizes['packages'], sizes['itinerary_per_package'])
+            self._rates(user_ids, destination_ids, package_ids, sizes['rates'])
+
+        # bulk_create no emite señales: invalidar el catálogo en memoria
+        bump_version('catalog')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Datos de benchmark generados en {time.perf_counter() - started:.1f}s"
+        ))
+
+    def _flush(self):
+        users = User.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}')
+        deleted_users, _ = users.delete()
+        deleted_categories, _ = Category.objects.filter(name__startswith=BENCH_CATEGORY_PREFIX).delete()
+        bump_version('catalog')
+        self.stdout.write(f"🧹 Eliminados {deleted_users + deleted_categories} registros de benchmark")
+
+    def _bulk(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.stdout.write(f"  {model._meta.verbose_name_plural}: {len(created)}")
+        return created
+
+    def _categories(self):
+        names = ['Playas', 'Montañas', 'Selva', 'Ciudades', 'Arqueología', 'Gastronomía', 'Aventura', 'Lagos']
+        return self._bulk(Category, [Category(name=f"{BENCH_CATEGORY_PREFIX}{name}") for name in names])
+
+    def _destinations(self, categories, count):
+        regions = ['Cusco', 'Lima', 'Arequipa', 'Puno', 'Trujillo', 'Iquitos', 'Piura', 'Ica', 'Huaraz']
+        destinations = [
+            Destination(
+                name=f"Destino {index}",
+                location=self.rng.choice(regions),
+                image_url=f"https://images.rutaya.test/destinations/{index}.jpg",
+                category=self.rng.choice(categories),
+                description=" ".join(["Lugar turístico con historia, paisajes y gastronomía."] * self.rng.randint(3, 15)),
+            )
+            for index in range(count)
+        ]
+        return [destination.id for destination in self._bulk(Destination, destinations)]
+
+    def _users(self, count):
+        # Un único hash compartido: hashear 20k contraseñas tardaría minutos
+        password = make_password('Bench12345!')
+        users = [
+            User(
+                email=f"user{index}@{BENCH_EMAIL_DOMAIN}",
+                username=f"user{index}@{BENCH_EMAIL_DOMAIN}",
+                password=password,
+                first_name='Bench',
+                last_name=str(index),
+            )
+            for index in range(count)
+        ]
+        return [user.id for user in self._bulk(User, users)]
+
+    def _favorites(self, user_ids, destination_ids, count):
+        per_user = max(1, min(len(destination_ids), count // len(user_ids)))
+        # Popularidad sesgada: la mitad de los favoritos cae en el 10% de destinos
+        hot = destination_ids[:max(1, len(destination_ids) // 10)]
+        favorites = []
+        for user_id in user_ids:
+            chosen = set(self.rng.sample(hot, min(len(hot), per_user // 2)))
+            while len(chosen) < per_user:
+                chosen.add(self.rng.choice(destination_ids))
+            favorites.extend(Favorite(user_id=user_id, destination_id=d) for d in chosen)
+            if len(favorites) >= self.batch_size * 10:
+                Favorite.objects.bulk_create(favorites, batch_size=self.batch_size)
+                favorites = []
+        Favorite.objects.bulk_create(favorites, batch_size=self.batch_size)
+        self.stdout.write(f"  Favorites: {per_user * len(user_ids)}")
+
+    def _availability(self, user_ids, per_user):
+        # Un rango continuo de hasta `per_user` días por usuario
+        start = date.today()
+        entries = []
+        for user_id in user_ids:
+            first_day = start + timedelta(days=self.rng.randint(0, 180))
+            entries.append(TravelAvailability(
+                user_id=user_id,
+                start_date=first_day,
+                end_date=first_day + timedelta(days=self.rng.randint(1, per_user) - 1),
+            ))
+        self._bulk(TravelAvailability, entries)
+
+    def _preferences(self, user_ids):
+        interests = ['Aventura', 'Cultura', 'Naturaleza', 'Gastronomía', 'Relax']
+        self._bulk(UserPreferences, [
+            UserPreferences(
+                user_id=user_id,
+                travel_interests=self.rng.sample(interests, 2),
+                travel_style=self.rng.choice(['solo', 'pareja', 'familia']),
+                adrenaline_level=self.rng.randint(1, 10),
+            )
+            for user_id in user_ids
+        ])
+
+    def _packages(self, user_ids, count, itinerary_per_package):
+        packages = [
+            TourPackage(
+                user_id=self.rng.choice(user_ids),
+                title=f"Paquete {index}",
+                description="Recorrido por los principales atractivos de la región. " * self.rng.randint(2, 8),
+                start_date=f"2025-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}T08:00",
+                days=self.rng.randint(1, 10),
+                quantity=self.rng.randint(1, 6),
+                price=self.rng.randint(200, 5000),
+                is_paid=self.rng.random() < 0.3,
+            )
+            for index in range(count)
+        ]
+        package_ids = [package.id for package in self._bulk(TourPackage, packages)]
+
+        items = [
+            ItineraryItem(
+                tour_package_id=package_id,
+                datetime=f"2025-07-{order + 1:02d}T09:00",
+                description=f"Actividad {order + 1} del día",
+                order=order,
+            )
+            for package_id in package_ids
+            for order in range(itinerary_per_package)
+        ]
+        self._bulk(ItineraryItem, items)
+        return package_ids
+
+    def _rates(self, user_ids, destination_ids, package_ids, count):
+        # Mitad destinos, mitad paquetes; pares únicos por (objetivo, usuario)
+        destination_rates = self._unique_pairs(destination_ids, user_ids, count // 2)
+        self._bulk(DestinationRate, [
+            DestinationRate(destination_id=target, user_id=user, stars=self.rng.randint(1, 5),
+                            comment="Muy buena experiencia", created_at="2025-06-25T12:00:00")
+            for target, user in destination_rates
+        ])
+        package_rates = self._unique_pairs(package_ids, user_ids, count - count // 2)
+        self._bulk(TourPackageRate, [
+            TourPackageRate(tour_package_id=target, user_id=user, stars=self.rng.randint(1, 5),
+                            comment="Recomendado", created_at="2025-06-25T12:00:00")
+            for target, user in package_rates
+        ])
+
+    def _unique_pairs(self, targets, user_ids, count):
+        count = min(count, len(targets) * len(user_ids))
+        pairs = set()
+        while len(pairs) < count:
+            pairs.add((self.rng.choice(targets), self.rng.choice(user_ids)))
+        return pairs
@@ -0,0 +1,119 @@
+# rutaya/management/commands/serve.py
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from rutaya.utils.server_profile import tune
+
+# Señales que se reenvían a los masters: HUP recarga, TERM/INT terminan
+# esperando las peticiones en curso, TTIN/TTOU suman o quitan un worker
+FORWARDED_SIGNALS = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU)
+
+
+class Command(BaseCommand):
+    help = (
+        "Servidor de producción: lanza un master de gunicorn (rutaya.gunicorn_conf) por grupo de "
+        "SERVER_POOLS, con el tamaño calculado según los CPUs y la espera de E/S observada. "
+        "kill -HUP a este proceso recarga todos los grupos sin cortar peticiones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pool', action='append', choices=list(settings.SERVER_POOLS),
+                            help='Grupo a lanzar (se puede repetir; por defecto todos)')
+        parser.add_argument('--dry-run', action='store_true', help='Solo mostrar el tamaño calculado')
+        parser.add_argument('--proxy-config', action='store_true',
+                            help='Mostrar la configuración de nginx que reparte las rutas entre los grupos')
+
+    def handle(self, *args, **options):
+        if options['proxy_config']:
+            self.stdout.write(proxy_config())
+            return
+        pools = options['pool'] or list(settings.SERVER_POOLS)
+
+        self.stdout.write(f"{'grupo':<8}{'bind':<22}{'clase':<10}{'workers':>8}{'hilos':>7}{'espera/CPU':>18}")
+        for name in pools:
+            profile = tune(name)
+            source = 'observada' if profile['observed'] else 'supuesta'
+            self.stdout.write(
+                f"{name:<8}{profile['bind']:<22}{profile['worker_class']:<10}{profile['workers']:>8}"
+                f"{profile['threads']:>7}{profile['io_wait']:>8} {source:>9}"
+            )
+        if options['dry_run']:
+            return
+
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'python:rutaya.gunicorn_conf']
+        masters = {
+            name: subprocess.Popen(
+                command, cwd=settings.BASE_DIR, start_new_session=True,
+                env={**os.environ, 'RUTAYA_SERVER_POOL': name},
+            )
+            for name in pools
+        }
+
+        def forward(signum, frame):
+            for master in masters.values():
+                if master.poll() is None:
+                    master.send_signal(signum)
+
+        for signum in FORWARDED_SIGNALS:
+            signal.signal(signum, forward)
+
+        # Si un master termina (por una señal o porque falló) se detienen los demás
+        while all(master.poll() is None for master in masters.values()):
+            time.sleep(0.5)
+        forward(signal.SIGTERM, None)
+        failed = False
+        for name, master in masters.items():
+            code = master.wait()
+            if code:
+                failed = True
+                self.stderr.write(f"El grupo {name} terminó con código {code}")
+        if failed:
+            sys.exit(1)
+
+
+def proxy_config():
+    """
+    Bloque de nginx para SERVER_POOLS: las rutas de cada grupo van a su bind y
+    el resto al grupo sin rutas, con el timeout de lectura del grupo. Detrás
+    de este proxy va RUTAYA_NUM_PROXIES=1, para que los throttles por IP usen
+    la del cliente.
+    """
+    lines = [
+        "# Generado con `manage.py serve --proxy-config` a partir de SERVER_POOLS",
+        "# Con este proxy delante: RUTAYA_NUM_PROXIES=1",
+    ]
+    locations = []
+    for name, pool in settings.SERVER_POOLS.items():
+        host, _, port = pool['bind'].rpartition(':')
+        lines += [
+            f"upstream rutaya_{name} {{",
+            f"    server {'127.0.0.1' if host in ('', '0.0.0.0') else host}:{port};",
+            "    keepalive 16;",
+            "}",
+        ]
+        # Las rutas propias antes que el grupo por defecto ('/')
+        for route in pool['routes'] or ('/',):
+            locations.append((route == '/', route, name, pool['timeout']))
+
+    lines += ["server {", f"    listen {settings.SERVER_PROXY_LISTEN};"]
+    for _, route, name, timeout in sorted(locations):
+        lines += [
+            f"    location {route} {{",
+            f"        proxy_pass http://rutaya_{name};",
+            f"        proxy_read_timeout {timeout}s;",
+            "        proxy_http_version 1.1;",
+            '        proxy_set_header Connection "";',
+            "        proxy_set_header Host $host;",
+            "        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;",
+            "        proxy_set_header X-Forwarded-Proto $scheme;",
+            "        proxy_set_header X-Request-ID $request_id;",
+            "    }",
+        ]
+    lines.append("}")
+    return "\n".join(lines)
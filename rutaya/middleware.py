@@ -0,0 +1,179 @@
+# rutaya/middleware.py
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+
+from rutaya.utils import compression, log, metrics, server_profile
+
+slow_logger = logging.getLogger('rutaya.slow_requests')
+
+
+class RequestIdMiddleware:
+    """
+    Asigna un id a cada petición (o reutiliza X-Request-ID si el cliente lo
+    envía) para correlacionar los logs, y lo devuelve en la respuesta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = log.set_request_id(request.headers.get('X-Request-ID', '')[:64] or None)
+        try:
+            request.request_id = log.get_request_id()
+            response = self.get_response(request)
+            response['X-Request-ID'] = request.request_id
+            return response
+        finally:
+            log.reset_request_id(token)
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide por petición: número de consultas SQL, tiempo en base de datos,
+    tiempo de render/serializer/LLM y latencia total. Publica los tiempos en
+    la cabecera Server-Timing (solo con DEBUG o para las IPs de
+    METRICS_SERVER_TIMING_IPS), los acumula en los histogramas de
+    rutaya.utils.metrics y registra las peticiones lentas con su SQL. También
+    suma el tiempo de CPU del hilo, con el que rutaya.utils.server_profile
+    estima la espera de E/S de cada grupo de workers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500)
+        self.max_logged_queries = getattr(settings, 'METRICS_SLOW_REQUEST_MAX_QUERIES', 50)
+
+    def __call__(self, request):
+        state = {'queries': 0, 'sql': []}
+        token = metrics.start_request()
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+
+        try:
+            with connection.execute_wrapper(self._query_wrapper(state)):
+                response = self.get_response(request)
+        finally:
+            timings = metrics.finish_request(token)
+
+        total = time.perf_counter() - start
+        server_profile.record_request(request.path, total, time.thread_time() - cpu_start)
+        route = self._route(request)
+        labels = {'route': route, 'method': request.method}
+
+        metrics.registry.observe('rutaya_request_duration_seconds', total, labels)
+        metrics.registry.observe(
+            'rutaya_request_queries', state['queries'], labels, buckets=metrics.QUERY_COUNT_BUCKETS
+        )
+        metrics.registry.inc('rutaya_requests_total', {**labels, 'status': response.status_code})
+        for section, seconds in timings.items():
+            metrics.registry.observe('rutaya_section_duration_seconds', seconds, {'route': route, 'section': section})
+
+        if self._wants_server_timing(request):
+            response['Server-Timing'] = self._server_timing(timings, state['queries'], total)
+
+        if total * 1000 >= self.slow_request_ms:
+            slow_logger.warning(
+                "Petición lenta %s %s (%s): %.1f ms, %d consultas%s",
+                request.method, request.path, route, total * 1000, state['queries'],
+                "".join(f"\n  [{ms} ms] {sql}" for ms, sql in state['sql']),
+                extra={'route': route, 'timings': timings},
+            )
+
+        return response
+
+    def process_template_response(self, request, response):
+        # Las Response de DRF se renderizan después de la vista; medimos ese tramo
+        start = time.perf_counter()
+        response.add_post_render_callback(
+            lambda rendered: metrics.add_timing('render', time.perf_counter() - start)
+        )
+        return response
+
+    def _query_wrapper(self, state):
+        max_logged = self.max_logged_queries
+        # rutaya.utils.parallel instala este wrapper también en las conexiones de sus hilos
+        lock = threading.Lock()
+
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics.add_timing('db', elapsed)
+                with lock:
+                    state['queries'] += 1
+                    if len(state['sql']) < max_logged:
+                        state['sql'].append((round(elapsed * 1000, 2), sql))
+
+        return wrapper
+
+    @staticmethod
+    def _route(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.route or match.view_name or 'unknown'
+
+    @staticmethod
+    def _wants_server_timing(request):
+        return settings.DEBUG or request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_SERVER_TIMING_IPS', ())
+
+    @staticmethod
+    def _server_timing(timings, queries, total):
+        entries = []
+        for section, seconds in sorted(timings.items()):
+            description = f';desc="{queries} queries"' if section == 'db' else ''
+            entries.append(f"{section}{description};dur={seconds * 1000:.2f}")
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+class CompressionMiddleware:
+    """
+    Comprime las respuestas con la mejor codificación que acepte el cliente
+    (rutaya.utils.compression). Se omiten: respuestas en streaming o ya
+    comprimidas (payloads precomprimidos), cuerpos menores a
+    COMPRESSION_MIN_BYTES, tipos fuera de COMPRESSION_CONTENT_TYPES y las
+    rutas de COMPRESSION_EXCLUDE_PATHS, que devuelven secretos (BREACH).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.exclude_paths = tuple(getattr(settings, 'COMPRESSION_EXCLUDE_PATHS', ()))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or request.path.startswith(self.exclude_paths)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not compression.is_compressible(response.get('Content-Type', ''), len(response.content)):
+            return response
+
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compression.compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # El cuerpo cambió: un ETag fuerte ya no lo identifica byte a byte
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
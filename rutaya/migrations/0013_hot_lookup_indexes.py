@@ -0,0 +1,101 @@
+# Generated by Django 5.2 on 2026-10-19 14:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutaya', '0012_tourpackagerate_destinationrate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='destination',
+            name='category',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='destinations', to='rutaya.category'),
+        ),
+        migrations.AlterField(
+            model_name='destinationrate',
+            name='destination',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rates', to='rutaya.destination'),
+        ),
+        migrations.AlterField(
+            model_name='destinationrate',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='destination_rates', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='destination',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='favorited_by', to='rutaya.destination'),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='itineraryitem',
+            name='tour_package',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='itinerary', to='rutaya.tourpackage'),
+        ),
+        migrations.AlterField(
+            model_name='tourpackage',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tour_packages', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='tourpackagerate',
+            name='tour_package',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rates', to='rutaya.tourpackage'),
+        ),
+        migrations.AlterField(
+            model_name='tourpackagerate',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tour_package_rates', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='travelavailability',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='travel_availabilities', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='destination',
+            index=models.Index(fields=['category', 'id'], name='destinations_category_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='destinationrate',
+            index=models.Index(fields=['destination', '-id'], name='destination_rates_dest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='destinationrate',
+            index=models.Index(fields=['user', '-id'], name='destination_rates_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['destination', 'user'], name='favorites_dest_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itineraryitem',
+            index=models.Index(fields=['tour_package', 'order', 'id'], name='itinerary_pkg_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackage',
+            index=models.Index(fields=['user', 'start_date'], name='tour_pkg_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackage',
+            index=models.Index(fields=['user', 'is_paid'], name='tour_pkg_user_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackagerate',
+            index=models.Index(fields=['tour_package', '-id'], name='tour_package_rates_pkg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackagerate',
+            index=models.Index(fields=['user', '-id'], name='tour_package_rates_user_idx'),
+        ),
+    ]
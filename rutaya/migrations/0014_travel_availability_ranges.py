@@ -0,0 +1,80 @@
+# Generated by Django 5.2 on 2026-10-19 18:02
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+BATCH_SIZE = 5000
+
+
+def days_to_ranges(apps, schema_editor):
+    """Fusiona las filas de días consecutivos de cada usuario en un solo rango."""
+    TravelAvailability = apps.get_model('rutaya', 'TravelAvailability')
+    rows = TravelAvailability.objects.order_by('user_id', 'start_date').values_list('id', 'user_id', 'start_date')
+
+    updates, delete_ids = [], []
+    current = None  # [id, user_id, start_date, end_date]
+    for row_id, user_id, day in rows.iterator(chunk_size=BATCH_SIZE):
+        if current and current[1] == user_id and day == current[3] + timedelta(days=1):
+            current[3] = day
+            delete_ids.append(row_id)
+            continue
+        if current:
+            updates.append(TravelAvailability(id=current[0], end_date=current[3]))
+        current = [row_id, user_id, day, day]
+    if current:
+        updates.append(TravelAvailability(id=current[0], end_date=current[3]))
+
+    for index in range(0, len(delete_ids), BATCH_SIZE):
+        TravelAvailability.objects.filter(id__in=delete_ids[index:index + BATCH_SIZE]).delete()
+    TravelAvailability.objects.bulk_update(updates, ['end_date'], batch_size=BATCH_SIZE)
+
+
+def ranges_to_days(apps, schema_editor):
+    TravelAvailability = apps.get_model('rutaya', 'TravelAvailability')
+    new_rows = []
+    for availability in TravelAvailability.objects.exclude(end_date=models.F('start_date')).order_by('id').iterator():
+        day = availability.start_date + timedelta(days=1)
+        while day <= availability.end_date:
+            new_rows.append(TravelAvailability(user_id=availability.user_id, start_date=day, end_date=day))
+            day += timedelta(days=1)
+    TravelAvailability.objects.bulk_create(new_rows, batch_size=BATCH_SIZE)
+    TravelAvailability.objects.update(end_date=models.F('start_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutaya', '0013_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='travelavailability',
+            old_name='date',
+            new_name='start_date',
+        ),
+        migrations.AlterModelOptions(
+            name='travelavailability',
+            options={'ordering': ['start_date'], 'verbose_name': 'Travel Availability', 'verbose_name_plural': 'Travel Availabilities'},
+        ),
+        migrations.AddField(
+            model_name='travelavailability',
+            name='end_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunSQL(
+            "UPDATE travel_availabilities SET end_date = start_date",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(days_to_ranges, ranges_to_days),
+        migrations.AlterField(
+            model_name='travelavailability',
+            name='end_date',
+            field=models.DateField(),
+        ),
+        migrations.AddConstraint(
+            model_name='travelavailability',
+            constraint=models.CheckConstraint(condition=models.Q(('end_date__gte', models.F('start_date'))), name='travel_availability_valid_range'),
+        ),
+    ]
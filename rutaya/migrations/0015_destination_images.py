@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 14:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rutaya', '0014_travel_availability_ranges'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DestinationImage',
+            fields=[
+                ('destination', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='image', serialize=False, to='rutaya.destination')),
+                ('source', models.CharField(max_length=500)),
+                ('checksum', models.CharField(max_length=64)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('blurhash', models.CharField(max_length=100)),
+                ('variants', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Destination image',
+                'verbose_name_plural': 'Destination images',
+                'db_table': 'destination_images',
+            },
+        ),
+    ]
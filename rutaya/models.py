@@ -55,29 +55,66 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+
+def _invalidate_home_feed(user_id):
+    # Import diferido: rutaya.utils.home_feed importa estos modelos
+    from rutaya.utils.home_feed import invalidate_home_feed
+    invalidate_home_feed(user_id)
+
+
+class TravelAvailabilityQuerySet(models.QuerySet):
+    def overlapping(self, start, end):
+        """Rangos que comparten al menos un día con [start, end]."""
+        return self.filter(start_date__lte=end, end_date__gte=start)
+
+    def containing(self, day):
+        return self.filter(start_date__lte=day, end_date__gte=day)
+
+
 class TravelAvailability(models.Model):
+    """
+    Rango de fechas disponibles, inclusivo en ambos extremos. Los rangos de
+    un usuario se guardan fusionados: no se solapan ni son contiguos.
+    """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='travel_availabilities'
+        related_name='travel_availabilities',
+        db_index=False  # Cubierto por unique_together (user, start_date)
     )
-    date = models.DateField()
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    objects = TravelAvailabilityQuerySet.as_manager()
 
     class Meta:
-        unique_together = ('user', 'date')
-        ordering = ['date']
+        unique_together = ('user', 'start_date')
+        ordering = ['start_date']
         db_table = 'travel_availabilities'
         verbose_name = 'Travel Availability'
         verbose_name_plural = 'Travel Availabilities'
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__gte=models.F('start_date')),
+                name='travel_availability_valid_range'
+            ),
+        ]
 
     def __str__(self):
-        return f"{self.user.email} - {self.date}"
+        return f"{self.user.email} - {self.start_date} / {self.end_date}"
+
+    def delete(self, *args, **kwargs):
+        # Sin receptor de post_delete (ver rutaya.signals): se invalida aquí
+        result = super().delete(*args, **kwargs)
+        _invalidate_home_feed(self.user_id)
+        return result
 
 class TourPackage(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='tour_packages'
+        related_name='tour_packages',
+        db_index=False  # Cubierto por los índices compuestos que empiezan con user
     )
     title = models.CharField(max_length=255)
     description = models.TextField()
@@ -90,6 +127,12 @@ class TourPackage(models.Model):
     class Meta:
         ordering = ['start_date']  # Nota: el ordering alfabético podría no ser cronológico
         db_table = 'tour_packages'
+        indexes = [
+            # Listado de paquetes del usuario ordenado por start_date
+            models.Index(fields=['user', 'start_date'], name='tour_pkg_user_start_idx'),
+            # Paquetes pagados / pendientes de un usuario
+            models.Index(fields=['user', 'is_paid'], name='tour_pkg_user_paid_idx'),
+        ]
         verbose_name = 'Tour Package'
         verbose_name_plural = 'Tour Packages'
 
@@ -101,7 +144,8 @@ class ItineraryItem(models.Model):
     tour_package = models.ForeignKey(
         TourPackage,
         on_delete=models.CASCADE,
-        related_name='itinerary'
+        related_name='itinerary',
+        db_index=False  # Cubierto por itinerary_pkg_order_idx
     )
     datetime = models.CharField(max_length=255)  # Cambiado a CharField
     description = models.TextField()
@@ -110,6 +154,10 @@ class ItineraryItem(models.Model):
     class Meta:
         ordering = ['order', 'id']  # Mantenemos el orden por 'order' que es numérico
         db_table = 'itinerary_items'
+        indexes = [
+            # prefetch_related('itinerary') filtra por paquete y ordena por (order, id)
+            models.Index(fields=['tour_package', 'order', 'id'], name='itinerary_pkg_order_idx'),
+        ]
         verbose_name = 'Itinerary Item'
         verbose_name_plural = 'Itinerary Items'
 
@@ -120,31 +168,79 @@ class Destination(models.Model):
     name = models.CharField(max_length=200)
     location = models.CharField(max_length=100)
     image_url = models.URLField(max_length=500, blank=True, null=True)
-    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='destinations')
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='destinations',
+        db_index=False  # Cubierto por destinations_category_id_idx
+    )
     description = models.TextField()
 
     class Meta:
         verbose_name = "Destination"
         verbose_name_plural = "Destinations"
         db_table = 'destinations'
+        indexes = [
+            # Destinos por categoría ordenados por id (home y categorías)
+            models.Index(fields=['category', 'id'], name='destinations_category_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.location}"
 
 
+class DestinationImage(models.Model):
+    """
+    Imagen procesada de un destino (rutaya.utils.images): dimensiones del
+    original, placeholder blurhash y variantes redimensionadas guardadas en
+    el storage. `image_url` del destino queda como respaldo.
+    """
+    destination = models.OneToOneField(
+        Destination, on_delete=models.CASCADE, related_name='image', primary_key=True
+    )
+    source = models.CharField(max_length=500)  # URL o ruta del original
+    checksum = models.CharField(max_length=64)  # sha256 del original, para no reprocesarlo
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    blurhash = models.CharField(max_length=100)
+    # [{"format": "webp", "width": 320, "height": 213, "name": "destinations/..."}]
+    variants = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Destination image"
+        verbose_name_plural = "Destination images"
+        db_table = 'destination_images'
+
+    def __str__(self):
+        return f"{self.destination_id} ({self.width}x{self.height})"
+
+
 class Favorite(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
-    destination = models.ForeignKey(Destination, on_delete=models.CASCADE, related_name='favorited_by')
+    # Los índices simples de las FKs son redundantes con los compuestos de Meta
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites', db_index=False)
+    destination = models.ForeignKey(
+        Destination, on_delete=models.CASCADE, related_name='favorited_by', db_index=False
+    )
 
     class Meta:
         unique_together = ('user', 'destination')  # Un usuario no puede marcar el mismo destino dos veces
         verbose_name = "Favorite"
         verbose_name_plural = "Favorites"
         db_table = 'favorites'
+        indexes = [
+            # Conteo de popularidad por destino (el unique cubre los favoritos por usuario)
+            models.Index(fields=['destination', 'user'], name='favorites_dest_user_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.destination.name}"
 
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        _invalidate_home_feed(self.user_id)
+        return result
+
 class UserPreferences(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -174,12 +270,14 @@ class DestinationRate(models.Model):
     destination = models.ForeignKey(
         Destination,
         on_delete=models.CASCADE,
-        related_name='rates'
+        related_name='rates',
+        db_index=False  # Cubierto por destination_rates_dest_idx
     )
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='destination_rates'
+        related_name='destination_rates',
+        db_index=False  # Cubierto por destination_rates_user_idx
     )
     stars = models.IntegerField()
     comment = models.TextField(blank=True, null=True)
@@ -189,6 +287,11 @@ class DestinationRate(models.Model):
         unique_together = ('destination', 'user')
         ordering = ['-id']
         db_table = 'destination_rates'
+        indexes = [
+            # Calificaciones más recientes por destino / por usuario
+            models.Index(fields=['destination', '-id'], name='destination_rates_dest_idx'),
+            models.Index(fields=['user', '-id'], name='destination_rates_user_idx'),
+        ]
         verbose_name = 'Destination Rate'
         verbose_name_plural = 'Destination Rates'
 
@@ -200,12 +303,14 @@ class TourPackageRate(models.Model):
     tour_package = models.ForeignKey(
         TourPackage,
         on_delete=models.CASCADE,
-        related_name='rates'
+        related_name='rates',
+        db_index=False  # Cubierto por tour_package_rates_pkg_idx
     )
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='tour_package_rates'
+        related_name='tour_package_rates',
+        db_index=False  # Cubierto por tour_package_rates_user_idx
     )
     stars = models.IntegerField()
     comment = models.TextField(blank=True, null=True)
@@ -215,6 +320,11 @@ class TourPackageRate(models.Model):
         unique_together = ('tour_package', 'user')
         ordering = ['-id']
         db_table = 'tour_package_rates'
+        indexes = [
+            # Calificaciones más recientes por paquete / por usuario
+            models.Index(fields=['tour_package', '-id'], name='tour_package_rates_pkg_idx'),
+            models.Index(fields=['user', '-id'], name='tour_package_rates_user_idx'),
+        ]
         verbose_name = 'Tour Package Rate'
         verbose_name_plural = 'Tour Package Rates'
 
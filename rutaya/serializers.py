@@ -1,6 +1,8 @@
 # rutaya/serializers.py
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db import connection, transaction
 from django.contrib.auth.password_validation import validate_password
 from .models import *
 from django.utils import timezone
@@ -8,6 +10,10 @@ from django.utils.dateparse import parse_datetime
 import pytz
 from datetime import datetime
 from .models import TourPackage, ItineraryItem
+from .utils.date_ranges import dates_to_ranges, merge_ranges, range_days, subtract_ranges
+from .utils.hashing import hashing_slot
+from .utils.home_feed import invalidate_home_feed
+from .utils.shaping import ShapedSerializerMixin, preview_alias
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -22,7 +28,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         email = validated_data['email']
         validated_data['username'] = email  # Añadir username explícitamente
 
-        user = User.objects.create_user(**validated_data)
+        with hashing_slot():
+            user = User.objects.create_user(**validated_data)
         return user
 
 
@@ -35,7 +42,10 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if email and password:
-            user = authenticate(username=email, password=password)
+            # Si el hasher preferido cambió (PASSWORD_HASHER), authenticate
+            # vuelve a hashear y guarda la contraseña con el nuevo
+            with hashing_slot():
+                user = authenticate(username=email, password=password)
             if not user:
                 raise serializers.ValidationError('Credenciales inválidas.')
             if not user.is_active:
@@ -74,7 +84,7 @@ class ItineraryItemSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
-class TourPackageSerializer(serializers.ModelSerializer):
+class TourPackageSerializer(ShapedSerializerMixin, serializers.ModelSerializer):
     itinerary = ItineraryItemSerializer(many=True, required=False)
     start_date = serializers.CharField(max_length=255)  # Campo como string
     user_id = serializers.IntegerField(write_only=True)
@@ -159,24 +169,45 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class FavoriteActionSerializer(serializers.Serializer):
+    # La existencia de usuario y destino se valida en la vista con una sola
+    # consulta (lookup_user_and_target), no campo por campo
     userId = serializers.IntegerField()
     destinationId = serializers.IntegerField()
 
-    def validate_userId(self, value):
-        if not User.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Usuario no encontrado.")
-        return value
+class DateRangeSerializer(serializers.Serializer):
+    start = serializers.DateField(format="%Y-%m-%d")
+    end = serializers.DateField(format="%Y-%m-%d")
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError("La fecha final no puede ser anterior a la inicial.")
+        if range_days(attrs['start'], attrs['end']) > settings.TRAVEL_AVAILABILITY_MAX_RANGE_DAYS:
+            raise serializers.ValidationError(
+                f"Un rango no puede superar {settings.TRAVEL_AVAILABILITY_MAX_RANGE_DAYS} días."
+            )
+        return attrs
 
-    def validate_destinationId(self, value):
-        if not Destination.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Destino no encontrado.")
-        return value
 
 class TravelAvailabilitySerializer(serializers.Serializer):
+    """
+    Acepta la lista completa (`dates` o `ranges`) o solo los cambios
+    (`add` / `remove`). En todos los casos se escriben únicamente los rangos
+    que cambian.
+    """
     userId = serializers.IntegerField()
     dates = serializers.ListField(
         child=serializers.DateField(format="%Y-%m-%d"),
-        allow_empty=False
+        allow_empty=False,
+        required=False
+    )
+    ranges = DateRangeSerializer(many=True, required=False)
+    add = serializers.ListField(
+        child=serializers.DateField(format="%Y-%m-%d"),
+        required=False
+    )
+    remove = serializers.ListField(
+        child=serializers.DateField(format="%Y-%m-%d"),
+        required=False
     )
 
     def validate_userId(self, value):
@@ -184,19 +215,84 @@ class TravelAvailabilitySerializer(serializers.Serializer):
             raise serializers.ValidationError("Usuario no encontrado.")
         return value
 
+    def validate(self, attrs):
+        modes = [name for name in ('dates', 'ranges') if name in attrs]
+        if 'add' in attrs or 'remove' in attrs:
+            modes.append('add/remove')
+        if len(modes) != 1:
+            raise serializers.ValidationError("Envía solo uno de: 'dates', 'ranges' o 'add'/'remove'.")
+        if set(attrs.get('add', ())) & set(attrs.get('remove', ())):
+            raise serializers.ValidationError("Una fecha no puede estar en 'add' y 'remove' a la vez.")
+        return attrs
+
     def create(self, validated_data):
-        user_id = validated_data['userId']
-        dates = validated_data['dates']
-        user = User.objects.get(id=user_id)
+        ranges = validated_data.get('ranges')
+        ranges, added, removed = sync_travel_dates(
+            validated_data['userId'],
+            dates=validated_data.get('dates'),
+            ranges=[(r['start'], r['end']) for r in ranges] if ranges is not None else None,
+            add=validated_data.get('add', ()),
+            remove=validated_data.get('remove', ()),
+        )
+        return {**validated_data, 'ranges': ranges, 'added': added, 'removed': removed}
+
+
+def sync_travel_dates(user_id, dates=None, ranges=None, add=(), remove=()):
+    """
+    Lleva la disponibilidad del usuario a `dates` / `ranges` (o aplica `add`
+    / `remove` sobre la actual) borrando e insertando solo los rangos que
+    cambian.
+
+    Con deltas primero se quita `remove` y luego se agrega `add`: una fecha
+    en ambos queda disponible (la API rechaza ese caso antes de llegar aquí).
+    Quitar días que no estaban no tiene efecto.
+
+    Devuelve (rangos resultantes, rangos agregados, rangos eliminados),
+    normalizados.
+    """
+    with transaction.atomic():
+        # Lee, calcula y escribe con la fila del usuario bloqueada: dos
+        # sincronizaciones a la vez dejarían rangos solapados o contiguos. Se
+        # bloquea el usuario y no sus rangos porque puede no tener ninguno.
+        # SQLite no tiene FOR UPDATE: ahí las transacciones son IMMEDIATE
+        if connection.features.has_select_for_update:
+            list(User.objects.select_for_update().filter(id=user_id).values_list('id', flat=True))
+        rows = {
+            (start, end): row_id
+            for row_id, start, end in TravelAvailability.objects.filter(user_id=user_id)
+            .values_list('id', 'start_date', 'end_date')
+        }
+        existing = merge_ranges(rows)
 
-        # Eliminar fechas anteriores (puedes cambiar este comportamiento)
-        TravelAvailability.objects.filter(user=user).delete()
+        if ranges is not None:
+            target = merge_ranges(ranges)
+        elif dates is not None:
+            target = dates_to_ranges(dates)
+        else:
+            target = merge_ranges(subtract_ranges(existing, dates_to_ranges(remove)) + dates_to_ranges(add))
+
+        target_set = set(target)
+        stale_ids = [row_id for key, row_id in rows.items() if key not in target_set]
+        new_ranges = [key for key in target if key not in rows]
+
+        # Borrar antes de insertar: un rango que cambia de fin conserva su inicio
+        if stale_ids:
+            TravelAvailability.objects.filter(id__in=stale_ids).delete()
+        if new_ranges:
+            # ignore_conflicts: otra petición concurrente pudo insertar el mismo rango
+            TravelAvailability.objects.bulk_create(
+                [TravelAvailability(user_id=user_id, start_date=start, end_date=end) for start, end in new_ranges],
+                ignore_conflicts=True
+            )
+        if stale_ids or new_ranges:
+            invalidate_home_feed(user_id)
+
+    return target, subtract_ranges(target, existing), subtract_ranges(existing, target)
 
-        # Crear nuevas fechas
-        new_entries = [TravelAvailability(user=user, date=d) for d in dates]
-        TravelAvailability.objects.bulk_create(new_entries)
 
-        return validated_data
+def set_travel_dates(user_id, dates):
+    """Reemplaza las fechas disponibles del usuario por `dates`."""
+    return sync_travel_dates(user_id, dates=dates)
 
 
 class messageInputSerializer(serializers.Serializer):
@@ -206,6 +302,8 @@ class messageInputSerializer(serializers.Serializer):
         child=serializers.DictField(), required=False
     )
     memoryBank = serializers.DictField(required=False)
+    # "package" cuando el usuario confirma que quiere generar el paquete
+    mode = serializers.ChoiceField(choices=['chat', 'package'], default='chat')
 
 
 
@@ -262,6 +360,8 @@ class UserPreferencesSerializer(serializers.ModelSerializer):
 # Agregar estos serializers a tu archivo serializers.py existente
 
 # Serializers para crear calificaciones (POST)
+# Solo validan el cuerpo: las vistas insertan con insert_ignore (un
+# duplicado lo resuelve el INSERT ... ON CONFLICT), no con save()
 class DestinationRateCreateSerializer(serializers.ModelSerializer):
     userId = serializers.IntegerField(write_only=True)
     destinationId = serializers.IntegerField(write_only=True)
@@ -270,30 +370,6 @@ class DestinationRateCreateSerializer(serializers.ModelSerializer):
         model = DestinationRate
         fields = ['userId', 'destinationId', 'stars', 'comment', 'created_at']
 
-    def validate_userId(self, value):
-        if not User.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Usuario no encontrado.")
-        return value
-
-    def validate_destinationId(self, value):
-        if not Destination.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Destino no encontrado.")
-        return value
-
-    def create(self, validated_data):
-        user_id = validated_data.pop('userId')
-        destination_id = validated_data.pop('destinationId')
-
-        user = User.objects.get(id=user_id)
-        destination = Destination.objects.get(id=destination_id)
-
-        rate = DestinationRate.objects.create(
-            user=user,
-            destination=destination,
-            **validated_data
-        )
-        return rate
-
 
 class TourPackageRateCreateSerializer(serializers.ModelSerializer):
     userId = serializers.IntegerField(write_only=True)
@@ -303,33 +379,11 @@ class TourPackageRateCreateSerializer(serializers.ModelSerializer):
         model = TourPackageRate
         fields = ['userId', 'tourPackageId', 'stars', 'comment', 'created_at']
 
-    def validate_userId(self, value):
-        if not User.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Usuario no encontrado.")
-        return value
-
-    def validate_tourPackageId(self, value):
-        if not TourPackage.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Paquete turístico no encontrado.")
-        return value
-
-    def create(self, validated_data):
-        user_id = validated_data.pop('userId')
-        tour_package_id = validated_data.pop('tourPackageId')
-
-        user = User.objects.get(id=user_id)
-        tour_package = TourPackage.objects.get(id=tour_package_id)
-
-        rate = TourPackageRate.objects.create(
-            user=user,
-            tour_package=tour_package,
-            **validated_data
-        )
-        return rate
-
 
 # Serializers para mostrar calificaciones (GET)
-class DestinationRateSerializer(serializers.ModelSerializer):
+class DestinationRateSerializer(ShapedSerializerMixin, serializers.ModelSerializer):
+    # La descripción anidada se recorta en _with_description
+    shaped_text_fields = ()
     user = UserSerializer(read_only=True)
     destination = serializers.SerializerMethodField()
 
@@ -338,16 +392,19 @@ class DestinationRateSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'destination', 'stars', 'comment', 'created_at']
 
     def get_destination(self, obj):
-        return {
+        data = {
             'id': obj.destination.id,
             'name': obj.destination.name,
             'location': obj.destination.location,
-            'description': obj.destination.description,
+            'description': None,
             'image_url': obj.destination.image_url
         }
+        return _with_description(data, obj, self.context.get('shape'), 'destination', obj.destination)
 
 
-class TourPackageRateSerializer(serializers.ModelSerializer):
+class TourPackageRateSerializer(ShapedSerializerMixin, serializers.ModelSerializer):
+    # La descripción anidada se recorta en _with_description
+    shaped_text_fields = ()
     user = UserSerializer(read_only=True)
     tour_package = serializers.SerializerMethodField()
 
@@ -357,14 +414,84 @@ class TourPackageRateSerializer(serializers.ModelSerializer):
 
     def get_tour_package(self, obj):
         itinerary = ItineraryItemSerializer(obj.tour_package.itinerary.all(), many=True).data
-        return {
+        data = {
             'id': obj.tour_package.id,
             'title': obj.tour_package.title,
-            'description': obj.tour_package.description,
+            'description': None,
             'start_date': obj.tour_package.start_date,
             'quantity': obj.tour_package.quantity,
             'days': obj.tour_package.days,
             'price': obj.tour_package.price,
             'is_paid': obj.tour_package.is_paid,
             'itinerary': itinerary
-        }
\ No newline at end of file
+        }
+        return _with_description(data, obj, self.context.get('shape'), 'tour_package', obj.tour_package)
+
+
+def _with_description(data, rate, shape, relation, target):
+    """
+    Descripción del objeto calificado: completa, o la vista previa anotada
+    por Shape.queryset(path=relation + '__') cuando se pidió ?preview=1.
+    """
+    if shape is None or not shape.preview:
+        data['description'] = target.description
+    else:
+        data['description'], data['description_has_more'] = shape.truncate(
+            getattr(rate, preview_alias(path=relation + '__'))
+        )
+    return data
+
+
+class TravelMatchQuerySerializer(serializers.Serializer):
+    min_days = serializers.IntegerField(min_value=0, default=1)
+    min_shared = serializers.IntegerField(min_value=0, default=1)
+    limit = serializers.IntegerField(min_value=1, default=20)
+
+    def validate_limit(self, value):
+        return min(value, settings.MATCHING_MAX_RESULTS)
+
+    def validate(self, attrs):
+        if attrs['min_days'] == 0 and attrs['min_shared'] == 0:
+            raise serializers.ValidationError("min_days o min_shared debe ser mayor que 0.")
+        return attrs
+
+
+# Serializers para /api/v1/batch/ (la existencia se valida en bloque en rutaya.utils.batch)
+class BatchRequestSerializer(serializers.Serializer):
+    userId = serializers.IntegerField()
+    operations = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_operations(self, value):
+        max_operations = getattr(settings, 'BATCH_MAX_OPERATIONS', 100)
+        if len(value) > max_operations:
+            raise serializers.ValidationError(f"Máximo {max_operations} operaciones por lote")
+        return value
+
+
+class BatchFavoriteOperationSerializer(serializers.Serializer):
+    destinationId = serializers.IntegerField()
+
+
+class BatchDestinationRateOperationSerializer(serializers.Serializer):
+    destinationId = serializers.IntegerField()
+    stars = serializers.IntegerField()
+    comment = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    created_at = serializers.CharField(max_length=255)
+
+
+class BatchTourPackageRateOperationSerializer(serializers.Serializer):
+    tourPackageId = serializers.IntegerField()
+    stars = serializers.IntegerField()
+    comment = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    created_at = serializers.CharField(max_length=255)
+
+
+class BatchRateDeleteOperationSerializer(serializers.Serializer):
+    rateId = serializers.IntegerField()
+
+
+class BatchAvailabilityOperationSerializer(serializers.Serializer):
+    dates = serializers.ListField(
+        child=serializers.DateField(format="%Y-%m-%d"),
+        allow_empty=True
+    )
@@ -13,6 +13,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 TIME_ZONE = 'America/Lima'  # Timezone de Perú
 USE_TZ = True  # Habilitar soporte de timezone
 USE_I18N = True
@@ -55,6 +57,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'rutaya.middleware.RequestIdMiddleware',
+    # Primero para medir la petición completa (consultas, secciones y latencia)
+    'rutaya.middleware.RequestMetricsMiddleware',
+    # Después de las métricas, para que el tiempo de compresión cuente en la petición
+    'rutaya.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -67,6 +74,11 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'rutaya.urls'
 
+# Las vistas se importan en la primera petición a cada ruta (rutaya.views.LazyView):
+# menos cold start en serverless. En un servidor de larga vida conviene
+# RUTAYA_LAZY_VIEWS=0, que las importa todas al cargar las URLs
+LAZY_VIEWS = os.environ.get('RUTAYA_LAZY_VIEWS', '1') != '0'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -94,6 +106,10 @@ DATABASES = {
          'NAME': BASE_DIR / 'db.sqlite3',
          'OPTIONS': {
              'timeout': 20,
+             # Las transacciones toman el lock de escritura al empezar: dos que
+             # leen y después escriben (ej: sync_travel_dates) se ejecutan una
+             # tras otra en vez de fallar con "database is locked"
+             'transaction_mode': 'IMMEDIATE',
          }
      }
 }
@@ -109,6 +125,34 @@ DATABASES = {
 #    }
 #}
 
+# Cache de Django: versiones de rutaya.utils.versions, lista negra de tokens,
+# usuarios revocados y cuotas del asistente. Con varios procesos tiene que
+# ser compartido para que una invalidación llegue a todos. RUTAYA_CACHE_URL:
+# - redis://host:6379/0: Redis (requiere el paquete redis), entre hosts
+# - file:///ruta: archivos en disco, compartido por los procesos del host;
+#   rutaya.gunicorn_conf lo usa por defecto (en .cache/ del proyecto). incr
+#   no es atómico entre procesos: un contador de cuota puede perder una suma
+# - sin definir: LocMemCache, por proceso (runserver, tests)
+CACHE_URL = os.environ.get('RUTAYA_CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    try:
+        import redis  # noqa: F401
+    except ImportError:  # pragma: no cover - dependencia opcional
+        raise ImproperlyConfigured("RUTAYA_CACHE_URL con redis:// requiere el paquete redis")
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL.startswith('file://'):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_URL[len('file://'):],
+        # incr vuelve a guardar la clave con el timeout por defecto: sin él, las
+        # versiones (que no vencen) no pasan a vencer al incrementarlas
+        'TIMEOUT': None,
+        # Hay claves por usuario (cuotas); al pasar el máximo se borra un tercio
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -130,11 +174,15 @@ AUTH_PASSWORD_VALIDATORS = [
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT sin consulta a `users` en el camino habitual (rutaya.authentication)
+        'rutaya.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Proxies delante que agregan X-Forwarded-For (1 con el de `manage.py serve
+    # --proxy-config`); con 0 la IP de los throttles es REMOTE_ADDR
+    'NUM_PROXIES': int(os.environ.get('RUTAYA_NUM_PROXIES', '0')),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DATETIME_FORMAT': '%Y-%m-%dT%H:%M:%S%z',
@@ -160,8 +208,251 @@ SIMPLE_JWT = {
     'VERIFYING_KEY': None,
 }
 
+# Hasher de contraseñas preferido: 'scrypt' (por defecto), 'argon2' (requiere
+# argon2-cffi; sin él se usa scrypt) o 'pbkdf2'. Los demás quedan para
+# verificar hashes existentes, que se vuelven a hashear con el preferido en
+# el siguiente login
+PASSWORD_HASHER = os.environ.get('RUTAYA_PASSWORD_HASHER', 'scrypt')
+if PASSWORD_HASHER == 'argon2':
+    try:
+        import argon2  # noqa: F401
+    except ImportError:  # pragma: no cover - dependencia opcional
+        PASSWORD_HASHER = 'scrypt'
+_PASSWORD_HASHERS = {
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Hashes simultáneos en el host, entre todos los workers (rutaya.utils.hashing:
+# un archivo de lock por lugar en PASSWORD_HASHING_LOCK_DIR) y espera máxima
+# por un lugar (s)
+PASSWORD_HASHING_CONCURRENCY = int(os.environ.get('RUTAYA_PASSWORD_HASHING_CONCURRENCY', os.cpu_count() or 2))
+PASSWORD_HASHING_LOCK_DIR = os.environ.get('RUTAYA_PASSWORD_HASHING_LOCK_DIR', str(BASE_DIR / '.cache' / 'hashing'))
+PASSWORD_HASHING_WAIT = 5
+
+# Login/registro/cambio de contraseña (rutaya.throttling.PasswordRateThrottle):
+# (operaciones, ventana en segundos) por IP y por cuenta. Los contadores viven
+# en CACHES, así que el límite es para todos los workers y sobrevive reinicios
+PASSWORD_THROTTLE_RATES = {
+    'ip': (30, 60),
+    'account': (5, 60),
+}
+
+# Asistente de IA (/api/v1/content/generate/): límites por IP/usuario
+# (rutaya.throttling.LLMRateThrottle), tokens diarios estimados por usuario
+# y llamadas simultáneas al modelo (rutaya.utils.llm_quota). 'paid' son los
+# usuarios con algún paquete pagado, que además pasan primero en la cola
+LLM_THROTTLE_RATES = {
+    'ip': (30, 60),
+    'user': (10, 60),
+    'user_paid': (30, 60),
+}
+LLM_DAILY_TOKEN_BUDGETS = {'free': 60000, 'paid': 300000}
+LLM_MAX_CONCURRENCY = 8
+LLM_QUEUE_TIMEOUT = 20  # Segundos esperando un lugar antes de responder 503
+
+# Cliente del modelo (rutaya.utils.llm_client): plazo total por llamada,
+# reintentos con backoff (base, máximo) en segundos, hedging opcional
+# (percentil de latencia tras el cual se lanza un segundo intento; None =
+# desactivado, duplica el costo de las llamadas lentas) y circuit breaker
+LLM_TIMEOUT = 30
+LLM_RETRIES = 2
+LLM_RETRY_BACKOFF = (0.5, 4.0)
+LLM_HEDGE_PERCENTILE = None
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_BREAKER_FAILURES = 5  # Fallos seguidos que abren el circuito
+LLM_BREAKER_RESET = 30  # Segundos abierto antes de probar de nuevo
+LLM_CLIENT_WORKERS = 32
+
+# Backends del modelo por nombre (rutaya.utils.llm_backends): 'class' es
+# gemini, openai (cualquier API /v1/chat/completions, ej. un llama.cpp o
+# vLLM local) o fake; el resto son argumentos del backend
+LLM_BACKENDS = {
+    'gemini-flash': {'class': 'gemini', 'model': 'gemini-1.5-flash'},
+    'gemini-pro': {'class': 'gemini', 'model': 'gemini-1.5-pro'},
+    'local': {
+        'class': 'openai',
+        'base_url': os.environ.get('RUTAYA_LLM_LOCAL_URL', 'http://127.0.0.1:8080/v1'),
+        'model': os.environ.get('RUTAYA_LLM_LOCAL_MODEL', 'local'),
+    },
+    'fake': {'class': 'fake'},
+}
+# Backend por tipo de mensaje: 'chat' la conversación (el modelo barato),
+# 'package' cuando el usuario pide generar el paquete (el más capaz)
+LLM_ROUTES = {
+    'chat': os.environ.get('RUTAYA_LLM_CHAT_BACKEND', 'gemini-flash'),
+    'package': os.environ.get('RUTAYA_LLM_PACKAGE_BACKEND', 'gemini-pro'),
+}
+# Paquetes generados (rutaya.utils.package_output): rondas para volver a
+# pedir solo los campos o elementos del itinerario que no validan, y
+# segundos en total para todos esos pedidos
+LLM_PACKAGE_REPAIR_ROUNDS = 2
+LLM_PACKAGE_REPAIR_TIMEOUT = 30
+# Duración máxima de una petición al asistente: cola, generación y reparaciones
+LLM_REQUEST_TIMEOUT = LLM_QUEUE_TIMEOUT + LLM_TIMEOUT + LLM_PACKAGE_REPAIR_TIMEOUT
+
+# Usuarios autenticados en memoria (rutaya.authentication)
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60  # Segundos; acota cambios hechos en otros procesos
+AUTH_TOKEN_PRUNE_INTERVAL = 3600  # Borrado de tokens vencidos desde logout
+
 CORS_ORIGIN_ALLOW_ALL = True
 
+# Hilos para las partes independientes de una petición (ej: /api/v1/bootstrap/).
+# 0 = ejecución secuencial. Cada hilo mantiene su conexión a la base hasta
+# PARALLEL_CONN_MAX_AGE segundos (None = sin límite)
+PARALLEL_MAX_WORKERS = 4
+PARALLEL_CONN_MAX_AGE = 300
+
+# Máximo de operaciones aceptadas por /api/v1/batch/
+BATCH_MAX_OPERATIONS = 100
+
+# Largo máximo de un rango de disponibilidad de viaje
+TRAVEL_AVAILABILITY_MAX_RANGE_DAYS = 366
+
+# Largo de las descripciones recortadas con ?preview=1 (rutaya.utils.shaping)
+DESCRIPTION_PREVIEW_CHARS = 160
+
+# Catálogo de destinos en memoria (rutaya.utils.catalog); se reconstruye
+# al cambiar destinos/categorías o, como respaldo, tras este TTL en segundos
+CATALOG_TTL = 600
+CATALOG_POPULAR_TTL = 60  # Segundos que se reutiliza el conteo de "más populares"
+
+# Home por usuario en memoria (rutaya.utils.home_feed); se invalida por usuario
+# con el cache de Django y el TTL acota los "más populares" del home
+HOME_FEED_CACHE_SIZE = 5000
+HOME_FEED_CACHE_TTL = 300
+HOME_SUGGESTIONS_ROTATION = 3600  # Segundos que se mantienen las mismas sugerencias
+
+# Compresión de respuestas (rutaya.middleware.CompressionMiddleware). brotli
+# y zstd se usan solo si están instalados los paquetes brotli / zstandard
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_CONTENT_TYPES = ('application/json', 'text/', 'application/javascript')
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 5, 'zstd': 3}
+# Respuestas con tokens o contraseñas: no se comprimen (BREACH)
+COMPRESSION_EXCLUDE_PATHS = ('/api/v1/auth/',)
+
+# Payloads compartidos ya renderizados y comprimidos (rutaya.utils.compression)
+PRECOMPRESSED_CACHE_SIZE = 256
+PRECOMPRESSED_CACHE_TTL = 60
+
+# Imágenes de destinos (rutaya.utils.images, comando process_destination_images)
+IMAGE_VARIANT_WIDTHS = (160, 320, 640, 1280)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_ENCODER_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+}
+IMAGE_DEFAULT_WIDTH = 640  # Ancho de `src` para clientes sin srcset
+IMAGE_BLURHASH_COMPONENTS = (4, 3)
+IMAGE_STORAGE_PREFIX = 'destinations'
+# Base pública de las variantes (ej: un CDN); vacío = MEDIA_URL del storage
+IMAGE_BASE_URL = os.environ.get('RUTAYA_IMAGE_BASE_URL', '')
+IMAGE_FETCH_TIMEOUT = 10
+IMAGE_MAX_SOURCE_BYTES = 15 * 1024 * 1024
+
+# Emparejamiento de viajeros (rutaya.utils.matching)
+MATCHING_INDEX_TTL = 300  # Segundos antes de reconstruir el índice en memoria
+MATCHING_HORIZON_DAYS = 730  # Días hacia adelante que se indexan
+MATCHING_MAX_RESULTS = 50
+
+# Métricas por petición (rutaya.middleware.RequestMetricsMiddleware)
+METRICS_SLOW_REQUEST_MS = 500  # Umbral para registrar la petición y su SQL
+METRICS_SLOW_REQUEST_MAX_QUERIES = 50
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')  # Quién puede leer /api/v1/metrics/
+# Quién recibe la cabecera Server-Timing (con DEBUG, todos): los tiempos por
+# sección revelan detalles internos. Como METRICS_ALLOWED_IPS, se compara con
+# REMOTE_ADDR
+METRICS_SERVER_TIMING_IPS = METRICS_ALLOWED_IPS
+
+# Logging estructurado (rutaya.utils.log): JSON por línea, con id de petición,
+# muestreo de DEBUG y escritura en un hilo aparte para no bloquear requests
+LOG_LEVEL = os.environ.get('RUTAYA_LOG_LEVEL', 'INFO')
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('RUTAYA_LOG_DEBUG_SAMPLE_RATE', '0.01'))
+LOG_PAYLOAD_MAX_CHARS = 500
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'rutaya.utils.log.RequestIdFilter'},
+        'sample_debug': {'()': 'rutaya.utils.log.SamplingFilter', 'rate': LOG_DEBUG_SAMPLE_RATE},
+    },
+    'formatters': {
+        'json': {'()': 'rutaya.utils.log.JsonFormatter'},
+    },
+    'handlers': {
+        'async_console': {
+            '()': 'rutaya.utils.log.QueueStreamHandler',
+            'maxsize': 10000,
+            'formatter': 'json',
+            'filters': ['request_id', 'sample_debug'],
+        },
+    },
+    'loggers': {
+        'rutaya': {
+            'handlers': ['async_console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
+# Documentación de la API precalculada (rutaya.utils.api_docs): se genera con
+# `manage.py generate_openapi_schema` en el build o en la primera petición
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
+OPENAPI_CACHE_MAX_AGE = 24 * 3600
+
+# Servidor de producción (rutaya.gunicorn_conf, `manage.py serve`): un master
+# de gunicorn por grupo; un proxy delante (`manage.py serve --proxy-config`
+# genera el de nginx) envía las rutas de 'routes' al bind del grupo y el resto
+# al de routes vacío. 'crud' usa workers sync; 'chat' (el asistente, que casi
+# todo el tiempo espera al modelo) usa gthread con varios hilos por worker. La
+# cantidad se calcula con los CPUs y la espera de E/S observada
+# (rutaya.utils.server_profile); 'io_wait' es la relación espera/CPU supuesta
+# mientras no haya observaciones. El timeout de 'crud' también cubre al
+# asistente, que llega ahí si no hay proxy
+SERVER_POOLS = {
+    'crud': {
+        'bind': os.environ.get('RUTAYA_SERVER_BIND', '0.0.0.0:8000'),
+        'worker_class': 'sync',
+        'routes': (),
+        'io_wait': 1.0,
+        'max_workers': 16,
+        'max_requests': 2000,
+        'timeout': LLM_REQUEST_TIMEOUT + 10,
+    },
+    'chat': {
+        'bind': os.environ.get('RUTAYA_SERVER_CHAT_BIND', '127.0.0.1:8001'),
+        'worker_class': 'gthread',
+        'routes': ('/api/v1/content/',),
+        'io_wait': 20.0,
+        'max_workers': 4,
+        'max_threads': LLM_MAX_CONCURRENCY,  # Más hilos solo esperarían en la cola del modelo
+        'max_requests': 500,
+        'timeout': LLM_REQUEST_TIMEOUT + 10,
+    },
+}
+SERVER_CPUS = int(os.environ.get('RUTAYA_SERVER_CPUS', '0'))  # 0 = detectar (afinidad y cuota del cgroup)
+SERVER_MAX_REQUESTS_JITTER = 0.1  # Fracción de max_requests, para no reciclar todos a la vez
+SERVER_GRACEFUL_TIMEOUT = 30  # Segundos para terminar las peticiones en curso al recargar
+SERVER_STATS_FILE = os.environ.get('RUTAYA_SERVER_STATS_FILE', str(BASE_DIR / 'server_stats.json'))
+SERVER_STATS_WINDOWS = 20  # Salidas de workers recientes que cuentan para la espera observada
+# Cargar la app y precalentar en el master antes del fork: los workers
+# comparten lo ya armado (copy-on-write). kill -HUP recalcula el tamaño pero
+# no recarga el código: un deploy necesita reiniciar el servidor
+SERVER_PRELOAD = os.environ.get('RUTAYA_SERVER_PRELOAD', '1') != '0'
+SERVER_PROXY_LISTEN = os.environ.get('RUTAYA_SERVER_PROXY_LISTEN', '80')  # Puerto del proxy de --proxy-config
+
+# Precalentamiento antes de recibir tráfico (rutaya.utils.warmup), en orden;
+# 'db' al final porque una petición cierra la conexión al terminar
+WARMUP_WARMERS = ('catalog', 'popular', 'urls', 'serializers', 'openapi', 'requests', 'db')
+WARMUP_REQUEST_PATHS = ('/api/v1/community/list/',)  # GET públicos y sin efectos
+
 # Swagger settings
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -192,6 +483,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Archivos subidos/generados (variantes de imágenes de destinos)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,68 @@
+# rutaya/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from rutaya.authentication import evict_user, revoke_deleted_user, revoked_user_ids
+
+from rutaya.models import (
+    Category, Destination, DestinationImage, DestinationRate, Favorite, ItineraryItem, TourPackage,
+    TourPackageRate, TravelAvailability, User, UserPreferences
+)
+from rutaya.utils.home_feed import invalidate_home_feed
+from rutaya.utils.versions import bump_version
+
+
+@receiver([post_save, post_delete], sender=Destination)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=DestinationImage)
+def catalog_changed(sender, **kwargs):
+    bump_version('catalog')
+
+
+# Los listados de calificaciones (comunidad) incluyen el paquete calificado
+# con su itinerario y los datos públicos del usuario. Los caminos que no
+# disparan señales (insert_ignore, bulk_create) llaman a bump_version('rates')
+@receiver([post_save, post_delete], sender=DestinationRate)
+@receiver([post_save, post_delete], sender=TourPackageRate)
+@receiver([post_save, post_delete], sender=TourPackage)
+@receiver([post_save, post_delete], sender=ItineraryItem)
+def rates_changed(sender, **kwargs):
+    bump_version('rates')
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    evict_user(instance.pk)
+    # Desactivado, o reactivado: cambia el set de revocados de rutaya.authentication
+    if not instance.is_active or instance.pk in revoked_user_ids():
+        bump_version('revoked_users')
+    # Un login solo actualiza last_login (y password al migrar de hasher),
+    # que no aparecen en los listados
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return
+    bump_version('rates')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    evict_user(instance.pk)
+    revoke_deleted_user(instance.pk)
+    invalidate_home_feed(instance.pk)
+
+
+# Home por usuario (rutaya.utils.home_feed). Favoritos y disponibilidad solo
+# con post_save: un receptor de post_delete haría que QuerySet.delete() lea
+# las filas antes de borrarlas; los caminos que borran (y los que insertan
+# sin señales) llaman a invalidate_home_feed, y Favorite/TravelAvailability
+# .delete() lo hacen por instancia
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=TravelAvailability)
+@receiver([post_save, post_delete], sender=UserPreferences)
+def home_feed_changed(sender, instance, **kwargs):
+    invalidate_home_feed(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, **kwargs):
+    bump_version('token_blacklist')
@@ -0,0 +1,48 @@
+# rutaya/tests/factories.py
+"""Datos mínimos para los tests que usan la base (sin contraseñas: hashear es lento)."""
+from rutaya.models import Category, Destination, ItineraryItem, TourPackage, User
+
+
+def make_user(email, **fields):
+    return User.objects.create(email=email, first_name=fields.pop('first_name', email.split('@')[0]), **fields)
+
+
+def make_destinations(count, category_names=('Aventura', 'Cultura')):
+    categories = [Category.objects.get_or_create(name=name)[0] for name in category_names]
+    return [
+        Destination.objects.create(
+            name=f'Destino {index}', location='Cusco', category=categories[index % len(categories)],
+            description=f'Descripción del destino {index}',
+        )
+        for index in range(count)
+    ]
+
+
+def make_package(user, title='Cusco mágico', items=2):
+    package = TourPackage.objects.create(
+        user=user, title=title, description='Machu Picchu y Valle Sagrado', start_date='2030-07-01T08:00',
+        days=4, quantity=2, price=1850,
+    )
+    for order in range(items):
+        ItineraryItem.objects.create(
+            tour_package=package, datetime=f'2030-07-0{order + 1}T08:00', description=f'Actividad {order}',
+            order=order,
+        )
+    return package
+
+
+def reset_caches():
+    """
+    Cache de Django y lo que cada proceso guarda en memoria (catálogo,
+    populares, home, payloads precomprimidos).
+    """
+    from django.core.cache import cache
+
+    from rutaya.utils import catalog, compression, home_feed
+
+    cache.clear()
+    catalog._popular.clear()
+    home_feed._feed_cache().clear()
+    # Las versiones iniciales salen del reloj: dos tests en el mismo
+    # milisegundo compartirían claves
+    compression._payloads = None
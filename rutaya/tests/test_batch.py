@@ -0,0 +1,159 @@
+# rutaya/tests/test_batch.py
+from datetime import date
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rutaya.models import DestinationRate, Favorite, TourPackageRate, TravelAvailability
+from rutaya.tests.factories import make_destinations, make_package, make_user, reset_caches
+from rutaya.utils.batch import BatchExecutor
+
+
+def rate(destination_id, stars=5):
+    return {'op': 'destination_rate.create', 'destinationId': destination_id, 'stars': stars,
+            'created_at': '2030-07-01'}
+
+
+class BatchExecutorTests(TestCase):
+    """Efecto neto de operaciones que se anulan o reemplazan dentro del lote."""
+
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.first, self.second = (destination.id for destination in make_destinations(2))
+
+    def run_batch(self, *operations):
+        return BatchExecutor(self.user.id, list(operations)).run()
+
+    def favorites(self):
+        return sorted(Favorite.objects.filter(user=self.user).values_list('destination_id', flat=True))
+
+    def test_add_then_remove_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = self.run_batch(
+                {'op': 'favorite.add', 'destinationId': self.first},
+                {'op': 'favorite.remove', 'destinationId': self.first},
+            )
+        # Solo las consultas de estado: ningún insert ni delete
+        self.assertEqual([query['sql'].split()[0] for query in queries.captured_queries
+                          if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))], ['SELECT'] * 3)
+        self.assertEqual([result['status'] for result in results], [201, 200])
+        self.assertNotIn('id', results[0])
+        self.assertEqual(self.favorites(), [])
+
+    def test_remove_then_add_keeps_the_row(self):
+        favorite = Favorite.objects.create(user=self.user, destination_id=self.first)
+        results = self.run_batch(
+            {'op': 'favorite.remove', 'destinationId': self.first},
+            {'op': 'favorite.add', 'destinationId': self.first},
+        )
+        self.assertEqual([result['status'] for result in results], [200, 201])
+        self.assertEqual(list(Favorite.objects.values_list('pk', flat=True)), [favorite.pk])
+
+    def test_add_twice_and_remove_missing(self):
+        results = self.run_batch(
+            {'op': 'favorite.add', 'destinationId': self.first},
+            {'op': 'favorite.add', 'destinationId': self.first},
+            {'op': 'favorite.remove', 'destinationId': self.second},
+        )
+        self.assertEqual([result['status'] for result in results], [201, 400, 404])
+        self.assertEqual(self.favorites(), [self.first])
+
+    def test_delete_then_rate_again(self):
+        old = DestinationRate.objects.create(user=self.user, destination_id=self.first, stars=2,
+                                             created_at='2030-06-01')
+        results = self.run_batch(
+            rate(self.first),  # ya calificado
+            {'op': 'destination_rate.delete', 'rateId': old.id},
+            rate(self.first, stars=4),
+        )
+        self.assertEqual([result['status'] for result in results], [400, 200, 201])
+        new = DestinationRate.objects.get(user=self.user)
+        self.assertEqual((new.id, new.stars), (results[2]['id'], 4))
+        self.assertNotEqual(new.id, old.id)
+
+    def test_rate_delete_only_own_rates(self):
+        other = make_user('luis@example.com')
+        foreign = DestinationRate.objects.create(user=other, destination_id=self.first, stars=3,
+                                                 created_at='2030-06-01')
+        results = self.run_batch({'op': 'destination_rate.delete', 'rateId': foreign.id})
+        self.assertEqual(results[0]['status'], 404)
+        self.assertTrue(DestinationRate.objects.filter(pk=foreign.pk).exists())
+
+    def test_last_availability_set_wins(self):
+        results = self.run_batch(
+            {'op': 'availability.set', 'dates': ['2030-07-10']},
+            {'op': 'favorite.add', 'destinationId': self.first},
+            {'op': 'availability.set', 'dates': ['2030-07-01', '2030-07-02']},
+        )
+        self.assertEqual([result['status'] for result in results], [200, 201, 200])
+        self.assertEqual(list(TravelAvailability.objects.values_list('start_date', 'end_date')),
+                         [(date(2030, 7, 1), date(2030, 7, 2))])
+
+
+class BatchViewTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.first, self.second = (destination.id for destination in make_destinations(2))
+        self.package = make_package(self.user)
+
+    def post(self, *operations, user_id=None):
+        return self.client.post('/api/v1/batch/', {
+            'userId': user_id or self.user.id, 'operations': list(operations),
+        }, content_type='application/json')
+
+    def test_results_by_index_with_ids(self):
+        response = self.post(
+            {'op': 'favorite.add', 'destinationId': self.first},
+            {'op': 'favorite.fly'},
+            {'op': 'favorite.add', 'destinationId': 999999},
+            {'op': 'package_rate.create', 'tourPackageId': self.package.id, 'stars': 4,
+             'created_at': '2030-07-01'},
+            {'op': 'destination_rate.create', 'destinationId': self.second},
+            {'op': 'favorite.add', 'destinationId': self.second},
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        results = body['results']
+        self.assertEqual([(result['index'], result['op'], result['status']) for result in results], [
+            (0, 'favorite.add', 201),
+            (1, 'favorite.fly', 400),
+            (2, 'favorite.add', 404),
+            (3, 'package_rate.create', 201),
+            (4, 'destination_rate.create', 400),
+            (5, 'favorite.add', 201),
+        ])
+        self.assertEqual(results[1]['error'], 'Operación desconocida: favorite.fly')
+        self.assertIn('stars', results[4]['details'])
+        self.assertEqual(results[0]['id'], Favorite.objects.get(destination_id=self.first).id)
+        self.assertEqual(results[5]['id'], Favorite.objects.get(destination_id=self.second).id)
+        self.assertEqual(results[3]['id'], TourPackageRate.objects.get().id)
+        self.assertEqual(body['summary'], {'succeeded': 3, 'failed': 3})
+
+    def test_missing_user(self):
+        response = self.post({'op': 'favorite.add', 'destinationId': self.first}, user_id=999999)
+        self.assertEqual(response.status_code, 404)
+
+    def test_concurrent_write_returns_409_and_rolls_back(self):
+        load_state = BatchExecutor._load_state
+
+        def racing_load_state(executor, operations):
+            load_state(executor, operations)
+            # Otra petición califica el mismo paquete después de la lectura
+            TourPackageRate.objects.create(user=self.user, tour_package=self.package, stars=1,
+                                           created_at='2030-06-01')
+
+        with mock.patch.object(BatchExecutor, '_load_state', racing_load_state):
+            response = self.post(
+                {'op': 'favorite.add', 'destinationId': self.first},
+                {'op': 'package_rate.create', 'tourPackageId': self.package.id, 'stars': 4,
+                 'created_at': '2030-07-01'},
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('reintenta', response.json()['error'])
+        # El favorito, escrito antes en el mismo lote, se deshizo
+        self.assertFalse(Favorite.objects.exists())
+        self.assertEqual(TourPackageRate.objects.get().stars, 1)
@@ -0,0 +1,102 @@
+# rutaya/tests/test_bootstrap.py
+from unittest import mock
+
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from rutaya.models import Favorite, TravelAvailability, UserPreferences
+from rutaya.tests.factories import make_destinations, make_package, make_user, reset_caches
+from rutaya.utils.home_feed import _feed_cache
+from rutaya.views.bootstrap import build_bootstrap_payload
+
+
+class BootstrapData:
+    def create_data(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.destinations = make_destinations(10)
+        UserPreferences.objects.create(user=self.user, travel_interests=['Aventura'], adrenaline_level=7)
+        Favorite.objects.create(user=self.user, destination=self.destinations[3])
+        TravelAvailability.objects.create(user=self.user, start_date='2030-07-01', end_date='2030-07-03')
+        make_package(self.user)
+
+    def check_payload(self, data):
+        self.assertEqual(data['preferences']['travel_interests'], ['Aventura'])
+        self.assertEqual(data['travels']['ranges'], [{'start': '2030-07-01', 'end': '2030-07-03'}])
+        self.assertEqual([package['title'] for package in data['packages']], ['Cusco mágico'])
+        self.assertEqual(len(data['packages'][0]['itinerary']), 2)
+        favorites = {
+            destination['id'] for category in data['home']['categories']
+            for destination in category['destinations'] if destination['isFavorite']
+        }
+        self.assertEqual(favorites, {self.destinations[3].id})
+
+
+@override_settings(PARALLEL_MAX_WORKERS=0)
+class BootstrapViewTests(BootstrapData, TestCase):
+    def setUp(self):
+        self.create_data()
+
+    def test_payload_and_query_count(self):
+        # Usuario, preferencias, favoritos, rangos, paquetes e itinerario; el
+        # catálogo y los populares quedan armados desde la primera llamada
+        self.client.get(f'/api/v1/bootstrap/{self.user.id}/')
+        _feed_cache().clear()
+        with self.assertNumQueries(6):
+            response = self.client.get(f'/api/v1/bootstrap/{self.user.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.check_payload(response.json())
+
+    def test_include_limits_sections_and_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/v1/bootstrap/{self.user.id}/?include=travels,preferences')
+        self.assertEqual(sorted(response.json()), ['message', 'preferences', 'travels', 'userId'])
+
+    def test_unknown_user(self):
+        self.assertEqual(self.client.get('/api/v1/bootstrap/999999/').status_code, 404)
+
+
+class ParallelBootstrapTests(BootstrapData, TransactionTestCase):
+    # Los hilos del pool usan sus propias conexiones: los datos tienen que estar confirmados
+    def setUp(self):
+        self.create_data()
+
+    def build(self):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        _feed_cache().clear()
+        with connection.execute_wrapper(count):
+            data = build_bootstrap_payload(self.user, {'preferences', 'home', 'travels', 'packages'})
+        return data, queries
+
+    def test_same_payload_and_queries_as_sequential(self):
+        with override_settings(PARALLEL_MAX_WORKERS=0):
+            self.build()
+            sequential, sequential_queries = self.build()
+        parallel, parallel_queries = self.build()
+        self.check_payload(parallel)
+        self.assertEqual(parallel['packages'], sequential['packages'])
+        self.assertEqual(len(parallel_queries), len(sequential_queries))
+
+    def test_pool_threads_reuse_their_connections(self):
+        opened = []
+
+        def record(sender, connection, **kwargs):
+            opened.append(connection)
+
+        wrapper_class = type(connections['default'])
+        connection_created.connect(record)
+        try:
+            with mock.patch.object(wrapper_class, 'close', autospec=True, side_effect=wrapper_class.close) as close:
+                for _ in range(10):
+                    self.build()
+        finally:
+            connection_created.disconnect(record)
+        # Como mucho una por hilo del pool, no una por sección y llamada
+        self.assertLessEqual(len(opened), 4)
+        self.assertEqual(close.call_count, 0)
@@ -0,0 +1,134 @@
+# rutaya/tests/test_catalog.py
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from rutaya.models import Favorite
+from rutaya.tests.factories import make_destinations, make_user, reset_caches
+from rutaya.utils.catalog import Catalog
+from rutaya.views import catalog as catalog_views
+from rutaya.views.catalog import build_home_payload
+
+# (id, name, location, description, image_url, category_id, image), ordenadas por (categoría, id)
+DESTINATION_ROWS = [
+    (5, 'Machu Picchu', 'Cusco', 'Ciudadela inca', None, 1, None),
+    (9, 'Sacsayhuamán', 'Cusco', 'Fortaleza', None, 1, None),
+    (2, 'Máncora', 'Piura', 'Playa', None, 2, None),
+    (7, 'Paracas', 'Ica', 'Reserva', None, 2, None),
+    (8, 'Huacachina', 'Ica', 'Oasis', None, 2, None),
+]
+CATEGORY_ROWS = [(2, 'Playas'), (1, 'Arqueología'), (3, 'Vacía')]
+
+
+def favorite_ids(destinations):
+    return [destination['id'] for destination in destinations if destination['isFavorite']]
+
+
+class CatalogTests(SimpleTestCase):
+    def setUp(self):
+        self.catalog = Catalog(DESTINATION_ROWS, CATEGORY_ROWS, version=1)
+
+    def test_favorites_bitmap(self):
+        self.assertEqual(self.catalog.favorites_bitmap([]), 0)
+        self.assertEqual(self.catalog.favorites_bitmap([5, 8]), 0b10001)
+        # Destinos fuera del catálogo (borrados, de otra versión) se ignoran
+        self.assertEqual(self.catalog.favorites_bitmap({9, 404}), 0b00010)
+
+    def test_overlay_marks_only_the_bitmap_rows(self):
+        bitmap = self.catalog.favorites_bitmap([9, 7])
+        self.assertEqual(favorite_ids(self.catalog.destinations(0, 5, bitmap)), [9, 7])
+        # Una ventana desplazada lee los bits de su tramo
+        self.assertEqual(favorite_ids(self.catalog.destinations(2, 5, bitmap)), [7])
+        self.assertEqual([d['id'] for d in self.catalog.destinations(2, 5, bitmap)], [2, 7, 8])
+        self.assertTrue(self.catalog.destination(1, bitmap)['isFavorite'])
+        self.assertFalse(self.catalog.destination(0, bitmap)['isFavorite'])
+
+    def test_categories_are_contiguous_slices(self):
+        bitmap = self.catalog.favorites_bitmap([2])
+        by_name = self.catalog.categories(bitmap, order_by='name')
+        self.assertEqual([category['name'] for category in by_name], ['Arqueología', 'Playas', 'Vacía'])
+        self.assertEqual([[d['id'] for d in category['destinations']] for category in by_name], [[5, 9], [2, 7, 8], []])
+        self.assertEqual(favorite_ids(by_name[1]['destinations']), [2])
+        self.assertEqual([category['id'] for category in self.catalog.categories(bitmap)], [1, 2, 3])
+
+    def test_editing_a_response_list_does_not_touch_the_shared_rows(self):
+        plain, starred = list(self.catalog.plain), list(self.catalog.starred)
+        bitmap = self.catalog.favorites_bitmap([5])
+        result = self.catalog.destinations(0, 5, bitmap)
+        result[0] = {'id': 0}
+        result.append({'id': -1})
+        del result[1]
+        for category in self.catalog.categories(bitmap):
+            category['destinations'].clear()
+        self.assertEqual(self.catalog.plain, plain)
+        self.assertEqual(self.catalog.starred, starred)
+        self.assertEqual(favorite_ids(self.catalog.destinations(0, 5, bitmap)), [5])
+
+    def test_home_popular_entries_are_copies(self):
+        snapshot = [dict(data) for data in self.catalog.plain + self.catalog.starred]
+        with mock.patch.object(catalog_views, 'get_catalog', return_value=self.catalog), \
+                mock.patch.object(catalog_views, 'get_popular', return_value=[(7, 3), (5, 1)]):
+            payload = build_home_payload({5}, rng=random.Random(1))
+
+        self.assertEqual([(d['id'], d['favorites_count'], d['isFavorite']) for d in payload['popular'][:2]],
+                         [(7, 3, False), (5, 1, True)])
+        payload['popular'][0]['name'] = 'Editado'
+        self.assertEqual([dict(data) for data in self.catalog.plain + self.catalog.starred], snapshot)
+
+
+class FavoriteFlagTests(TestCase):
+    """isFavorite en categorías y home tras cada camino de escritura de favoritos."""
+
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.first, self.second = (destination.id for destination in make_destinations(2))
+
+    def write(self, method, url, data):
+        # on_commit no corre dentro de TestCase: se ejecuta a mano (versión del home)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, {'userId': self.user.id, **data},
+                                                   content_type='application/json')
+        self.assertLess(response.status_code, 300, response.content)
+        return response
+
+    def favorite(self, method, destination_id):
+        url = '/api/v1/favorites/add/' if method == 'post' else '/api/v1/favorites/remove/'
+        return self.write(method, url, {'destinationId': destination_id})
+
+    def batch(self, *operations):
+        return self.write('post', '/api/v1/batch/', {'operations': list(operations)})
+
+    def flags(self):
+        categories = self.client.get(f'/api/v1/categories/{self.user.id}/').json()['categories']
+        home = self.client.get(f'/api/v1/home/{self.user.id}/').json()['categories']
+        by_categories = sorted(d['id'] for c in categories for d in c['destinations'] if d['isFavorite'])
+        by_home = sorted(d['id'] for c in home for d in c['destinations'] if d['isFavorite'])
+        self.assertEqual(by_categories, by_home)
+        return by_categories
+
+    def test_add_and_remove(self):
+        self.assertEqual(self.flags(), [])
+        self.favorite('post', self.first)
+        self.assertEqual(self.flags(), [self.first])
+        self.favorite('delete', self.first)
+        self.assertEqual(self.flags(), [])
+
+    def test_batch(self):
+        self.favorite('post', self.first)
+        self.assertEqual(self.flags(), [self.first])
+        self.batch(
+            {'op': 'favorite.remove', 'destinationId': self.first},
+            {'op': 'favorite.add', 'destinationId': self.second},
+        )
+        self.assertEqual(self.flags(), [self.second])
+        self.assertEqual(list(Favorite.objects.values_list('destination_id', flat=True)), [self.second])
+
+    def test_shared_rows_stay_clean_after_serving(self):
+        self.favorite('post', self.first)
+        self.flags()
+        shared = catalog_views.get_catalog()
+        self.assertTrue(all(data['isFavorite'] is False for data in shared.plain))
+        self.assertTrue(all(data['isFavorite'] is True for data in shared.starred))
+        self.assertTrue(all('favorites_count' not in data for data in shared.plain + shared.starred))
@@ -0,0 +1,144 @@
+# rutaya/tests/test_compression.py
+import gzip
+import json
+from unittest import mock
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from rutaya.middleware import CompressionMiddleware
+from rutaya.models import DestinationRate
+from rutaya.tests.factories import make_destinations, make_user, reset_caches
+from rutaya.utils import compression
+
+BODY = json.dumps({'items': ['Machu Picchu'] * 200}).encode()
+
+
+def fake_encoder(name):
+    return lambda data: name.encode() + b':' + data[:10]
+
+
+# br y zstd son opcionales: se reemplazan para no depender de lo instalado
+ALL_ENCODERS = {'br': fake_encoder('br'), 'zstd': fake_encoder('zstd'), 'gzip': compression._gzip}
+
+
+@mock.patch.object(compression, 'ENCODERS', ALL_ENCODERS)
+class NegotiateTests(SimpleTestCase):
+    def test_preference_and_quality(self):
+        self.assertEqual(compression.negotiate('gzip, deflate, br'), 'br')
+        self.assertEqual(compression.negotiate('gzip, zstd'), 'zstd')
+        self.assertEqual(compression.negotiate('br;q=0.5, gzip'), 'gzip')
+        self.assertEqual(compression.negotiate('GZIP ; q=0.8'), 'gzip')
+
+    def test_nothing_acceptable(self):
+        self.assertIsNone(compression.negotiate(''))
+        self.assertIsNone(compression.negotiate('identity'))
+        self.assertIsNone(compression.negotiate('deflate'))
+        self.assertIsNone(compression.negotiate('gzip;q=0, br;q=0, zstd;q=0'))
+        self.assertIsNone(compression.negotiate('gzip;q=nope'))
+
+    def test_wildcard(self):
+        self.assertEqual(compression.negotiate('*'), 'br')
+        self.assertEqual(compression.negotiate('*;q=0.1, gzip'), 'gzip')
+        self.assertEqual(compression.negotiate('br;q=0, *'), 'zstd')
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def get(self, response, path='/api/v1/community/list/', encoding='gzip'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, body=BODY, **headers):
+        response = HttpResponse(body, content_type='application/json')
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def test_gzip_with_vary(self):
+        response = self.get(self.json_response(ETag='"abc"'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_vary_even_when_the_client_does_not_accept_compression(self):
+        response = self.get(self.json_response(), encoding='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.content, BODY)
+
+    def test_small_or_binary_bodies_stay_as_they_are(self):
+        response = self.get(self.json_response(b'{}'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        image = HttpResponse(BODY, content_type='image/png')
+        self.assertFalse(self.get(image).has_header('Content-Encoding'))
+
+    def test_already_encoded_response_is_not_touched(self):
+        precompressed = compression._gzip(BODY)
+        response = self.get(self.json_response(precompressed, **{'Content-Encoding': 'gzip'}))
+        self.assertEqual(response.content, precompressed)
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_streaming_response_is_not_touched(self):
+        streaming = StreamingHttpResponse(iter([BODY]), content_type='application/json')
+        response = self.get(streaming)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), BODY)
+
+    def test_excluded_paths(self):
+        response = self.get(self.json_response(), path='/api/v1/auth/login/')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, BODY)
+
+
+@override_settings(COMPRESSION_MIN_BYTES=1)
+class PrecompressedListingTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.destinations = make_destinations(2)
+
+    def listing(self, encoding='gzip'):
+        response = self.client.get('/api/v1/rate-destinations/list/', HTTP_ACCEPT_ENCODING=encoding)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = response.content
+        if response.has_header('Content-Encoding'):
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            body = gzip.decompress(body)
+        return response, sorted(rate['stars'] for rate in json.loads(body)['rates'])
+
+    def rate(self, destination, stars):
+        # on_commit no corre dentro de TestCase: la versión 'rates' se incrementa a mano
+        with self.captureOnCommitCallbacks(execute=True):
+            DestinationRate.objects.create(user=self.user, destination=destination, stars=stars,
+                                           created_at='2030-07-01')
+
+    def test_variants_are_built_once_and_shared(self):
+        self.rate(self.destinations[0], 5)
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first, stars = self.listing()
+            second, _ = self.listing()
+            plain, plain_stars = self.listing(encoding='')
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(stars, plain_stars)
+        self.assertEqual(stars, [5])
+
+    def test_a_new_version_is_not_served_from_the_old_payload(self):
+        self.rate(self.destinations[0], 5)
+        self.assertEqual(self.listing()[1], [5])
+        self.rate(self.destinations[1], 3)
+        self.assertEqual(self.listing()[1], [3, 5])
+        self.assertEqual(self.listing(encoding='')[1], [3, 5])
+
+    def test_same_version_is_served_from_the_cache(self):
+        self.rate(self.destinations[0], 5)
+        self.listing()
+        # Una escritura sin incrementar la versión (bump pendiente de on_commit) no se ve
+        DestinationRate.objects.create(user=self.user, destination=self.destinations[1], stars=3,
+                                       created_at='2030-07-01')
+        self.assertEqual(self.listing()[1], [5])
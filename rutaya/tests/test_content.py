@@ -0,0 +1,77 @@
+# rutaya/tests/test_content.py
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from rutaya.models import User
+from rutaya.tests.test_package_output import package_json
+from rutaya.utils.llm_backends import FakeBackend, route_for
+from rutaya.utils.llm_client import ResilientClient
+from rutaya.utils.package_output import PackageOutput
+
+URL = '/api/v1/content/generate/'
+
+# Negaciones, preguntas y menciones del paquete que no lo piden
+NOT_A_REQUEST = (
+    "Creo que todavía no quiero un paquete",
+    "¿Hace frío en Cusco? No quiero paquete aún",
+    "ya puedes decirme el clima",
+    "Generalmente viajo solo, ¿paquete para 1?",
+    "No me generes el paquete todavía",
+    "¿Cuánto cuesta un paquete a Arequipa?",
+)
+
+
+class RouteForTests(SimpleTestCase):
+    def test_only_explicit_mode_routes_to_package(self):
+        self.assertEqual(route_for('package'), 'package')
+        for mode in ('chat', None, '', 'paquete'):
+            self.assertEqual(route_for(mode), 'chat')
+
+
+class ProcessIaMessageViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='ana@example.com', first_name='Ana')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, message, **extra):
+        return self.client.post(URL, {'userId': self.user.id, 'currentMessage': message, **extra}, format='json')
+
+    def test_messages_without_mode_stay_in_chat(self):
+        with mock.patch('rutaya.views.content.generate', return_value="¿Para cuántas personas?") as generate, \
+                mock.patch('rutaya.views.content.generate_package') as generate_package:
+            for message in NOT_A_REQUEST + ("Ok, listo, genéralo",):
+                with self.subTest(message=message):
+                    response = self.post(message)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertNotIn('package', response.data)
+                    self.assertEqual(generate.call_args.kwargs['route'], 'chat')
+        generate_package.assert_not_called()
+
+    def test_package_mode_generates_the_package(self):
+        output = PackageOutput({'title': 'Cusco'}, '{"title": "Cusco"}')
+        with mock.patch('rutaya.views.content.generate') as generate, \
+                mock.patch('rutaya.views.content.generate_package', return_value=output) as generate_package:
+            response = self.post("Ok, listo, genéralo", mode='package')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['package'], {'title': 'Cusco'})
+        self.assertEqual(generate_package.call_args.kwargs['route'], 'package')
+        generate.assert_not_called()
+
+    def test_unknown_mode_is_rejected(self):
+        self.assertEqual(self.post("Hola", mode='paquete').status_code, 400)
+
+    def test_package_json_in_chat_reply_is_validated(self):
+        # El usuario confirmó en la conversación y el modelo respondió con el JSON
+        client = ResilientClient('test', FakeBackend().call, retries=0)
+        with mock.patch('rutaya.views.content.generate', return_value=f"Aquí tienes:\n{package_json()}"), \
+                mock.patch('rutaya.utils.package_output.get_client', return_value=client):
+            response = self.post("Sí, somos 2, ya puedes generarlo")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['package']['days'], 4)
+        self.assertEqual(json.loads(response.data['botMessage']), response.data['package'])
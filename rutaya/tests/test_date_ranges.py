@@ -0,0 +1,82 @@
+# rutaya/tests/test_date_ranges.py
+from datetime import date
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rutaya.models import TravelAvailability, User
+from rutaya.serializers import sync_travel_dates
+from rutaya.tests.factories import make_user
+from rutaya.utils.date_ranges import (
+    dates_to_ranges, expand_ranges, format_ranges, merge_ranges, overlap_days, subtract_ranges,
+)
+
+days_to_ranges = import_module('rutaya.migrations.0014_travel_availability_ranges').days_to_ranges
+
+
+def d(day, month=7):
+    return date(2030, month, day)
+
+
+class DateRangeTests(SimpleTestCase):
+    def test_merge_adjacent_and_overlapping(self):
+        self.assertEqual(merge_ranges([(d(6), d(9)), (d(1), d(5))]), [(d(1), d(9))])
+        self.assertEqual(merge_ranges([(d(1), d(5)), (d(3), d(4))]), [(d(1), d(5))])
+        self.assertEqual(merge_ranges([(d(1), d(5)), (d(7), d(9))]), [(d(1), d(5)), (d(7), d(9))])
+        # Fin de mes
+        self.assertEqual(merge_ranges([(d(28, 2), d(28, 2)), (d(1, 3), d(2, 3))]), [(d(28, 2), d(2, 3))])
+
+    def test_single_days(self):
+        self.assertEqual(dates_to_ranges([d(3), d(1), d(2), d(5), d(5)]), [(d(1), d(3)), (d(5), d(5))])
+        self.assertEqual(list(expand_ranges([(d(1), d(2)), (d(5), d(5))])), [d(1), d(2), d(5)])
+        self.assertEqual(format_ranges([(d(5), d(5)), (d(1), d(3))]),
+                         ['2030-07-05', 'del 2030-07-01 al 2030-07-03 (3 días)'])
+
+    def test_subtract_from_the_middle(self):
+        self.assertEqual(subtract_ranges([(d(1), d(10))], [(d(4), d(6))]), [(d(1), d(3)), (d(7), d(10))])
+        self.assertEqual(subtract_ranges([(d(1), d(10))], [(d(5), d(5))]), [(d(1), d(4)), (d(6), d(10))])
+
+    def test_subtract_edges_and_several_cuts(self):
+        self.assertEqual(subtract_ranges([(d(1), d(10))], [(d(1), d(1)), (d(10), d(12))]), [(d(2), d(9))])
+        self.assertEqual(subtract_ranges([(d(1), d(3)), (d(5), d(9))], [(d(2), d(6)), (d(8), d(8))]),
+                         [(d(1), d(1)), (d(7), d(7)), (d(9), d(9))])
+        self.assertEqual(subtract_ranges([(d(1), d(3))], [(d(1), d(3))]), [])
+        self.assertEqual(subtract_ranges([(d(5), d(6))], [(d(1), d(2)), (d(8), d(9))]), [(d(5), d(6))])
+
+    def test_overlap_days(self):
+        self.assertEqual(overlap_days([(d(1), d(10))], [(d(10), d(12))]), 1)
+        self.assertEqual(overlap_days([(d(1), d(3)), (d(6), d(9))], [(d(2), d(7))]), 4)
+        self.assertEqual(overlap_days([(d(1), d(3))], [(d(4), d(5))]), 0)
+
+
+class DaysToRangesMigrationTests(TestCase):
+    def test_consecutive_days_of_each_user_are_merged(self):
+        ana, luis = make_user('ana@example.com'), make_user('luis@example.com')
+        for user, day in [(ana, d(1)), (ana, d(2)), (ana, d(3)), (ana, d(5)), (luis, d(3)), (luis, d(4)),
+                          (ana, d(31)), (ana, d(1, 8))]:
+            TravelAvailability.objects.create(user=user, start_date=day, end_date=day)
+        days_to_ranges(apps, None)
+        self.assertEqual(self.rows(ana), [(d(1), d(3)), (d(5), d(5)), (d(31), d(1, 8))])
+        self.assertEqual(self.rows(luis), [(d(3), d(4))])
+
+    @staticmethod
+    def rows(user):
+        return list(TravelAvailability.objects.filter(user=user).values_list('start_date', 'end_date'))
+
+
+class SyncTravelDatesLockTests(TestCase):
+    def test_user_row_is_locked_before_reading(self):
+        user = make_user('ana@example.com')
+        # SQLite no tiene FOR UPDATE: se simula un backend que sí
+        with mock.patch.object(connection.features, 'has_select_for_update', True), \
+                mock.patch.object(User.objects, 'select_for_update', wraps=User.objects.all) as lock, \
+                CaptureQueriesContext(connection) as queries:
+            sync_travel_dates(user.id, dates=[d(1)])
+        lock.assert_called_once_with()
+        sql = [query['sql'] for query in queries.captured_queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertIn('"users"', sql[0])
+        self.assertIn('"travel_availabilities"', sql[1])
@@ -0,0 +1,139 @@
+# rutaya/tests/test_home_feed.py
+from contextlib import contextmanager
+from datetime import date
+
+from django.test import TestCase
+
+from rutaya.models import Favorite, TravelAvailability, UserPreferences
+from rutaya.serializers import sync_travel_dates
+from rutaya.tests.factories import make_destinations, make_user, reset_caches
+from rutaya.utils import home_feed, versions
+from rutaya.utils.versions import get_version
+
+
+class HomeVersionTests(TestCase):
+    """Cada camino de escritura que cambia el home incrementa la versión del usuario."""
+
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.first, self.second = (destination.id for destination in make_destinations(2))
+
+    def version(self):
+        return get_version(home_feed._version_name(self.user.id), home_feed.VERSION_TIMEOUT)
+
+    @contextmanager
+    def assertBumps(self, bumped=True):
+        before = self.version()
+        # on_commit no corre dentro de TestCase
+        with self.captureOnCommitCallbacks(execute=True):
+            yield
+        if bumped:
+            self.assertGreater(self.version(), before)
+        else:
+            self.assertEqual(self.version(), before)
+
+    def post(self, url, data, method='post'):
+        response = getattr(self.client, method)(url, {'userId': self.user.id, **data}, content_type='application/json')
+        self.assertLess(response.status_code, 500, response.content)
+        return response
+
+    def test_favorite_views(self):
+        with self.assertBumps():
+            self.post('/api/v1/favorites/add/', {'destinationId': self.first})
+        with self.assertBumps(bumped=False):
+            self.post('/api/v1/favorites/add/', {'destinationId': self.first})
+        with self.assertBumps():
+            self.post('/api/v1/favorites/remove/', {'destinationId': self.first}, method='delete')
+        with self.assertBumps(bumped=False):
+            self.post('/api/v1/favorites/remove/', {'destinationId': self.first}, method='delete')
+
+    def test_travel_view(self):
+        with self.assertBumps():
+            self.post('/api/v1/travels/add/', {'dates': ['2030-07-01', '2030-07-02']})
+        with self.assertBumps():
+            self.post('/api/v1/travels/add/', {'remove': ['2030-07-02']})
+        with self.assertBumps(bumped=False):
+            self.post('/api/v1/travels/add/', {'remove': ['2030-07-20']})
+
+    def test_sync_travel_dates(self):
+        with self.assertBumps():
+            sync_travel_dates(self.user.id, dates=[date(2030, 7, 1)])
+        with self.assertBumps(bumped=False):
+            sync_travel_dates(self.user.id, dates=[date(2030, 7, 1)])
+        with self.assertBumps():
+            sync_travel_dates(self.user.id, dates=[])
+
+    def test_batch(self):
+        for operations in (
+            [{'op': 'favorite.add', 'destinationId': self.first}],
+            [{'op': 'favorite.remove', 'destinationId': self.first}],
+            [{'op': 'availability.set', 'dates': ['2030-07-01']}],
+        ):
+            with self.subTest(operations[0]['op']), self.assertBumps():
+                self.post('/api/v1/batch/', {'operations': operations})
+        # Agregar y quitar en el mismo lote no escribe nada
+        with self.assertBumps(bumped=False):
+            self.post('/api/v1/batch/', {'operations': [
+                {'op': 'favorite.add', 'destinationId': self.second},
+                {'op': 'favorite.remove', 'destinationId': self.second},
+            ]})
+
+    def test_instance_deletes(self):
+        favorite = Favorite.objects.create(user=self.user, destination_id=self.first)
+        availability = TravelAvailability.objects.create(
+            user=self.user, start_date=date(2030, 7, 1), end_date=date(2030, 7, 1)
+        )
+        with self.assertBumps():
+            favorite.delete()
+        with self.assertBumps():
+            availability.delete()
+
+    def test_preferences(self):
+        with self.assertBumps():
+            preferences = UserPreferences.objects.create(user=self.user)
+        with self.assertBumps():
+            preferences.delete()
+
+    def test_user_deletion(self):
+        with self.assertBumps():
+            self.user.delete()
+
+
+class StaleHomeTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.destination, = make_destinations(1)
+
+    def home(self):
+        return self.client.get(f'/api/v1/home/{self.user.id}/')
+
+    def favorite_flags(self, response):
+        return [d['isFavorite'] for c in response.json()['categories'] for d in c['destinations']]
+
+    def test_deleted_favorite_is_not_served_from_the_cache(self):
+        favorite = Favorite.objects.create(user=self.user, destination=self.destination)
+        self.assertEqual(self.favorite_flags(self.home()), [True])
+        with self.captureOnCommitCallbacks(execute=True):
+            favorite.delete()
+        self.assertEqual(self.favorite_flags(self.home()), [False])
+
+    def test_deleted_user_gets_404_instead_of_the_cached_home(self):
+        user_id = self.user.id
+        self.assertEqual(self.home().status_code, 200)
+        self.assertIn(user_id, home_feed._feed_cache())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertNotIn(user_id, home_feed._feed_cache())
+        self.assertEqual(self.home().status_code, 404)
+        self.assertEqual(self.client.get(f'/api/v1/categories/{user_id}/').status_code, 404)
+
+    def test_other_worker_invalidation(self):
+        # Otro proceso solo incrementa la versión compartida: el home en memoria no se expulsa
+        Favorite.objects.create(user=self.user, destination=self.destination)
+        self.home()
+        Favorite.objects.filter(user=self.user).delete()
+        versions._increment(home_feed._version_name(self.user.id), home_feed.VERSION_TIMEOUT)
+        self.assertIn(self.user.id, home_feed._feed_cache())
+        self.assertEqual(self.favorite_flags(self.home()), [False])
@@ -0,0 +1,185 @@
+# rutaya/tests/test_llm_client.py
+import random
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from rutaya.management.commands.llm_chaos import FaultyModel, FlakyBackendError
+from rutaya.utils.llm_client import CircuitBreaker, LLMTimeout, LLMUnavailable, ResilientClient
+from rutaya.utils.llm_quota import PRIORITY_DEFAULT, PRIORITY_PAID, PrioritySemaphore
+
+
+class ScriptedCall:
+    """Función de backend que responde según una lista de pasos: una excepción, segundos de demora o texto."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, timeout=None, **options):
+        with self._lock:
+            step = self.steps[min(self.calls, len(self.steps) - 1)]
+            self.calls += 1
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, (int, float)):
+            time.sleep(step)
+            return f"lenta a {prompt}"
+        return step
+
+
+def make_client(call, **options):
+    options = {'timeout': 2.0, 'retries': 2, 'backoff': (0.001, 0.002), 'retryable': (FlakyBackendError,), **options}
+    return ResilientClient('test', call, **options)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('rutaya.utils.llm_client.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(LLMUnavailable):
+            self.breaker.before_call()
+
+    def test_success_resets_failure_count(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_a_single_trial_through(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 30
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(LLMUnavailable):
+            self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.before_call()
+
+    def test_failed_trial_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 30
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.now += 29
+        with self.assertRaises(LLMUnavailable):
+            self.breaker.before_call()
+
+
+class ResilientClientTests(SimpleTestCase):
+    def test_retries_retryable_errors(self):
+        call = ScriptedCall(FlakyBackendError(), FlakyBackendError(), "ok")
+        self.assertEqual(make_client(call)("hola"), "ok")
+        self.assertEqual(call.calls, 3)
+
+    def test_gives_up_after_retries(self):
+        call = ScriptedCall(FlakyBackendError())
+        with self.assertRaises(FlakyBackendError):
+            make_client(call, retries=1)("hola")
+        self.assertEqual(call.calls, 2)
+
+    def test_non_retryable_errors_propagate_without_opening_the_circuit(self):
+        call = ScriptedCall(ValueError("pedido inválido"))
+        client = make_client(call, breaker=CircuitBreaker('test', failure_threshold=1))
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                client("hola")
+        self.assertEqual(call.calls, 3)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_deadline_covers_the_whole_call(self):
+        client = make_client(ScriptedCall(1.0), timeout=0.05, retries=0)
+        start = time.monotonic()
+        with self.assertRaises(LLMTimeout):
+            client("hola")
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_options_reach_the_backend(self):
+        seen = {}
+
+        def call(prompt, timeout=None, **options):
+            seen.update(options, timeout=timeout)
+            return "ok"
+
+        make_client(call)("hola", json_schema={'type': 'object'})
+        self.assertEqual(seen['json_schema'], {'type': 'object'})
+        self.assertLessEqual(seen['timeout'], 2.0)
+
+    def test_hedges_slow_attempts(self):
+        call = ScriptedCall(1.0, "rápida")
+        client = make_client(call, hedge_percentile=95, hedge_min_samples=5)
+        for _ in range(5):
+            client.latencies.add(0.01)
+        start = time.monotonic()
+        self.assertEqual(client("hola"), "rápida")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(call.calls, 2)
+
+    def test_no_hedging_without_enough_samples(self):
+        call = ScriptedCall(0.05, "rápida")
+        client = make_client(call, hedge_percentile=95, hedge_min_samples=5)
+        self.assertEqual(client("hola"), "lenta a hola")
+        self.assertEqual(call.calls, 1)
+
+    def test_outage_opens_the_circuit(self):
+        model = FaultyModel(random.Random(1), latency=0, slow_rate=0, slow_factor=1, error_rate=0, outage=60)
+        client = make_client(model, retries=0, breaker=CircuitBreaker('test', failure_threshold=3))
+        for _ in range(3):
+            with self.assertRaises(FlakyBackendError):
+                client("hola")
+        with self.assertRaises(LLMUnavailable):
+            client("hola")
+        self.assertEqual(model.calls, 3)
+
+
+class PrioritySemaphoreTests(SimpleTestCase):
+    def test_paid_waiters_go_first(self):
+        semaphore = PrioritySemaphore(1)
+        semaphore.acquire()
+        order = []
+
+        def wait(priority, name):
+            semaphore.acquire(priority)
+            order.append(name)
+            semaphore.release()
+
+        threads = []
+        for priority, name in ((PRIORITY_DEFAULT, 'free1'), (PRIORITY_DEFAULT, 'free2'), (PRIORITY_PAID, 'paid')):
+            thread = threading.Thread(target=wait, args=(priority, name))
+            thread.start()
+            threads.append(thread)
+            while semaphore.waiting < len(threads):
+                time.sleep(0.001)
+        semaphore.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ['paid', 'free1', 'free2'])
+
+    def test_timeout_gives_up_the_place_in_line(self):
+        semaphore = PrioritySemaphore(1)
+        self.assertTrue(semaphore.acquire())
+        self.assertFalse(semaphore.acquire(timeout=0.01))
+        self.assertEqual(semaphore.waiting, 0)
+        # El lugar liberado no se pierde en el que ya se fue
+        semaphore.release()
+        self.assertTrue(semaphore.acquire(timeout=0.01))
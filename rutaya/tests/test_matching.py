@@ -0,0 +1,153 @@
+# rutaya/tests/test_matching.py
+import random
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from rutaya.models import Favorite, TravelAvailability, User
+from rutaya.tests.factories import make_destinations, make_user
+from rutaya.utils import matching
+from rutaya.utils.bitsets import at_least, bit_positions, range_bits
+from rutaya.utils.matching import MatchIndex
+
+TODAY = date(2030, 1, 1)
+A, B, C = 10, 20, 30  # destinos
+
+
+def jan(day):
+    return TODAY + timedelta(days=day - 1)
+
+
+class BitsetTests(SimpleTestCase):
+    def test_range_bits_and_positions(self):
+        self.assertEqual(range_bits(2, 4), 0b11100)
+        self.assertEqual(list(bit_positions(0b101001)), [0, 3, 5])
+        self.assertEqual(list(bit_positions(0)), [])
+
+    def test_at_least_by_hand(self):
+        #   posición:  4 3 2 1 0
+        a = 0b00111  # . . x x x
+        b = 0b01110  # . x x x .
+        c = 0b11100  # x x x . .
+        # conteos:     1 2 3 2 1
+        bitsets = [a, b, c]
+        self.assertEqual(at_least(bitsets, 0, 5), 0b11111)
+        self.assertEqual(at_least(bitsets, 1, 5), 0b11111)
+        self.assertEqual(at_least(bitsets, 2, 5), 0b01110)
+        self.assertEqual(at_least(bitsets, 3, 5), 0b00100)
+        self.assertEqual(at_least(bitsets, 4, 5), 0)
+        self.assertEqual(at_least([], 1, 5), 0)
+
+    def test_at_least_matches_counting(self):
+        rng = random.Random(7)
+        width = 70
+        for _ in range(50):
+            bitsets = [rng.getrandbits(width) for _ in range(rng.randint(1, 12))]
+            for n in range(1, len(bitsets) + 2):
+                expected = sum(
+                    1 << position for position in range(width)
+                    if sum((bitset >> position) & 1 for bitset in bitsets) >= n
+                )
+                self.assertEqual(at_least(bitsets, n, width), expected)
+
+
+class MatchIndexTests(SimpleTestCase):
+    """Yo (1) estoy disponible del 1 al 10 de enero y tengo A, B y C en favoritos."""
+
+    def setUp(self):
+        availability = [
+            (1, jan(1), jan(10)),
+            (2, jan(5), jan(12)),     # 6 días en común (5-10), comparte A y B
+            (3, jan(10), jan(20)),    # 1 día en común (10), comparte A
+            (4, jan(40), jan(50)),    # sin días en común, comparte A y B
+            (5, jan(1), jan(10)),     # 10 días en común, no comparte nada
+            (6, jan(1), jan(10)),     # desactivado
+            (7, TODAY - timedelta(days=30), jan(2)),  # empieza en el pasado: 2 días en común
+        ]
+        favorites = [(1, A), (1, B), (1, C), (2, A), (2, B), (3, A), (4, A), (4, B), (6, A), (7, C), (7, 99)]
+        self.index = MatchIndex.build(
+            availability, favorites, today=TODAY, horizon_days=365, excluded_user_ids=[6]
+        )
+        self.mine = [(jan(1), jan(10))]
+
+    def find(self, **options):
+        return self.index.find(1, self.mine, {A, B, C}, **options)
+
+    def test_overlap_and_shared_favorites(self):
+        self.assertEqual(self.find(), [
+            {'userId': 2, 'shared_favorites': 2, 'overlap_days': 6},
+            {'userId': 7, 'shared_favorites': 1, 'overlap_days': 2},
+            {'userId': 3, 'shared_favorites': 1, 'overlap_days': 1},
+        ])
+
+    def test_min_days_and_min_shared(self):
+        self.assertEqual([match['userId'] for match in self.find(min_days=2)], [2, 7])
+        self.assertEqual([match['userId'] for match in self.find(min_shared=2)], [2])
+        self.assertEqual(self.find(min_days=7), [])
+
+    def test_only_dates(self):
+        # Sin exigir favoritos entran los que no comparten ninguno
+        self.assertEqual([(match['userId'], match['overlap_days']) for match in self.find(min_shared=0, min_days=2)],
+                         [(2, 6), (7, 2), (5, 10)])
+
+    def test_limit_and_unknown_user(self):
+        self.assertEqual([match['userId'] for match in self.find(limit=1)], [2])
+        # Alguien fuera del índice, el 11 y 12 de enero: 2 y 3 con A y 2 días (empate por id); yo no
+        self.assertEqual(self.index.find(42, [(jan(11), jan(12))], {A}), [
+            {'userId': 2, 'shared_favorites': 1, 'overlap_days': 2},
+            {'userId': 3, 'shared_favorites': 1, 'overlap_days': 2},
+        ])
+
+    def test_excluded_users_are_not_indexed(self):
+        self.assertNotIn(6, self.index.positions)
+        self.assertNotIn(6, [match['userId'] for match in self.find(min_shared=0)])
+
+    def test_ranges_outside_the_horizon(self):
+        self.assertEqual(self.index.availability_bits([(TODAY - timedelta(days=9), TODAY - timedelta(days=1))]), 0)
+        self.assertEqual(self.index.availability_bits([(jan(365), jan(400))]), 1 << 364)
+
+
+class TravelMatchesViewTests(TestCase):
+    def setUp(self):
+        matching._index = None
+        today = date.today()
+        self.me = make_user('ana@example.com')
+        self.friend = make_user('luis@example.com', first_name='Luis')
+        self.inactive = make_user('eva@example.com')
+        destination, = make_destinations(1)
+        for user in (self.me, self.friend, self.inactive):
+            TravelAvailability.objects.create(user=user, start_date=today, end_date=today + timedelta(days=5))
+            Favorite.objects.create(user=user, destination=destination)
+        self.destination = destination
+        self.client = APIClient()
+
+    def tearDown(self):
+        matching._index = None
+
+    def get(self, user_id):
+        return self.client.get(f'/api/v1/travels/matches/{user_id}/')
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.get(self.me.id).status_code, 401)
+
+    def test_only_the_own_matches(self):
+        self.client.force_authenticate(self.friend)
+        self.assertEqual(self.get(self.me.id).status_code, 403)
+
+    def test_inactive_users_are_left_out(self):
+        # El índice se armó antes de la desactivación
+        matching.get_match_index()
+        User.objects.filter(id=self.inactive.id).update(is_active=False)
+        self.client.force_authenticate(self.me)
+        response = self.get(self.me.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['matches'], [{
+            'userId': self.friend.id, 'shared_favorites': 1, 'overlap_days': 6, 'first_name': 'Luis',
+            'shared_destination_ids': [self.destination.id],
+        }])
+
+    def test_index_skips_inactive_users(self):
+        User.objects.filter(id=self.inactive.id).update(is_active=False)
+        self.assertNotIn(self.inactive.id, matching.load_match_index().positions)
+        self.assertIn(self.friend.id, matching.load_match_index().positions)
@@ -0,0 +1,31 @@
+# rutaya/tests/test_middleware.py
+from django.test import TestCase, override_settings
+
+from rutaya.tests.factories import make_destinations, reset_caches
+
+EXTERNAL_IP = '203.0.113.7'
+
+
+@override_settings(DEBUG=False, METRICS_SERVER_TIMING_IPS=('10.0.0.5',))
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.destination, = make_destinations(1)
+
+    def get(self, ip):
+        response = self.client.get(f'/api/v1/destinations/{self.destination.id}/', REMOTE_ADDR=ip)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_hidden_from_external_clients(self):
+        response = self.get(EXTERNAL_IP)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_sent_to_internal_ips(self):
+        header = self.get('10.0.0.5')['Server-Timing']
+        self.assertIn('db;desc="1 queries";dur=', header)
+        self.assertIn('total;dur=', header)
+
+    def test_sent_to_everyone_with_debug(self):
+        with self.settings(DEBUG=True):
+            self.assertTrue(self.get(EXTERNAL_IP).has_header('Server-Timing'))
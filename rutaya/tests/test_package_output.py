@@ -0,0 +1,194 @@
+# rutaya/tests/test_package_output.py
+import json
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from rutaya.utils.llm_backends import FakeBackend
+from rutaya.utils.llm_client import ResilientClient
+from rutaya.utils.package_output import (
+    PACKAGE_SCHEMA, PackageStreamParser, _to_int, _to_price, generate_package, normalize_datetime,
+    repair_fields,
+)
+
+START = date.today() + timedelta(days=30)
+
+
+def package_json(**overrides):
+    return json.dumps(json.loads(FakeBackend().generate('', json_schema=PACKAGE_SCHEMA)) | overrides,
+                      ensure_ascii=False)
+
+
+class ScriptedBackend(FakeBackend):
+    """FakeBackend que devuelve, en orden, las respuestas dadas; guarda los prompts recibidos."""
+
+    def __init__(self, *answers):
+        super().__init__()
+        self.answers = list(answers)
+        self.prompts = []
+
+    def generate(self, prompt, timeout=None, json_schema=None):
+        self.prompts.append(prompt)
+        answer = self.answers.pop(0)
+        if isinstance(answer, float):
+            # Segundos que tarda en responder algo que no sirve
+            time.sleep(answer)
+            return '{}'
+        return answer
+
+
+def feed_in_chunks(text, size=7):
+    parser = PackageStreamParser()
+    for start in range(0, len(text), size):
+        parser.feed(text[start:start + size])
+    return parser
+
+
+class PackageStreamParserTests(SimpleTestCase):
+    def test_reads_fields_and_items_as_they_close(self):
+        parser = PackageStreamParser()
+        parser.feed('```json\n{"title": "Cusco", "itinerary": [{"datetime": "2030-01-01T08:00", ')
+        self.assertEqual(parser.fields, {'title': 'Cusco'})
+        self.assertEqual(parser.items, [])
+        parser.feed('"description": "Llegada"}, {"datetime": "2030-01-01T15:00", "description": "Tour"}')
+        self.assertEqual([item['description'] for item in parser.items], ['Llegada', 'Tour'])
+        self.assertFalse(parser.itinerary_closed)
+        parser.feed('], "days": 4}\n```')
+        self.assertTrue(parser.itinerary_closed)
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.fields, {'title': 'Cusco', 'days': 4})
+
+    def test_chunking_does_not_change_the_result(self):
+        text = package_json(title='Con "comillas", llaves {} y corchetes []')
+        whole = PackageStreamParser()
+        whole.feed(text)
+        chunked = feed_in_chunks(text, size=3)
+        self.assertEqual(chunked.fields, whole.fields)
+        self.assertEqual(chunked.items, whole.items)
+        self.assertEqual(chunked.fields['title'], 'Con "comillas", llaves {} y corchetes []')
+
+    def test_invalid_item_keeps_its_text(self):
+        parser = feed_in_chunks('{"itinerary": [{"datetime": "x", "description": "a",}, {"description": "b"}]}')
+        self.assertEqual(parser.items, [None, {'description': 'b'}])
+        self.assertEqual(parser.raw_items[0], '{"datetime": "x", "description": "a",}')
+
+    def test_plain_text_is_not_started(self):
+        parser = feed_in_chunks("Lo siento, no puedo generar el paquete.")
+        self.assertFalse(parser.started)
+        self.assertEqual(parser.text, "Lo siento, no puedo generar el paquete.")
+
+
+class RepairHelperTests(SimpleTestCase):
+    def test_normalize_datetime(self):
+        self.assertEqual(normalize_datetime('2030-07-01T08:00'), '2030-07-01T08:00')
+        self.assertEqual(normalize_datetime('2030-07-01 08:00:00'), '2030-07-01T08:00')
+        self.assertEqual(normalize_datetime('01/07/2030 3:30 p.m.'), '2030-07-01T15:30')
+        self.assertEqual(normalize_datetime('2030-07-01'), '2030-07-01T00:00')
+        self.assertIsNone(normalize_datetime('el primer día'))
+        self.assertIsNone(normalize_datetime(None))
+
+    def test_to_int(self):
+        self.assertEqual(_to_int('4 días'), 4)
+        self.assertEqual(_to_int(3.0), 3)
+        self.assertEqual(_to_int('muchos'), 'muchos')
+
+    def test_to_price(self):
+        self.assertEqual(_to_price('S/. 1,850.00'), '1850.00')
+        self.assertEqual(_to_price('S/ 1.850,50'), '1850.50')
+        self.assertEqual(_to_price('1850,5'), '1850.5')
+        self.assertEqual(_to_price('S/ 12,500'), '12500')
+        self.assertEqual(_to_price('S/ 1.850'), '1850')
+        self.assertEqual(_to_price('S/ 1.250.000'), '1250000')
+        self.assertEqual(_to_price('1850.50'), '1850.50')
+        self.assertEqual(_to_price('S/. 900'), '900')
+        self.assertEqual(_to_price(1850), 1850)
+
+    def test_repair_fields(self):
+        fields = repair_fields({'start_date': '2030-07-01 08:00', 'days': '4 días', 'price': 'S/ 900', 'title': 'x'})
+        self.assertEqual(fields, {'start_date': '2030-07-01T08:00', 'days': 4, 'price': '900', 'title': 'x'})
+
+
+@override_settings(LLM_PACKAGE_REPAIR_ROUNDS=2)
+class GeneratePackageTests(SimpleTestCase):
+    def generate(self, backend):
+        client = ResilientClient('test', backend.call, retries=0)
+        with mock.patch('rutaya.utils.package_output.get_client', return_value=client):
+            return generate_package('prompt', user_id=1)
+
+    def test_valid_package_needs_no_repairs(self):
+        output = self.generate(FakeBackend())
+        self.assertEqual(output.repairs, 0)
+        self.assertEqual(output.package['days'], 4)
+        self.assertEqual(output.package['itinerary'][0]['datetime'], f'{START:%Y-%m-%d}T08:00')
+        self.assertEqual([item['order'] for item in output.package['itinerary']], [0, 1, 2, 3])
+
+    def test_fixable_formats_are_repaired_locally(self):
+        backend = ScriptedBackend(package_json(days='4 días', price='S/ 1,850.00', start_date=f'{START} 08:00'))
+        output = self.generate(backend)
+        self.assertEqual(output.repairs, 0)
+        self.assertEqual((output.package['days'], output.package['price']), (4, 1850.0))
+
+    def test_invalid_field_is_asked_again(self):
+        backend = ScriptedBackend(package_json(start_date='cuando quieras'), '{"start_date": "2030-07-01T08:00"}')
+        output = self.generate(backend)
+        self.assertEqual(output.repairs, 1)
+        self.assertEqual(output.package['start_date'], '2030-07-01T08:00')
+        self.assertIn('start_date', backend.prompts[1])
+        self.assertNotIn('itinerary', backend.prompts[1].split('Errores')[1])
+
+    def test_invalid_items_are_asked_again_in_one_request(self):
+        package = json.loads(package_json())
+        package['itinerary'][0]['datetime'] = 'primer día'
+        package['itinerary'][2]['datetime'] = 'tercer día'
+        fixed = json.dumps([
+            {'index': 2, 'datetime': '2030-07-02T08:00', 'description': 'Valle Sagrado'},
+            {'index': 0, 'datetime': '2030-07-01T08:00', 'description': 'Llegada'},
+        ])
+        backend = ScriptedBackend(json.dumps(package), fixed)
+        output = self.generate(backend)
+        self.assertEqual(output.repairs, 1)
+        self.assertIn('primer día', backend.prompts[1])
+        self.assertIn('tercer día', backend.prompts[1])
+        itinerary = output.package['itinerary']
+        self.assertEqual([itinerary[0]['datetime'], itinerary[2]['datetime']], ['2030-07-01T08:00', '2030-07-02T08:00'])
+        self.assertEqual(itinerary[1]['description'], 'City tour por el centro histórico de Cusco')
+        self.assertNotIn('index', itinerary[0])
+
+    @override_settings(LLM_PACKAGE_REPAIR_TIMEOUT=0.1)
+    def test_repairs_share_one_deadline(self):
+        package = json.loads(package_json(start_date='cuando quieras'))
+        package['itinerary'][1]['datetime'] = 'segundo día'
+        backend = ScriptedBackend(json.dumps(package), 0.08, 0.08, 0.08)
+        start = time.monotonic()
+        output = self.generate(backend)
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertIsNone(output.package)
+        self.assertLessEqual(output.repairs, 2)
+
+    def test_truncated_itinerary_is_continued(self):
+        text = package_json()
+        # Se corta después del primer elemento del itinerario (el último campo)
+        truncated = text[:text.index('}', text.index('"itinerary"')) + 1]
+        rest = json.dumps([{'datetime': '2030-07-02T08:00', 'description': 'Machu Picchu'}])
+        backend = ScriptedBackend(truncated, rest)
+        output = self.generate(backend)
+        self.assertEqual(output.repairs, 1)
+        self.assertEqual(
+            [item['description'] for item in output.package['itinerary']],
+            ['Vuelo Lima - Cusco y check-in en el hotel', 'Machu Picchu'],
+        )
+        self.assertIn('Vuelo Lima - Cusco', backend.prompts[1])
+
+    def test_gives_up_after_repair_rounds(self):
+        bad = '{"start_date": "nunca"}'
+        backend = ScriptedBackend(package_json(start_date='cuando quieras'), bad, bad)
+        output = self.generate(backend)
+        self.assertIsNone(output.package)
+        self.assertEqual(output.repairs, 2)
+
+    def test_plain_text_is_returned_as_is(self):
+        output = self.generate(ScriptedBackend("¿Para cuántas personas?"))
+        self.assertIsNone(output.package)
+        self.assertEqual(output.text, "¿Para cuántas personas?")
@@ -0,0 +1,28 @@
+# rutaya/tests/test_query_plans.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from rutaya.management.commands.check_query_plans import Command, hot_queries
+
+
+class QueryPlanTests(TestCase):
+    """Cada consulta caliente usa su índice en la base de los tests (migraciones incluidas)."""
+
+    def test_hot_queries_use_their_index(self):
+        command = Command()
+        for name, queryset, table, accepted in hot_queries():
+            with self.subTest(name):
+                expected = command._index_names(table, accepted)
+                self.assertTrue(expected, f"No existe índice sobre {accepted} en {table}")
+                plan = queryset.explain()
+                self.assertTrue(any(index in plan for index in expected), f"{expected} no aparece en:\n{plan}")
+
+    def test_command_passes(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f"Motor no soportado: {connection.vendor}")
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertNotIn('❌', out.getvalue())
@@ -0,0 +1,123 @@
+# rutaya/tests/test_rate_limit.py
+import multiprocessing
+import tempfile
+
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from rutaya.throttling import PasswordRateThrottle
+from rutaya.utils.hashing import HostSlots
+from rutaya.utils.rate_limit import RateLimiter
+
+# Inicio de una ventana de 60 s
+T0 = 60 * 1000000
+
+
+def _hold_slot(directory, ready, done):
+    slots = HostSlots(directory, 1)
+    fd = slots.acquire(1)
+    ready.set()
+    done.wait(5)
+    slots.release(fd)
+
+
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_is_shared_between_instances(self):
+        # Dos workers: cada uno arma su limitador, el contador es el del cache
+        first, second = RateLimiter('login', 3, 60), RateLimiter('login', 3, 60)
+        self.assertEqual(first.consume('ana', now=T0), 0)
+        self.assertEqual(second.consume('ana', now=T0 + 1), 0)
+        self.assertEqual(first.consume('ana', now=T0 + 2), 0)
+        self.assertGreater(second.consume('ana', now=T0 + 3), 0)
+        self.assertEqual(second.consume('luis', now=T0 + 3), 0)
+
+    def test_rejected_attempts_are_not_counted(self):
+        limiter = RateLimiter('login', 2, 60)
+        limiter.consume('ana', now=T0)
+        limiter.consume('ana', now=T0)
+        for _ in range(5):
+            self.assertGreater(limiter.consume('ana', now=T0 + 1), 0)
+        # A mitad de la ventana siguiente quedan 2 * 0.5 = 1 (con los rechazos serían 3.5)
+        self.assertEqual(limiter.check('ana', now=T0 + 90), 0)
+
+    def test_previous_window_fades_out(self):
+        limiter = RateLimiter('login', 4, 60)
+        for _ in range(4):
+            limiter.consume('ana', now=T0 + 59)
+        # A los 15 s de la ventana siguiente pesa 3/4 de la anterior: 3 usadas
+        self.assertEqual(limiter.consume('ana', now=T0 + 75), 0)
+        wait = limiter.check('ana', now=T0 + 76)
+        # Otra más: 4 * (1 - e) + 1 <= 3  ->  e >= 1/2, a los 30 s de la ventana
+        self.assertAlmostEqual(wait, 14.0, places=3)
+        self.assertEqual(limiter.check('ana', now=T0 + 90), 0)
+
+    def test_wait_until_the_current_window_fades(self):
+        limiter = RateLimiter('login', 2, 60)
+        limiter.consume('ana', now=T0 + 30)
+        limiter.consume('ana', now=T0 + 30)
+        # 2 * (1 - e) <= 1 en la ventana siguiente: a los 30 s de ella
+        self.assertAlmostEqual(limiter.check('ana', now=T0 + 30), 60.0, places=3)
+
+    def test_amount_above_the_limit_never_fits(self):
+        self.assertEqual(RateLimiter('login', 2, 60).check('ana', amount=3, now=T0), float('inf'))
+
+
+@override_settings(PASSWORD_THROTTLE_RATES={'ip': (3, 60), 'account': (1, 60)})
+class BucketThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def allow(self, email, ip='10.0.0.1'):
+        request = APIRequestFactory().post('/api/v1/auth/login/', {'email': email}, format='json', REMOTE_ADDR=ip)
+        request = Request(request, parsers=[JSONParser()])
+        return PasswordRateThrottle().allow_request(request, SimpleNamespace(kwargs={}))
+
+    def test_rejected_request_does_not_drain_the_other_limits(self):
+        self.assertTrue(self.allow('ana@example.com'))
+        # Ana agota su cuenta: sus reintentos no gastan el límite de la IP
+        for _ in range(5):
+            self.assertFalse(self.allow('ana@example.com'))
+        self.assertTrue(self.allow('luis@example.com'))
+        self.assertTrue(self.allow('eva@example.com'))
+        self.assertFalse(self.allow('rosa@example.com'))
+        self.assertTrue(self.allow('rosa@example.com', ip='10.0.0.2'))
+
+
+class HostSlotsTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def test_slots_are_shared_between_instances(self):
+        first, second = HostSlots(self.directory, 2), HostSlots(self.directory, 2)
+        a, b = first.acquire(0.1), second.acquire(0.1)
+        self.assertIsNotNone(a)
+        self.assertIsNotNone(b)
+        self.assertIsNone(second.acquire(0.05))
+        first.release(a)
+        c = second.acquire(0.1)
+        self.assertIsNotNone(c)
+        second.release(b)
+        second.release(c)
+
+    def test_slot_taken_by_another_process(self):
+        context = multiprocessing.get_context('fork')
+        ready, done = context.Event(), context.Event()
+        process = context.Process(target=_hold_slot, args=(self.directory, ready, done))
+        process.start()
+        try:
+            self.assertTrue(ready.wait(5))
+            self.assertIsNone(HostSlots(self.directory, 1).acquire(0.05))
+        finally:
+            done.set()
+            process.join(5)
+        fd = HostSlots(self.directory, 1).acquire(0.5)
+        self.assertIsNotNone(fd)
+        HostSlots(self.directory, 1).release(fd)
@@ -0,0 +1,103 @@
+# rutaya/tests/test_shaping.py
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from rutaya.models import DestinationRate, Destination
+from rutaya.tests.factories import make_destinations, make_package, make_user, reset_caches
+from rutaya.utils.shaping import Shape
+
+DATA = {'id': 1, 'name': 'Machu Picchu', 'description': 'Ciudadela inca', 'image_url': None}
+
+
+def shape_for(query):
+    return Shape.from_request(Request(APIRequestFactory().get('/', query)))
+
+
+class ShapeTests(SimpleTestCase):
+    def test_full_response_has_no_shape(self):
+        self.assertIsNone(shape_for({}))
+        self.assertIsNone(shape_for({'preview': '0'}))
+
+    def test_unknown_fields_are_ignored(self):
+        shape = shape_for({'fields': 'name, ,bogus,'})
+        self.assertEqual(shape.fields, {'id', 'name', 'bogus'})
+        self.assertEqual(shape.shape_dict(DATA), {'id': 1, 'name': 'Machu Picchu'})
+        # Solo campos desconocidos (o vacío): queda el id
+        self.assertEqual(shape_for({'fields': 'bogus'}).shape_dict(DATA), {'id': 1})
+        self.assertEqual(shape_for({'fields': ''}).shape_dict(DATA), {'id': 1})
+
+    def test_nested_paths_are_not_fields(self):
+        # ?fields= elige campos del primer nivel; un objeto anidado va entero o no va
+        self.assertEqual(shape_for({'fields': 'destination.name'}).shape_dict({'id': 1, 'destination': DATA}), {'id': 1})
+        self.assertEqual(shape_for({'fields': 'destination'}).shape_dict({'id': 1, 'destination': DATA}),
+                         {'id': 1, 'destination': DATA})
+
+    def test_preview_adds_has_more(self):
+        shape = Shape(preview=True, preview_chars=8)
+        self.assertEqual(shape.shape_dict(DATA)['description'], 'Ciudadel…')
+        self.assertIs(shape.shape_dict(DATA)['description_has_more'], True)
+        self.assertEqual(shape.truncate('Corto'), ('Corto', False))
+        self.assertEqual(shape.truncate('12345678'), ('12345678', False))
+        self.assertEqual(shape.truncate(None), (None, False))
+
+    def test_truncate_counts_characters_not_bytes(self):
+        shape = Shape(preview=True, preview_chars=4)
+        self.assertEqual(shape.truncate('ñandú'), ('ñand…', True))
+        self.assertEqual(shape.truncate('ñand'), ('ñand', False))
+        self.assertEqual(shape.truncate('ab🏔🏔🏔'), ('ab🏔🏔…', True))
+
+    def test_truncate_keeps_grapheme_clusters_whole(self):
+        shape = Shape(preview=True, preview_chars=4)
+        # 'e' + acento combinante: no se separan
+        self.assertEqual(shape.truncate('Cafe\u0301 rico'), ('Caf…', True))
+        self.assertEqual(shape.truncate('Caf\u00e9 rico'), ('Caf\u00e9…', True))
+        # Tono de piel y selector de variación
+        self.assertEqual(shape.truncate('abc\U0001f44d\U0001f3fd ok'), ('abc…', True))
+        self.assertEqual(shape.truncate('abc\u2764\ufe0f ok'), ('abc…', True))
+        # Familia unida con ZWJ: se descarta entera, no queda una persona suelta
+        family = '\U0001f469\u200d\U0001f469\u200d\U0001f467'
+        self.assertEqual(Shape(preview=True, preview_chars=3).truncate(f'a{family} b'), ('a…', True))
+        self.assertEqual(Shape(preview=True, preview_chars=6).truncate(f'a{family} b'), (f'a{family}…', True))
+
+
+@override_settings(DESCRIPTION_PREVIEW_CHARS=5)
+class ShapedListTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.destination, = make_destinations(1)
+        DestinationRate.objects.create(user=self.user, destination=self.destination, stars=5,
+                                       comment='Precioso', created_at='2030-07-01')
+
+    def rates(self, **query):
+        response = self.client.get('/api/v1/rate-destinations/list/', query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['rates']
+
+    def test_fields_on_a_list(self):
+        self.assertEqual(set(self.rates(fields='stars,bogus')[0]), {'id', 'stars'})
+        self.assertEqual(set(self.rates(fields='destination.name')[0]), {'id'})
+
+    def test_nested_description_preview(self):
+        for description, expected in [
+            ('ñañañ', ('ñañañ', False)),       # justo en el límite
+            ('ñañaña', ('ñañañ…', True)),      # un carácter de dos bytes de más
+            ('ñaña🏔🏔', ('ñaña🏔…', True)),
+            ('Canoe\u0301', ('Cano…', True)),  # el corte caería entre la e y su acento
+        ]:
+            with self.subTest(description=description):
+                Destination.objects.filter(pk=self.destination.pk).update(description=description)
+                reset_caches()
+                destination = self.rates(fields='destination', preview='1')[0]['destination']
+                self.assertEqual((destination['description'], destination['description_has_more']), expected)
+
+    def test_packages_defer_the_description_column(self):
+        make_package(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/v1/tour/user/{self.user.id}/', {'fields': 'title'})
+        self.assertEqual(response.status_code, 200)
+        sql = next(query['sql'] for query in queries.captured_queries if 'FROM "tour_packages"' in query['sql'])
+        self.assertNotIn('"description"', sql)
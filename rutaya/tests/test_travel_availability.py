@@ -0,0 +1,114 @@
+# rutaya/tests/test_travel_availability.py
+from datetime import date
+
+from django.test import TestCase
+
+from rutaya.models import TravelAvailability
+from rutaya.serializers import sync_travel_dates
+from rutaya.tests.factories import make_user, reset_caches
+
+
+def d(day):
+    return date(2030, 7, day)
+
+
+def iso(day):
+    return d(day).isoformat()
+
+
+class SyncTravelDeltasTests(TestCase):
+    def setUp(self):
+        self.user = make_user('ana@example.com')
+        sync_travel_dates(self.user.id, ranges=[(d(1), d(5))])
+
+    def rows(self):
+        return list(TravelAvailability.objects.filter(user=self.user)
+                    .order_by('start_date').values_list('start_date', 'end_date'))
+
+    def test_add_wins_over_remove_for_the_same_day(self):
+        ranges, added, removed = sync_travel_dates(self.user.id, add=[d(3), d(8)], remove=[d(3), d(4)])
+        self.assertEqual(ranges, [(d(1), d(3)), (d(5), d(5)), (d(8), d(8))])
+        self.assertEqual(added, [(d(8), d(8))])
+        self.assertEqual(removed, [(d(4), d(4))])
+        self.assertEqual(self.rows(), ranges)
+
+    def test_removing_days_that_were_never_set(self):
+        with self.assertNumQueries(3):
+            ranges, added, removed = sync_travel_dates(self.user.id, remove=[d(10), d(11)])
+        self.assertEqual((ranges, added, removed), ([(d(1), d(5))], [], []))
+        self.assertEqual(self.rows(), [(d(1), d(5))])
+
+    def test_remove_partly_outside_the_range(self):
+        ranges, added, removed = sync_travel_dates(self.user.id, remove=[d(5), d(6), d(7)])
+        self.assertEqual((ranges, added, removed), ([(d(1), d(4))], [], [(d(5), d(5))]))
+
+    def test_adding_days_already_set(self):
+        ranges, added, removed = sync_travel_dates(self.user.id, add=[d(2), d(6)])
+        self.assertEqual((ranges, added, removed), ([(d(1), d(6))], [(d(6), d(6))], []))
+        self.assertEqual(self.rows(), [(d(1), d(6))])
+
+
+class SaveTravelAvailabilityViewTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        sync_travel_dates(self.user.id, ranges=[(d(1), d(5))])
+
+    def post(self, **data):
+        return self.client.post('/api/v1/travels/add/', {'userId': self.user.id, **data},
+                                content_type='application/json')
+
+    def test_same_day_in_add_and_remove_is_rejected(self):
+        response = self.post(add=[iso(3)], remove=[iso(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("a la vez", str(response.json()['details']))
+        self.assertEqual(TravelAvailability.objects.get().end_date, d(5))
+
+    def test_remove_never_set_days(self):
+        response = self.post(remove=[iso(20)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['added'], response.json()['removed']), ([], []))
+        self.assertEqual(response.json()['ranges'], [{'start': iso(1), 'end': iso(5)}])
+
+    def test_full_list_and_deltas_are_exclusive(self):
+        self.assertEqual(self.post(dates=[iso(1)], add=[iso(2)]).status_code, 400)
+
+
+class BatchAvailabilitySetTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        sync_travel_dates(self.user.id, ranges=[(d(1), d(5))])
+
+    def batch(self, *operations):
+        return self.client.post('/api/v1/batch/', {'userId': self.user.id, 'operations': list(operations)},
+                                content_type='application/json')
+
+    def ranges(self):
+        return list(TravelAvailability.objects.filter(user=self.user)
+                    .order_by('start_date').values_list('start_date', 'end_date'))
+
+    def test_replaces_the_availability(self):
+        response = self.batch({'op': 'availability.set', 'dates': [iso(4), iso(3), iso(9)]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'index': 0, 'op': 'availability.set', 'status': 200, 'dates': [iso(4), iso(3), iso(9)]},
+        ])
+        self.assertEqual(self.ranges(), [(d(3), d(4)), (d(9), d(9))])
+
+    def test_last_set_wins(self):
+        response = self.batch(
+            {'op': 'availability.set', 'dates': [iso(10)]},
+            {'op': 'availability.set', 'dates': [iso(2), iso(3)]},
+        )
+        self.assertEqual([result['status'] for result in response.json()['results']], [200, 200])
+        self.assertEqual(self.ranges(), [(d(2), d(3))])
+
+    def test_empty_list_clears_the_availability(self):
+        self.assertEqual(self.batch({'op': 'availability.set', 'dates': []}).status_code, 200)
+        self.assertEqual(self.ranges(), [])
+
+    def test_invalid_dates_leave_the_availability_untouched(self):
+        response = self.batch({'op': 'availability.set', 'dates': ['31-07-2030']})
+        self.assertEqual(response.json()['results'][0]['status'], 400)
+        self.assertEqual(self.ranges(), [(d(1), d(5))])
@@ -0,0 +1,152 @@
+# rutaya/tests/test_upserts.py
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from rutaya.models import DestinationRate, Favorite, TourPackageRate
+from rutaya.tests.factories import make_destinations, make_package, make_user, reset_caches
+from rutaya.utils.upserts import insert_ignore
+
+
+class InsertIgnoreTests(TestCase):
+    def setUp(self):
+        self.user = make_user('ana@example.com')
+        self.destination, = make_destinations(1)
+
+    def test_returns_the_new_pk(self):
+        with self.assertNumQueries(1):
+            pk = insert_ignore(Favorite, user_id=self.user.id, destination_id=self.destination.id)
+        self.assertEqual(Favorite.objects.get(pk=pk).destination_id, self.destination.id)
+
+    def test_conflict_returns_none_and_keeps_the_transaction_usable(self):
+        first = insert_ignore(Favorite, user_id=self.user.id, destination_id=self.destination.id)
+        with self.assertNumQueries(1):
+            self.assertIsNone(insert_ignore(Favorite, user_id=self.user.id, destination_id=self.destination.id))
+        # Sin IntegrityError: la transacción del test sigue aceptando consultas
+        self.assertEqual(list(Favorite.objects.values_list('pk', flat=True)), [first])
+
+    def test_accepts_field_or_column_names_and_preps_values(self):
+        pk = insert_ignore(
+            DestinationRate, user=self.user.id, destination_id=self.destination.id, stars=4, comment=None,
+            created_at='2030-07-01',
+        )
+        rate = DestinationRate.objects.get(pk=pk)
+        self.assertEqual((rate.user_id, rate.stars, rate.comment), (self.user.id, 4, None))
+
+    def test_without_returning_falls_back_to_a_savepoint(self):
+        with mock.patch.object(connection.features, 'can_return_columns_from_insert', False):
+            pk = insert_ignore(Favorite, user_id=self.user.id, destination_id=self.destination.id)
+            self.assertIsNone(insert_ignore(Favorite, user_id=self.user.id, destination_id=self.destination.id))
+        self.assertEqual(list(Favorite.objects.values_list('pk', flat=True)), [pk])
+
+
+class WriteQueryBudgetTests(TestCase):
+    """Una consulta de existencia más una escritura por petición."""
+
+    def setUp(self):
+        reset_caches()
+        self.user = make_user('ana@example.com')
+        self.destination, = make_destinations(1)
+        self.package = make_package(self.user)
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type='application/json')
+
+    def favorite(self, method, destination_id=None, user_id=None):
+        url = '/api/v1/favorites/add/' if method == 'post' else '/api/v1/favorites/remove/'
+        data = {'userId': user_id or self.user.id, 'destinationId': destination_id or self.destination.id}
+        return getattr(self.client, method)(url, data, content_type='application/json')
+
+    def test_add_favorite(self):
+        with self.assertNumQueries(2):
+            response = self.favorite('post')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['favorite']['user_email'], 'ana@example.com')
+        self.assertTrue(Favorite.objects.filter(user=self.user, destination=self.destination).exists())
+
+    def test_add_duplicate_favorite(self):
+        self.favorite('post')
+        with self.assertNumQueries(2):
+            response = self.favorite('post')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Favorite.objects.count(), 1)
+
+    def test_add_favorite_of_missing_destination(self):
+        with self.assertNumQueries(1):
+            response = self.favorite('post', destination_id=999999)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'destinationId': ['Destino no encontrado.']})
+
+    def test_add_favorite_of_missing_user(self):
+        # La segunda consulta solo decide si también falta el destino
+        with self.assertNumQueries(2):
+            response = self.favorite('post', user_id=999999)
+        self.assertEqual(response.json(), {'userId': ['Usuario no encontrado.']})
+
+    def test_remove_favorite(self):
+        self.favorite('post')
+        with self.assertNumQueries(2):
+            response = self.favorite('delete')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Favorite.objects.exists())
+
+    def test_remove_missing_favorite(self):
+        with self.assertNumQueries(2):
+            response = self.favorite('delete')
+        self.assertEqual(response.status_code, 404)
+
+    def test_remove_favorite_of_missing_destination(self):
+        with self.assertNumQueries(1):
+            response = self.favorite('delete', destination_id=999999)
+        self.assertEqual(response.status_code, 400)
+
+    def rate_destination(self, destination_id=None):
+        return self.post('/api/v1/rate-destinations/add/', {
+            'userId': self.user.id, 'destinationId': destination_id or self.destination.id, 'stars': 5,
+            'comment': 'Precioso', 'created_at': '2030-07-01',
+        })
+
+    def rate_package(self, package_id=None):
+        return self.post('/api/v1/rate-package/add/', {
+            'userId': self.user.id, 'tourPackageId': package_id or self.package.id, 'stars': 4,
+            'created_at': '2030-07-01',
+        })
+
+    def test_rate_destination(self):
+        with self.assertNumQueries(2):
+            response = self.rate_destination()
+        self.assertEqual(response.status_code, 201)
+        rate = DestinationRate.objects.get(pk=response.json()['rate']['id'])
+        self.assertEqual((rate.stars, rate.comment), (5, 'Precioso'))
+
+    def test_rate_destination_twice(self):
+        self.rate_destination()
+        with self.assertNumQueries(2):
+            response = self.rate_destination()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Ya has calificado este destino'})
+
+    def test_rate_missing_destination(self):
+        with self.assertNumQueries(1):
+            response = self.rate_destination(destination_id=999999)
+        self.assertEqual(response.json(), {'destinationId': ['Destino no encontrado.']})
+
+    def test_rate_package(self):
+        with self.assertNumQueries(2):
+            response = self.rate_package()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['rate']['tour_package_title'], 'Cusco mágico')
+        self.assertEqual(TourPackageRate.objects.get().stars, 4)
+
+    def test_rate_package_twice(self):
+        self.rate_package()
+        with self.assertNumQueries(2):
+            response = self.rate_package()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(TourPackageRate.objects.count(), 1)
+
+    def test_rate_missing_package(self):
+        with self.assertNumQueries(1):
+            response = self.rate_package(package_id=999999)
+        self.assertEqual(response.json(), {'tourPackageId': ['Paquete turístico no encontrado.']})
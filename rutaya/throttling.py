@@ -0,0 +1,84 @@
+# rutaya/throttling.py
+"""
+Throttles de DRF sobre los límites compartidos de rutaya.utils.rate_limit
+(contadores en el cache de Django, comunes a todos los workers).
+
+- PasswordRateThrottle limita los endpoints que hashean contraseñas (login,
+  registro, cambio de contraseña) por IP y por cuenta, según
+  PASSWORD_THROTTLE_RATES. Se rechaza antes de validar, así un ataque de
+  fuerza bruta no llega a gastar CPU en hashes.
+- LLMRateThrottle limita /api/v1/content/generate/ por IP y por usuario
+  autenticado (JWT) según LLM_THROTTLE_RATES; los usuarios con paquetes
+  pagados usan la tasa 'user_paid'.
+"""
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from rutaya.utils.llm_quota import is_priority_user
+from rutaya.utils.rate_limit import get_registry
+
+
+class BucketThrottle(BaseThrottle):
+    """Un límite por cada (scope, clave) que devuelve keys(); todos deben tener lugar."""
+    rates_setting = None
+    prefix = None
+
+    def keys(self, request, view):
+        """{scope: clave}; una clave None no se limita."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rates = getattr(settings, self.rates_setting)
+        limits = [
+            (get_registry(f'{self.prefix}:{scope}', rates[scope]), key)
+            for scope, key in self.keys(request, view).items()
+            if rates.get(scope) is not None and key is not None
+        ]
+        # Primero se revisan todos y solo se consume si todos tienen lugar: un
+        # usuario que agotó su límite no gasta el de su IP (ni el de los demás
+        # usuarios detrás de ella)
+        self.waits = [wait for limiter, key in limits if (wait := limiter.check(key))]
+        if self.waits:
+            return False
+        for limiter, key in limits:
+            limiter.consume(key)
+        return True
+
+    def wait(self):
+        return max(self.waits) if self.waits else None
+
+
+def _data_value(request, name):
+    return request.data.get(name) if hasattr(request.data, 'get') else None
+
+
+class PasswordRateThrottle(BucketThrottle):
+    rates_setting = 'PASSWORD_THROTTLE_RATES'
+    prefix = 'password'
+
+    def keys(self, request, view):
+        return {'ip': self.get_ident(request), 'account': self.account_key(request, view)}
+
+    @staticmethod
+    def account_key(request, view):
+        user_id = view.kwargs.get('user_id') or view.kwargs.get('pk')
+        if user_id is not None:
+            return f'user:{user_id}'
+        email = _data_value(request, 'email')
+        if isinstance(email, str) and email.strip():
+            return f'email:{email.strip().lower()}'
+        return None
+
+
+class LLMRateThrottle(BucketThrottle):
+    rates_setting = 'LLM_THROTTLE_RATES'
+    prefix = 'llm'
+
+    def keys(self, request, view):
+        keys = {'ip': self.get_ident(request)}
+        # El userId del cuerpo lo elige el cliente; solo cuenta el del token
+        user_id = request.user.id if request.user.is_authenticated else None
+        if user_id is not None:
+            scope = 'user_paid' if is_priority_user(user_id) else 'user'
+            keys[scope] = user_id
+        return keys
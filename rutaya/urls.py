@@ -1,74 +1,77 @@
 # rutaya/urls.py - Versión simplificada (REEMPLAZAR todo el contenido)
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from .views import *
-from . import views
-
-# Configuración de Swagger
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Rutaya API",
-        default_version='v1',
-        description="API Backend para Rutaya - Sistema de gestión de rutas",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@rutaya.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+
+from rutaya.views import LazyView as view, preload
 
 urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
 
     # API Endpoints - Autenticación
-    path('api/v1/auth/register/', UserRegistrationView.as_view(), name='user-register'),
-    path('api/v1/auth/login/', UserLoginView.as_view(), name='user-login'),
-    path('api/v1/auth/logout/', logout_view, name='user-logout'),
-    path('api/v1/user/update/<int:pk>', UserUpdateView.as_view(), name='user-update'),
-    path('api/v1/user/change-password/<int:user_id>', ChangePasswordView.as_view(), name='change-password'),
+    path('api/v1/auth/register/', view('auth.UserRegistrationView'), name='user-register'),
+    path('api/v1/auth/login/', view('auth.UserLoginView'), name='user-login'),
+    path('api/v1/auth/logout/', view('auth.logout_view'), name='user-logout'),
+    path('api/v1/user/update/<int:pk>', view('auth.UserUpdateView'), name='user-update'),
+    path('api/v1/user/change-password/<int:user_id>', view('auth.ChangePasswordView'), name='change-password'),
+
 
+    path('api/v1/categories/<int:user_id>/', view('catalog.get_categories_with_destinations'), name='categories-destinations'),
 
-    path('api/v1/categories/<int:user_id>/', get_categories_with_destinations, name='categories-destinations'),
+    path('api/v1/home/<int:user_id>/', view('catalog.get_home_data'), name='home-data'),
+    path('api/v1/destinations/<int:pk>/', view('catalog.get_destination_detail'), name='destination-detail'),
+    path('api/v1/bootstrap/<int:user_id>/', view('bootstrap.get_bootstrap_data'), name='bootstrap-data'),
 
-    path('api/v1/home/<int:user_id>/', get_home_data, name='home-data'),
+    path('api/v1/favorites/add/', view('favorites.AddToFavoritesView'), name='add-favorite'),
+    path('api/v1/favorites/remove/', view('favorites.RemoveFromFavoritesView'), name='remove-favorite'),
 
-    path('api/v1/favorites/add/', AddToFavoritesView.as_view(), name='add-favorite'),
-    path('api/v1/favorites/remove/', RemoveFromFavoritesView.as_view(), name='remove-favorite'),
+    path('api/v1/batch/', view('batch.BatchOperationsView'), name='batch-operations'),
 
-    path('api/v1/community/list/', GetAllRatesView.as_view(), name='community-list'),
+    path('api/v1/community/list/', view('rates.GetAllRatesView'), name='community-list'),
 
-    path('api/v1/rate-destinations/add/', CreateDestinationRateView.as_view(), name='rate-destination'),
-    path('api/v1/rate-destinations/list/', GetAllDestinationRatesView.as_view(), name='get-destinations-rates'),
-    path('api/v1/rate-destinations/delete/<int:rate_id>/', DeleteDestinationRateView.as_view(), name='remove-destination-rate'),
+    path('api/v1/rate-destinations/add/', view('rates.CreateDestinationRateView'), name='rate-destination'),
+    path('api/v1/rate-destinations/list/', view('rates.GetAllDestinationRatesView'), name='get-destinations-rates'),
+    path('api/v1/rate-destinations/delete/<int:rate_id>/', view('rates.DeleteDestinationRateView'), name='remove-destination-rate'),
 
-    path('api/v1/rate-package/add/', CreateTourPackageRateView.as_view(), name='rate-package'),
-    path('api/v1/rate-package/list/', GetAllTourPackageRatesView.as_view(), name='get-package-rates'),
-    path('api/v1/rate-package/delete/<int:rate_id>/', DeleteTourPackageRateView.as_view(), name='remove-package-rate'),
+    path('api/v1/rate-package/add/', view('rates.CreateTourPackageRateView'), name='rate-package'),
+    path('api/v1/rate-package/list/', view('rates.GetAllTourPackageRatesView'), name='get-package-rates'),
+    path('api/v1/rate-package/delete/<int:rate_id>/', view('rates.DeleteTourPackageRateView'), name='remove-package-rate'),
 
 
     # En tu urls.py
-    path('api/v1/travels/add/', save_travel_availability, name='save-travel-availability'),
-    path('api/v1/travels/user/<int:user_id>/', get_travel_availability, name='get-travel-availability'),
+    path('api/v1/travels/add/', view('travels.save_travel_availability'), name='save-travel-availability'),
+    path('api/v1/travels/user/<int:user_id>/', view('travels.get_travel_availability'), name='get-travel-availability'),
+    path('api/v1/travels/matches/<int:user_id>/', view('travels.get_travel_matches'), name='get-travel-matches'),
+
+    path('api/v1/content/generate/', view('content.ProcessIaMessageView'), name='generate-content'),
 
-    path('api/v1/content/generate/', ProcessIaMessageView.as_view(), name='generate-content'),
+    path('api/v1/preferences/', view('preferences.save_user_preferences'), name='save_user_preferences'),
+    path('api/v1/preferences/<int:user_id>/', view('preferences.get_user_preferences'), name='get_user_preferences'),
 
-    path('api/v1/preferences/', views.save_user_preferences, name='save_user_preferences'),
-    path('api/v1/preferences/<int:user_id>/', views.get_user_preferences, name='get_user_preferences'),
+    path('api/v1/tour/user/<int:user_id>/', view('packages.get_user_tour_packages'), name='get_user_tour_package'),
+    path('api/v1/tour/add/', view('packages.save_tour_package'), name='save-tour-package'),
+    path('api/v1/tour/<int:pk>/', view('packages.get_tour_package_detail'), name='tour-package-detail'),
+    path('api/v1/tour/pay/<int:pk>/', view('packages.mark_package_as_paid'), name='mark-package-paid'),
+    path('api/v1/tour/delete/<int:pk>/', view('packages.delete_tour_package'), name='delete-tour-package'),
 
-    path('api/v1/tour/user/<int:user_id>/', views.get_user_tour_packages, name='get_user_tour_package'),
-    path('api/v1/tour/add/', save_tour_package, name='save-tour-package'),
-    path('api/v1/tour/pay/<int:pk>/', mark_package_as_paid, name='mark-package-paid'),
-    path('api/v1/tour/delete/<int:pk>/', delete_tour_package, name='delete-tour-package'),
+    # Métricas (Prometheus)
+    path('api/v1/metrics/', view('metrics.metrics_view'), name='metrics'),
+
+    # Readiness: 503 hasta que el proceso cargó sus cachés
+    path('api/v1/ready/', view('health.readiness_view'), name='readiness'),
 
 
     # Documentación API
-    path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-    path('', schema_view.with_ui('swagger', cache_timeout=0), name='api-docs'),  # Página principal
-]
\ No newline at end of file
+    path('swagger<format>/', view('docs.schema_json'), name='schema-json'),
+    path('swagger/', view('docs.swagger_ui'), name='schema-swagger-ui'),
+    path('redoc/', view('docs.redoc_ui'), name='schema-redoc'),
+    path('', view('docs.swagger_ui'), name='api-docs'),  # Página principal
+]
+
+# Variantes de imágenes en desarrollo; en producción las sirve el CDN/servidor web
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if not settings.LAZY_VIEWS:
+    preload(urlpatterns)
@@ -0,0 +1,187 @@
+# rutaya/utils/api_docs.py
+"""
+Documentación de la API precalculada.
+
+drf_yasg introspecciona todas las vistas para armar el esquema; antes eso
+pasaba en cada visita a /, /swagger/ y /redoc/ (cache_timeout=0), que
+reciben health checks y crawlers. Ahora el esquema (JSON y YAML) y las
+páginas de Swagger UI y ReDoc se generan una vez:
+
+- en el build, con `manage.py generate_openapi_schema`, que los escribe en
+  OPENAPI_SCHEMA_DIR junto con un manifest.json, o
+- en la primera petición del proceso, si no hay archivos o son de otra
+  versión (se intenta guardarlos; en un sistema de archivos de solo lectura
+  quedan en memoria).
+
+La versión es la huella del URLconf y del código que describe el esquema
+(vistas, serializers, SWAGGER_SETTINGS): si cambia, se regeneran. Se sirven
+con ETag y Cache-Control de larga duración, ya comprimidos
+(rutaya.utils.compression).
+
+El esquema no incluye host ni schemes: Swagger UI usa el host desde el que
+se lo sirve, así el mismo archivo vale en cualquier entorno.
+"""
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.urls import get_resolver
+
+from rutaya.utils.compression import PrecompressedPayload
+
+logger = logging.getLogger(__name__)
+
+DOCUMENTS = {
+    'json': ('schema.json', 'application/json'),
+    'yaml': ('schema.yaml', 'application/yaml; charset=utf-8'),
+    'swagger': ('swagger.html', 'text/html; charset=utf-8'),
+    'redoc': ('redoc.html', 'text/html; charset=utf-8'),
+}
+MANIFEST = 'manifest.json'
+
+# Código del que depende el esquema, además del URLconf: los campos de los
+# ModelSerializer salen de los modelos y el mixin de forma de rutaya.utils.shaping
+SCHEMA_SOURCES = ('views', 'serializers.py', 'urls.py', 'models.py', 'utils/shaping.py')
+
+
+def _api_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Rutaya API",
+        default_version='v1',
+        description="API Backend para Rutaya - Sistema de gestión de rutas",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@rutaya.local"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def _pattern_lines(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if hasattr(pattern, 'url_patterns'):
+            yield from _pattern_lines(pattern.url_patterns, route)
+        else:
+            yield f'{route} {pattern.name} {pattern.lookup_str}'
+
+
+_fingerprint = None
+
+
+def fingerprint():
+    """Huella del URLconf y de las fuentes del esquema (una vez por proceso)."""
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256()
+        for line in _pattern_lines(get_resolver().url_patterns):
+            digest.update(line.encode() + b'\n')
+        package = Path(__file__).resolve().parent.parent
+        for source in SCHEMA_SOURCES:
+            path = package / source
+            for file in sorted(path.glob('*.py')) if path.is_dir() else [path]:
+                digest.update(file.read_bytes())
+        digest.update(json.dumps(settings.SWAGGER_SETTINGS, sort_keys=True, default=str).encode())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+def build_documents():
+    """Genera el esquema y las páginas de documentación: {nombre: bytes}."""
+    from django.test import RequestFactory
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    # Sin request: el esquema sale sin host ni schemes
+    schema = OpenAPISchemaGenerator(_api_info()).get_schema(request=None, public=True)
+    documents = {
+        'json': OpenAPICodecJson(validators=[]).encode(schema),
+        'yaml': OpenAPICodecYaml(validators=[]).encode(schema),
+    }
+
+    # Las páginas solo cargan los assets de drf_yasg y piden ?format=openapi a la misma URL
+    schema_view = get_schema_view(_api_info(), public=True, permission_classes=(permissions.AllowAny,))
+    for name in ('swagger', 'redoc'):
+        response = schema_view.with_ui(name, cache_timeout=0)(RequestFactory().get('/'))
+        response.render()
+        documents[name] = response.content
+    return documents
+
+
+def write_documents(directory=None):
+    """Genera los documentos y los guarda con su manifest; devuelve el manifest."""
+    directory = Path(directory or settings.OPENAPI_SCHEMA_DIR)
+    documents = build_documents()
+    manifest = _save(directory, documents)
+    _set_loaded(manifest, documents)
+    return manifest
+
+
+def _save(directory, documents):
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {'fingerprint': fingerprint(), 'etags': {}}
+    for name, body in documents.items():
+        (directory / DOCUMENTS[name][0]).write_bytes(body)
+        manifest['etags'][name] = hashlib.sha256(body).hexdigest()[:32]
+    # El manifest va al final: si está y coincide la huella, los archivos están completos
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def read_manifest(directory=None):
+    try:
+        return json.loads((Path(directory or settings.OPENAPI_SCHEMA_DIR) / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_stored():
+    directory = Path(settings.OPENAPI_SCHEMA_DIR)
+    manifest = read_manifest(directory)
+    if not manifest or manifest.get('fingerprint') != fingerprint():
+        return None, None
+    try:
+        documents = {name: (directory / filename).read_bytes() for name, (filename, _) in DOCUMENTS.items()}
+    except OSError:
+        return None, None
+    return manifest, documents
+
+
+_documents = None
+_documents_lock = threading.Lock()
+
+
+def _set_loaded(manifest, documents):
+    global _documents
+    loaded = {}
+    for name, body in documents.items():
+        payload = PrecompressedPayload(body, DOCUMENTS[name][1])
+        # Débil: el mismo contenido se sirve con distintas codificaciones
+        payload.etag = f'W/"{manifest["etags"][name]}"'
+        loaded[name] = payload
+    _documents = loaded
+
+
+def get_document(name):
+    """PrecompressedPayload (con .etag) del documento: 'json', 'yaml', 'swagger' o 'redoc'."""
+    if _documents is None:
+        with _documents_lock:
+            if _documents is None:
+                manifest, documents = _read_stored()
+                if documents is None:
+                    logger.info("Generando la documentación de la API (no hay una versión guardada vigente)")
+                    documents = build_documents()
+                    try:
+                        manifest = _save(Path(settings.OPENAPI_SCHEMA_DIR), documents)
+                    except OSError as e:
+                        logger.warning("No se pudo guardar la documentación de la API: %s", e)
+                        manifest = {'etags': {
+                            name: hashlib.sha256(body).hexdigest()[:32] for name, body in documents.items()
+                        }}
+                _set_loaded(manifest, documents)
+    return _documents[name]
@@ -0,0 +1,233 @@
+# rutaya/utils/batch.py
+"""
+Ejecución de lotes de mutaciones (favoritos, calificaciones, disponibilidad)
+para clientes que sincronizan acciones encoladas offline.
+
+Las existencias se consultan en bloque (una consulta por tipo), las
+operaciones se resuelven en memoria en el orden recibido y el efecto neto se
+aplica con inserts/deletes masivos dentro de una sola transacción.
+"""
+from django.db import transaction
+
+from rutaya.models import Destination, DestinationRate, Favorite, TourPackage, TourPackageRate
+from rutaya.serializers import (
+    BatchAvailabilityOperationSerializer, BatchDestinationRateOperationSerializer,
+    BatchFavoriteOperationSerializer, BatchRateDeleteOperationSerializer,
+    BatchTourPackageRateOperationSerializer, set_travel_dates,
+)
+from rutaya.utils.home_feed import invalidate_home_feed
+from rutaya.utils.versions import bump_version
+
+OPERATION_SERIALIZERS = {
+    'favorite.add': BatchFavoriteOperationSerializer,
+    'favorite.remove': BatchFavoriteOperationSerializer,
+    'destination_rate.create': BatchDestinationRateOperationSerializer,
+    'destination_rate.delete': BatchRateDeleteOperationSerializer,
+    'package_rate.create': BatchTourPackageRateOperationSerializer,
+    'package_rate.delete': BatchRateDeleteOperationSerializer,
+    'availability.set': BatchAvailabilityOperationSerializer,
+}
+
+
+def _result(index, op, status_code, **data):
+    return {'index': index, 'op': op, 'status': status_code, **data}
+
+
+class BatchExecutor:
+    def __init__(self, user_id, operations):
+        self.user_id = user_id
+        self.raw_operations = operations
+        self.results = [None] * len(operations)
+
+        # Mutaciones netas a aplicar al final
+        self.favorites_to_add = {}      # destination_id -> índice del resultado
+        self.favorites_to_remove = set()
+        self.destination_rates_to_create = {}  # destination_id -> (índice, datos)
+        self.package_rates_to_create = {}      # tour_package_id -> (índice, datos)
+        self.destination_rates_to_delete = set()
+        self.package_rates_to_delete = set()
+        self.availability = None
+
+    def run(self):
+        operations = self._parse()
+        self._load_state(operations)
+
+        for index, op, data in operations:
+            getattr(self, '_' + op.replace('.', '_'))(index, op, data)
+
+        with transaction.atomic():
+            self._apply()
+
+        return self.results
+
+    def _parse(self):
+        parsed = []
+        for index, raw in enumerate(self.raw_operations):
+            op = raw.get('op')
+            serializer_class = OPERATION_SERIALIZERS.get(op)
+            if serializer_class is None:
+                self.results[index] = _result(index, op, 400, error=f"Operación desconocida: {op}")
+                continue
+
+            serializer = serializer_class(data=raw)
+            if not serializer.is_valid():
+                self.results[index] = _result(index, op, 400, error='Datos inválidos', details=serializer.errors)
+                continue
+            parsed.append((index, op, serializer.validated_data))
+        return parsed
+
+    def _load_state(self, operations):
+        """Una consulta por tipo de objeto referenciado en todo el lote."""
+        destination_ids = {data['destinationId'] for _, _, data in operations if 'destinationId' in data}
+        package_ids = {data['tourPackageId'] for _, _, data in operations if 'tourPackageId' in data}
+        destination_rate_ids = {data['rateId'] for _, op, data in operations if op == 'destination_rate.delete'}
+        package_rate_ids = {data['rateId'] for _, op, data in operations if op == 'package_rate.delete'}
+
+        self.destinations = dict(
+            Destination.objects.filter(id__in=destination_ids).values_list('id', 'name')
+        ) if destination_ids else {}
+        self.packages = set(
+            TourPackage.objects.filter(id__in=package_ids).values_list('id', flat=True)
+        ) if package_ids else set()
+        self.favorites = set(
+            Favorite.objects.filter(user_id=self.user_id, destination_id__in=destination_ids)
+            .values_list('destination_id', flat=True)
+        ) if destination_ids else set()
+        self.rated_destinations = set(
+            DestinationRate.objects.filter(user_id=self.user_id, destination_id__in=destination_ids)
+            .values_list('destination_id', flat=True)
+        ) if destination_ids else set()
+        self.rated_packages = set(
+            TourPackageRate.objects.filter(user_id=self.user_id, tour_package_id__in=package_ids)
+            .values_list('tour_package_id', flat=True)
+        ) if package_ids else set()
+        # Solo se pueden borrar calificaciones propias
+        self.own_destination_rates = dict(
+            DestinationRate.objects.filter(user_id=self.user_id, id__in=destination_rate_ids)
+            .values_list('id', 'destination_id')
+        ) if destination_rate_ids else {}
+        self.own_package_rates = dict(
+            TourPackageRate.objects.filter(user_id=self.user_id, id__in=package_rate_ids)
+            .values_list('id', 'tour_package_id')
+        ) if package_rate_ids else {}
+
+    # --- Operaciones (en memoria, en el orden del lote)
+
+    def _favorite_add(self, index, op, data):
+        destination_id = data['destinationId']
+        if destination_id not in self.destinations:
+            self.results[index] = _result(index, op, 404, error='Destino no encontrado.')
+        elif destination_id in self.favorites:
+            self.results[index] = _result(index, op, 400, error='Este destino ya está en favoritos')
+        else:
+            self.favorites.add(destination_id)
+            if destination_id in self.favorites_to_remove:
+                self.favorites_to_remove.discard(destination_id)
+            else:
+                self.favorites_to_add[destination_id] = index
+            self.results[index] = _result(index, op, 201, destinationId=destination_id)
+
+    def _favorite_remove(self, index, op, data):
+        destination_id = data['destinationId']
+        if destination_id not in self.favorites:
+            self.results[index] = _result(index, op, 404, error='Este destino no está en favoritos')
+            return
+        self.favorites.discard(destination_id)
+        if self.favorites_to_add.pop(destination_id, None) is None:
+            self.favorites_to_remove.add(destination_id)
+        self.results[index] = _result(index, op, 200, destinationId=destination_id)
+
+    def _destination_rate_create(self, index, op, data):
+        destination_id = data['destinationId']
+        if destination_id not in self.destinations:
+            self.results[index] = _result(index, op, 404, error='Destino no encontrado.')
+        elif destination_id in self.rated_destinations:
+            self.results[index] = _result(index, op, 400, error='Ya has calificado este destino')
+        else:
+            self.rated_destinations.add(destination_id)
+            self.destination_rates_to_create[destination_id] = (index, data)
+            self.results[index] = _result(index, op, 201, destinationId=destination_id)
+
+    def _destination_rate_delete(self, index, op, data):
+        destination_id = self.own_destination_rates.pop(data['rateId'], None)
+        if destination_id is None:
+            self.results[index] = _result(index, op, 404, error='Calificación no encontrada')
+            return
+        self.rated_destinations.discard(destination_id)
+        self.destination_rates_to_delete.add(data['rateId'])
+        self.results[index] = _result(index, op, 200, id=data['rateId'])
+
+    def _package_rate_create(self, index, op, data):
+        package_id = data['tourPackageId']
+        if package_id not in self.packages:
+            self.results[index] = _result(index, op, 404, error='Paquete turístico no encontrado.')
+        elif package_id in self.rated_packages:
+            self.results[index] = _result(index, op, 400, error='Ya has calificado este paquete turístico')
+        else:
+            self.rated_packages.add(package_id)
+            self.package_rates_to_create[package_id] = (index, data)
+            self.results[index] = _result(index, op, 201, tourPackageId=package_id)
+
+    def _package_rate_delete(self, index, op, data):
+        package_id = self.own_package_rates.pop(data['rateId'], None)
+        if package_id is None:
+            self.results[index] = _result(index, op, 404, error='Calificación no encontrada')
+            return
+        self.rated_packages.discard(package_id)
+        self.package_rates_to_delete.add(data['rateId'])
+        self.results[index] = _result(index, op, 200, id=data['rateId'])
+
+    def _availability_set(self, index, op, data):
+        # La última gana
+        self.availability = data['dates']
+        self.results[index] = _result(index, op, 200, dates=[str(date) for date in data['dates']])
+
+    # --- Aplicación del efecto neto
+
+    def _apply(self):
+        if self.favorites_to_remove:
+            Favorite.objects.filter(
+                user_id=self.user_id, destination_id__in=self.favorites_to_remove
+            ).delete()
+        if self.favorites_to_add:
+            created = Favorite.objects.bulk_create([
+                Favorite(user_id=self.user_id, destination_id=destination_id)
+                for destination_id in self.favorites_to_add
+            ])
+            for favorite in created:
+                if favorite.pk is not None:
+                    self.results[self.favorites_to_add[favorite.destination_id]]['id'] = favorite.pk
+        if self.favorites_to_remove or self.favorites_to_add:
+            invalidate_home_feed(self.user_id)
+
+        # Borrar antes de crear: permite re-calificar en el mismo lote
+        if self.destination_rates_to_delete:
+            DestinationRate.objects.filter(id__in=self.destination_rates_to_delete).delete()
+        if self.package_rates_to_delete:
+            TourPackageRate.objects.filter(id__in=self.package_rates_to_delete).delete()
+
+        self._create_rates(DestinationRate, 'destination_id', self.destination_rates_to_create)
+        self._create_rates(TourPackageRate, 'tour_package_id', self.package_rates_to_create)
+
+        if self.availability is not None:
+            set_travel_dates(self.user_id, self.availability)
+
+    def _create_rates(self, model, target_field, pending):
+        if not pending:
+            return
+        created = model.objects.bulk_create([
+            model(
+                user_id=self.user_id,
+                stars=data['stars'],
+                comment=data.get('comment'),
+                created_at=data['created_at'],
+                **{target_field: target_id}
+            )
+            for target_id, (_, data) in pending.items()
+        ])
+        # bulk_create no dispara señales
+        bump_version('rates')
+        for rate in created:
+            if rate.pk is not None:
+                index = pending[getattr(rate, target_field)][0]
+                self.results[index]['id'] = rate.pk
@@ -0,0 +1,54 @@
+# rutaya/utils/bitsets.py
+"""
+Bitsets sobre enteros de Python: los AND/OR/bit_count de enteros grandes se
+ejecutan palabra a palabra en C, lo que permite intersectar conjuntos
+densos (días, usuarios, filas del catálogo) sin recorrerlos elemento a
+elemento.
+"""
+
+
+def range_bits(start, end):
+    """Bitset con los bits [start, end] encendidos."""
+    return ((1 << (end - start + 1)) - 1) << start
+
+
+def bit_positions(mask):
+    """Posiciones de los bits encendidos, de menor a mayor."""
+    bits = bin(mask)[:1:-1]
+    position = bits.find('1')
+    while position != -1:
+        yield position
+        position = bits.find('1', position + 1)
+
+
+def at_least(bitsets, n, width):
+    """
+    Máscara de las posiciones encendidas en al menos `n` de los bitsets.
+
+    Suma los bitsets como contadores "bit-sliced" (slice i = bit i del
+    contador de cada posición) y compara el resultado con `n`, todo con
+    operaciones sobre enteros completos.
+    """
+    slices = []
+    for bitset in bitsets:
+        carry = bitset
+        for index in range(len(slices)):
+            if not carry:
+                break
+            slices[index], carry = slices[index] ^ carry, slices[index] & carry
+        if carry:
+            slices.append(carry)
+
+    if n > (1 << len(slices)) - 1:
+        return 0
+
+    # Comparador desde el bit más significativo: mayor | igual
+    greater, equal = 0, (1 << width) - 1
+    for index in range(max(len(slices), n.bit_length()) - 1, -1, -1):
+        counter_bit = slices[index] if index < len(slices) else 0
+        if (n >> index) & 1:
+            equal &= counter_bit
+        else:
+            greater |= equal & counter_bit
+            equal &= ~counter_bit
+    return greater | equal
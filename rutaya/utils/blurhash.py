@@ -0,0 +1,85 @@
+# rutaya/utils/blurhash.py
+"""
+Codificador BlurHash (https://blurha.sh): resume una imagen en ~20-30
+caracteres que el cliente decodifica a un placeholder difuminado mientras
+descarga la imagen real.
+
+Se calcula sobre una miniatura (ej: 32x32), así el costo en Python puro es
+de unas decenas de miles de operaciones por imagen.
+"""
+import math
+
+ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def encode(pixels, width, height, x_components=4, y_components=3):
+    """
+    pixels: secuencia de (r, g, b) en sRGB 0-255, por filas.
+    Los componentes (1-9) fijan el detalle horizontal y vertical.
+    """
+    if not (1 <= x_components <= 9 and 1 <= y_components <= 9):
+        raise ValueError("Los componentes de BlurHash deben estar entre 1 y 9")
+    if len(pixels) != width * height:
+        raise ValueError("La cantidad de píxeles no coincide con las dimensiones")
+
+    linear = [(_to_linear(r), _to_linear(g), _to_linear(b)) for r, g, b in pixels]
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(x_components)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(y_components)]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                weight_y = normalisation * cos_y[j][y]
+                for x in range(width):
+                    basis = weight_y * cos_x[i][x]
+                    pr, pg, pb = linear[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = 1 / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, math.floor(actual_max * 166 - 0.5)))
+        maximum = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        maximum = 1
+        result += _base83(0, 1)
+
+    result += _base83((_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4)
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, math.floor(_sign_pow(value / maximum, 0.5) * 9 + 9.5)))
+            for value in factor
+        )
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
+
+
+def _to_linear(value):
+    value = value / 255
+    return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def _base83(value, length):
+    return ''.join(ALPHABET[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1))
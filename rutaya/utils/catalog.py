@@ -0,0 +1,188 @@
+# rutaya/utils/catalog.py
+"""
+Catálogo de destinos en memoria con la marca de favoritos por usuario.
+
+El catálogo se guarda como columnas paralelas ordenadas por (categoría,
+id), de modo que cada categoría es un tramo contiguo de filas: los ids y,
+por fila, dos dicts de respuesta preconstruidos, con isFavorite False y True; la vista de un usuario copia la lista "sin favorito" y solo
+reemplaza las filas encendidas en su bitmap de favoritos (bit i = fila i).
+
+Cada destino lleva `image` (rutaya.utils.images) con dimensiones, blurhash
+y srcset de las variantes procesadas, o None.
+
+Los dicts se comparten entre peticiones: son de solo lectura. Quien
+necesite agregar campos (ej: favorites_count) debe copiarlos. Las formas
+pedidas con ?fields= / ?preview=1 (rutaya.utils.shaping) se preconstruyen
+igual, una vez por forma, la primera vez que se piden.
+
+El catálogo se reconstruye cuando cambia la versión 'catalog' (señales de
+Destination, Category y DestinationImage) o vence CATALOG_TTL. Los más
+populares (conteo de favoritos por destino) se recalculan tras
+CATALOG_POPULAR_TTL.
+"""
+import random
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.db.models import Count
+
+from rutaya.models import Category, Destination, Favorite
+from rutaya.utils.bitsets import bit_positions
+from rutaya.utils.images import image_payload
+from rutaya.utils.versions import get_version
+
+DESTINATION_FIELDS = ('id', 'name', 'location', 'description', 'image_url', 'image')
+
+# Formas distintas guardadas por catálogo (las combinaciones de ?fields= son libres)
+MAX_SHAPES = 32
+
+
+class Catalog:
+    def __init__(self, destination_rows, category_rows, version=None):
+        """
+        destination_rows: (id, name, location, description, image_url,
+        category_id, image) ordenadas por (category_id, id); image es el
+        payload de image_payload() o None.
+        category_rows: (id, name).
+        """
+        self.version = version
+        self.built_at = time.monotonic()
+
+        self.ids = array('q')
+        self.plain, self.starred = [], []
+        self.rows = {}                  # destination_id -> fila
+        self.category_slices = {}       # category_id -> (inicio, fin)
+        self.shaped = {}                # Shape.key -> (plain, starred)
+
+        for row, (destination_id, name, location, description, image_url, category_id, image) in enumerate(destination_rows):
+            self.ids.append(destination_id)
+            self.rows[destination_id] = row
+
+            data = dict(zip(DESTINATION_FIELDS, (destination_id, name, location, description, image_url, image)))
+            self.plain.append({**data, 'isFavorite': False})
+            self.starred.append({**data, 'isFavorite': True})
+
+            start, _ = self.category_slices.get(category_id, (row, row))
+            self.category_slices[category_id] = (start, row + 1)
+
+        self.categories_by_id = sorted(category_rows)
+        self.categories_by_name = sorted(category_rows, key=lambda category: category[1])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def favorites_bitmap(self, destination_ids):
+        bitmap = 0
+        for destination_id in destination_ids:
+            row = self.rows.get(destination_id)
+            if row is not None:
+                bitmap |= 1 << row
+        return bitmap
+
+    def columns(self, shape=None):
+        """Listas (plain, starred) de dicts con la forma pedida."""
+        if shape is None:
+            return self.plain, self.starred
+        columns = self.shaped.get(shape.key)
+        if columns is None:
+            if len(self.shaped) >= MAX_SHAPES:
+                self.shaped.clear()
+            columns = self.shaped[shape.key] = (
+                [shape.shape_dict(data) for data in self.plain],
+                [shape.shape_dict(data) for data in self.starred],
+            )
+        return columns
+
+    def destination(self, row, bitmap, shape=None):
+        plain, starred = self.columns(shape)
+        return starred[row] if (bitmap >> row) & 1 else plain[row]
+
+    def destinations(self, start, end, bitmap, shape=None):
+        """Filas [start, end) con isFavorite según el bitmap."""
+        plain, starred = self.columns(shape)
+        result = plain[start:end]
+        window = (bitmap >> start) & ((1 << (end - start)) - 1)
+        for offset in bit_positions(window):
+            result[offset] = starred[start + offset]
+        return result
+
+    def categories(self, bitmap, order_by='id', shape=None):
+        categories = self.categories_by_name if order_by == 'name' else self.categories_by_id
+        result = []
+        for category_id, name in categories:
+            start, end = self.category_slices.get(category_id, (0, 0))
+            result.append({
+                'id': category_id,
+                'name': name,
+                'destinations': self.destinations(start, end, bitmap, shape)
+            })
+        return result
+
+    def random_rows(self, count, rng=random):
+        return rng.sample(range(len(self)), min(count, len(self)))
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def load_catalog(version=None):
+    destination_rows = (
+        (*row[:6], image_payload(*row[6:]))
+        for row in Destination.objects.order_by('category_id', 'id').values_list(
+            'id', 'name', 'location', 'description', 'image_url', 'category_id',
+            'image__width', 'image__height', 'image__blurhash', 'image__variants'
+        )
+    )
+    category_rows = Category.objects.order_by().values_list('id', 'name')
+    return Catalog(destination_rows, list(category_rows), version=version)
+
+
+def get_catalog():
+    global _catalog
+    version = get_version('catalog')
+    if _is_stale(_catalog, version):
+        with _catalog_lock:
+            # Otro hilo pudo reconstruirlo mientras esperábamos el lock
+            if _is_stale(_catalog, version):
+                _catalog = load_catalog(version)
+    return _catalog
+
+
+def _is_stale(catalog, version):
+    return (
+        catalog is None
+        or catalog.version != version
+        or time.monotonic() - catalog.built_at > settings.CATALOG_TTL
+    )
+
+
+_popular = {}
+_popular_lock = threading.Lock()
+
+
+def get_popular(limit):
+    """
+    [(destination_id, favoritos)] de los `limit` destinos más agregados a
+    favoritos. El conteo recorre todos los favoritos; se comparte entre
+    peticiones durante CATALOG_POPULAR_TTL segundos.
+    """
+    cached = _popular.get(limit)
+    if _popular_expired(cached):
+        with _popular_lock:
+            cached = _popular.get(limit)
+            if _popular_expired(cached):
+                items = [
+                    (item['destination_id'], item['favorites_count'])
+                    for item in Favorite.objects.values('destination_id').annotate(
+                        favorites_count=Count('id')
+                    ).order_by('-favorites_count', 'destination_id')[:limit]
+                ]
+                cached = _popular[limit] = (time.monotonic(), items)
+    return cached[1]
+
+
+def _popular_expired(cached):
+    return cached is None or time.monotonic() - cached[0] > settings.CATALOG_POPULAR_TTL
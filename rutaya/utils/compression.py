@@ -0,0 +1,145 @@
+# rutaya/utils/compression.py
+"""
+Compresión de respuestas: gzip siempre; brotli y zstd si están instalados
+los paquetes `brotli` / `zstandard` (opcionales).
+
+Además, un cache de payloads ya renderizados y comprimidos para respuestas
+compartidas entre usuarios (ej: el feed de la comunidad): cada variante se
+comprime una sola vez y las peticiones siguientes solo copian bytes.
+"""
+import gzip
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+from rutaya.utils.metrics import timed
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+
+def _gzip(data):
+    # mtime=0: la misma entrada produce los mismos bytes (útil para ETags y caches)
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_LEVELS.get('gzip', 6), mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=settings.COMPRESSION_LEVELS.get('br', 5))
+
+
+def _zstd(data):
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_LEVELS.get('zstd', 3)).compress(data)
+
+
+# En orden de preferencia del servidor cuando el cliente acepta varias con el mismo q
+ENCODERS = {}
+if brotli is not None:
+    ENCODERS['br'] = _brotli
+if zstandard is not None:
+    ENCODERS['zstd'] = _zstd
+ENCODERS['gzip'] = _gzip
+
+
+def negotiate(accept_encoding):
+    """Mejor codificación soportada según Accept-Encoding, o None."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODERS:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding):
+    with timed('compress'):
+        return ENCODERS[encoding](data)
+
+
+def is_compressible(content_type, size):
+    if size < settings.COMPRESSION_MIN_BYTES:
+        return False
+    media_type = content_type.split(';')[0].strip().lower()
+    return any(media_type.startswith(prefix) for prefix in settings.COMPRESSION_CONTENT_TYPES)
+
+
+class PrecompressedPayload:
+    """Un payload renderizado y sus variantes comprimidas (se llenan al pedirse)."""
+
+    def __init__(self, body, content_type='application/json'):
+        self.body = body
+        self.content_type = content_type
+        self.variants = {}
+
+    def encoded(self, encoding):
+        body = self.variants.get(encoding)
+        if body is None:
+            body = self.variants[encoding] = compress(self.body, encoding)
+        return body
+
+
+_payloads = None
+_payloads_lock = threading.Lock()
+
+
+def _get_payload(key, build):
+    global _payloads
+    with _payloads_lock:
+        if _payloads is None:
+            _payloads = TTLCache(settings.PRECOMPRESSED_CACHE_SIZE, settings.PRECOMPRESSED_CACHE_TTL)
+        payload = _payloads.get(key)
+    if payload is None:
+        # Construir fuera del lock; si dos hilos coinciden, el último gana
+        payload = PrecompressedPayload(JSONRenderer().render(build()))
+        with _payloads_lock:
+            _payloads[key] = payload
+    return payload
+
+
+def precompressed_response(request, key, build, status=200):
+    """
+    Respuesta JSON para `key` (que debe incluir las versiones de los datos
+    de los que depende). `build()` solo se llama si no está en el cache.
+    """
+    return payload_response(request, _get_payload(key, build), status)
+
+
+def payload_response(request, payload, status=200):
+    """Respuesta con el payload en la codificación que acepte el cliente."""
+    encoding = None
+    if is_compressible(payload.content_type, len(payload.body)):
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    if encoding is None:
+        response = HttpResponse(payload.body, content_type=payload.content_type, status=status)
+    else:
+        with _payloads_lock:
+            body = payload.encoded(encoding)
+        response = HttpResponse(body, content_type=payload.content_type, status=status)
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
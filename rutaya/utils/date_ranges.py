@@ -0,0 +1,93 @@
+# rutaya/utils/date_ranges.py
+"""
+Operaciones sobre rangos de fechas inclusivos `(inicio, fin)`.
+
+Un conjunto de rangos "normalizado" está ordenado y no tiene rangos que se
+solapen ni que sean contiguos (el 1-5 y el 6-9 se fusionan en 1-9).
+"""
+from datetime import timedelta
+
+ONE_DAY = timedelta(days=1)
+
+
+def merge_ranges(ranges):
+    """Normaliza una lista de rangos: ordena y fusiona solapados o contiguos."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def dates_to_ranges(dates):
+    """Convierte fechas sueltas en rangos normalizados."""
+    return merge_ranges((date, date) for date in dates)
+
+
+def subtract_ranges(ranges, removed):
+    """Rangos de `ranges` sin los días cubiertos por `removed` (ambos normalizados)."""
+    result = []
+    removed = list(removed)
+    index = 0
+    for start, end in ranges:
+        # Saltar los rangos a quitar que terminan antes de este
+        while index < len(removed) and removed[index][1] < start:
+            index += 1
+        current = start
+        cursor = index
+        while cursor < len(removed) and removed[cursor][0] <= end:
+            cut_start, cut_end = removed[cursor]
+            if cut_start > current:
+                result.append((current, cut_start - ONE_DAY))
+            current = max(current, cut_end + ONE_DAY)
+            cursor += 1
+        if current <= end:
+            result.append((current, end))
+    return result
+
+
+def expand_ranges(ranges):
+    """Itera los días de cada rango en orden."""
+    for start, end in ranges:
+        day = start
+        while day <= end:
+            yield day
+            day += ONE_DAY
+
+
+def range_days(start, end):
+    return (end - start).days + 1
+
+
+def overlap_days(ranges, others):
+    """Días en común entre dos conjuntos de rangos normalizados."""
+    total = 0
+    i = j = 0
+    while i < len(ranges) and j < len(others):
+        start = max(ranges[i][0], others[j][0])
+        end = min(ranges[i][1], others[j][1])
+        if start <= end:
+            total += range_days(start, end)
+        if ranges[i][1] < others[j][1]:
+            i += 1
+        else:
+            j += 1
+    return total
+
+
+def serialize_ranges(ranges):
+    return [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in ranges]
+
+
+def format_ranges(ranges):
+    """Una línea por rango, para inyectar en prompts."""
+    lines = []
+    for start, end in ranges:
+        if start == end:
+            lines.append(start.isoformat())
+        else:
+            lines.append(f"del {start.isoformat()} al {end.isoformat()} ({range_days(start, end)} días)")
+    return lines
@@ -1,17 +1,20 @@
-import google.generativeai as genai
+# rutaya/utils/gemini_api.py
+"""
+Asistente de viajes: arma el prompt con los datos del usuario y lo envía al
+backend que corresponda (rutaya.utils.llm_backends, ruta 'chat' o
+'package').
+"""
 from rutaya.models import Favorite, TravelAvailability, Destination, User
 
-from rutaya.utils.config import GOOGLE_API_KEY
+from rutaya.utils.date_ranges import format_ranges
+from rutaya.utils.llm_backends import get_client, route_for
 
-genai.configure(api_key=GOOGLE_API_KEY)
 
+def send_message(data):
+    return generate(build_prompt(data), route=route_for(data.get("mode")))
 
-import google.generativeai as genai
-from rutaya.utils.config import GOOGLE_API_KEY
-
-genai.configure(api_key=GOOGLE_API_KEY)
 
-def send_message(data):
+def build_prompt(data):
     user_id = data.get("userId")
     current_message = data.get("currentMessage")
     previous_messages = data.get("previousMessages", [])
@@ -24,8 +27,8 @@ def send_message(data):
     favorite_destinations = Favorite.objects.filter(user=user).select_related('destination')
     favorite_names = [f"{fav.destination.name} - {fav.destination.location}" for fav in favorite_destinations]
 
-    # Obtener disponibilidad
-    availability_dates = TravelAvailability.objects.filter(user=user).values_list('date', flat=True)
+    # Obtener disponibilidad (rangos, una línea por rango en el prompt)
+    availability_ranges = TravelAvailability.objects.filter(user=user).values_list('start_date', 'end_date')
 
     # Construir el prompt
     prompt = """
@@ -98,10 +101,10 @@ def send_message(data):
         prompt += "\n🌟 *Destinos favoritos del usuario:* Ninguno aún.\n"
 
     # Agregar disponibilidad
-    if availability_dates:
+    if availability_ranges:
         prompt += "\n📅 *Fechas disponibles para viajar:*\n"
-        for date in availability_dates:
-            prompt += f"- {date}\n"
+        for line in format_ranges(availability_ranges):
+            prompt += f"- {line}\n"
     else:
         prompt += "\n📅 *Fechas disponibles para viajar:* No registradas.\n"
 
@@ -115,8 +118,9 @@ def send_message(data):
     # Mensaje actual
     prompt += f"\n🧍 Usuario: {current_message}\n🤖 Bot:"
 
-    # Enviar a Gemini
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    response = model.generate_content(prompt)
+    return prompt
+
 
-    return response.text.strip()
+def generate(prompt, route='chat'):
+    """Respuesta del modelo con plazo, reintentos y circuit breaker (rutaya.utils.llm_client)."""
+    return get_client(route)(prompt)
@@ -0,0 +1,109 @@
+# rutaya/utils/hashing.py
+"""
+Límite de hashes de contraseña simultáneos en el host.
+
+Un hash (scrypt/PBKDF2) ocupa un núcleo decenas o cientos de milisegundos;
+sin límite, una ráfaga de logins pone a todos los hilos a hashear a la vez y
+degrada al resto de endpoints. Las funciones de hashlib liberan el GIL, así
+que basta con limitar cuántos hilos hashean a la vez, pero el límite tiene
+que cubrir a todos los workers del host (gunicorn arranca varios procesos):
+cada lugar es un archivo en PASSWORD_HASHING_LOCK_DIR tomado con flock, así
+que como mucho PASSWORD_HASHING_CONCURRENCY hashes corren a la vez entre
+todos los procesos que usan ese directorio. Si un proceso muere, el sistema
+libera sus lugares. Si no hay lugar en PASSWORD_HASHING_WAIT segundos, la
+petición se rechaza con 503.
+
+Sin fcntl (Windows) el límite es por proceso, con un semáforo.
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.exceptions import APIException
+
+from rutaya.utils.metrics import timed
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+class HashingBusy(APIException):
+    status_code = 503
+    default_detail = 'Servidor ocupado, intenta nuevamente en unos segundos.'
+    default_code = 'hashing_busy'
+
+
+class HostSlots:
+    """Semáforo entre procesos: un archivo por lugar, tomado con flock."""
+
+    def __init__(self, directory, size):
+        os.makedirs(directory, exist_ok=True)
+        self.paths = [os.path.join(directory, f'slot-{index}.lock') for index in range(size)]
+
+    def acquire(self, timeout):
+        """Descriptor del lugar tomado, o None si no se liberó ninguno a tiempo."""
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            # En otro orden cada vez, para no competir todos por el primero
+            for path in random.sample(self.paths, len(self.paths)):
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+
+    def release(self, fd):
+        # Cerrar el descriptor libera el flock
+        os.close(fd)
+
+
+class ProcessSlots:
+    """Semáforo del proceso, cuando no hay flock."""
+
+    def __init__(self, size):
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    def acquire(self, timeout):
+        return True if self._semaphore.acquire(timeout=timeout) else None
+
+    def release(self, token):
+        self._semaphore.release()
+
+
+def _get_slots():
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                size = settings.PASSWORD_HASHING_CONCURRENCY
+                _slots = HostSlots(settings.PASSWORD_HASHING_LOCK_DIR, size) if fcntl else ProcessSlots(size)
+    return _slots
+
+
+@contextmanager
+def hashing_slot():
+    """Envuelve las llamadas que hashean (authenticate, set_password, create_user)."""
+    slots = _get_slots()
+    token = slots.acquire(settings.PASSWORD_HASHING_WAIT)
+    if token is None:
+        raise HashingBusy()
+    try:
+        with timed('hashing'):
+            yield
+    finally:
+        slots.release(token)
@@ -0,0 +1,116 @@
+# rutaya/utils/home_feed.py
+"""
+Home de cada usuario en memoria: un LRU con TTL (HOME_FEED_CACHE_SIZE /
+HOME_FEED_CACHE_TTL) que guarda por usuario sus favoritos y las respuestas
+ya armadas, una por forma (?fields= / ?preview=1). Volver a abrir el home
+no consulta la base.
+
+- invalidate_home_feed() incrementa, al confirmar la transacción, una
+  versión por usuario en el cache de Django (rutaya.utils.versions); cada
+  lectura la compara con la del home guardado, así una escritura atendida
+  por otro worker también lo invalida. La llaman las señales de Favorite,
+  UserPreferences y TravelAvailability, y los caminos que no las disparan o
+  que con un receptor de post_delete borrarían fila por fila (insert_ignore,
+  bulk_create, QuerySet.delete).
+- Si cambia el catálogo (versión o reconstrucción) las respuestas se
+  rearman con los favoritos guardados, sin volver a leerlos.
+- Las sugerencias rotan cada HOME_SUGGESTIONS_ROTATION segundos: se eligen
+  con una semilla (usuario, período), así son las mismas en todos los
+  procesos dentro del período.
+
+Los "más populares" quedan como estaban al armar la respuesta; el TTL
+acota eso.
+
+Las respuestas comparten los dicts del catálogo: son de solo lectura.
+"""
+import random
+import threading
+import time
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db import transaction
+
+from rutaya.utils.catalog import get_catalog
+from rutaya.utils.versions import bump_version, get_version
+
+# La versión de un usuario que no abre el home vence; al volver se arma de nuevo
+VERSION_TIMEOUT = 24 * 3600
+
+
+class HomeFeed:
+    """
+    Favoritos de un usuario (leídos con su versión `version`) y sus respuestas
+    para un catálogo y un período de sugerencias.
+    """
+
+    def __init__(self, favorite_ids, version, catalog_key, period):
+        self.favorite_ids = favorite_ids
+        self.version = version
+        self.catalog_key = catalog_key
+        self.period = period
+        self.payloads = {}
+
+
+_feeds = None
+_feeds_lock = threading.Lock()
+
+
+def _feed_cache():
+    global _feeds
+    if _feeds is None:
+        _feeds = TTLCache(settings.HOME_FEED_CACHE_SIZE, settings.HOME_FEED_CACHE_TTL)
+    return _feeds
+
+
+def _version_name(user_id):
+    return f'home:{user_id}'
+
+
+def suggestions_period():
+    return int(time.time() // settings.HOME_SUGGESTIONS_ROTATION)
+
+
+def get_home_feed(user_id, shape, load_favorites, build):
+    """
+    Respuesta del home del usuario. Solo si no está en el cache se llama a
+    load_favorites() (ids de destinos favoritos; consulta la base) y, por
+    cada forma, a build(favorite_ids, shape, rng), con rng el generador de
+    las sugerencias del período.
+    """
+    catalog = get_catalog()
+    catalog_key = (catalog.version, catalog.built_at)
+    period = suggestions_period()
+    # Se lee antes que los favoritos: si una escritura la incrementa mientras
+    # tanto, el home guardado queda con la versión vieja y la próxima lectura
+    # lo vuelve a armar
+    version = get_version(_version_name(user_id), VERSION_TIMEOUT)
+
+    with _feeds_lock:
+        feed = _feed_cache().get(user_id)
+
+    if feed is None or feed.version != version:
+        feed = HomeFeed(frozenset(load_favorites()), version, catalog_key, period)
+    elif feed.catalog_key != catalog_key or feed.period != period:
+        feed = HomeFeed(feed.favorite_ids, version, catalog_key, period)
+
+    shape_key = shape.key if shape else None
+    payload = feed.payloads.get(shape_key)
+    if payload is None:
+        payload = feed.payloads[shape_key] = build(
+            feed.favorite_ids, shape, random.Random(f'{user_id}:{period}')
+        )
+        with _feeds_lock:
+            _feed_cache()[user_id] = feed
+    return payload
+
+
+def invalidate_home_feed(user_id):
+    """Invalida el home del usuario en todos los procesos (al confirmar la transacción en curso)."""
+    bump_version(_version_name(user_id), VERSION_TIMEOUT)
+    transaction.on_commit(lambda: _evict(user_id))
+
+
+def _evict(user_id):
+    with _feeds_lock:
+        _feed_cache().pop(user_id, None)
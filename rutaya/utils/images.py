@@ -0,0 +1,167 @@
+# rutaya/utils/images.py
+"""
+Pipeline de imágenes de destinos. A partir del original (descargado de
+`image_url` o leído de un directorio local) genera variantes redimensionadas
+en WebP y JPEG, el placeholder blurhash y las dimensiones, y los guarda en
+el storage de Django (DestinationImage).
+
+Los nombres de las variantes llevan el hash del original, así una URL nunca
+cambia de contenido y un CDN puede cachearla sin vencimiento
+(IMAGE_BASE_URL apunta al CDN; por defecto se usa MEDIA_URL).
+
+Procesar requiere Pillow (se importa al procesar, no al cargar el módulo:
+el catálogo usa este módulo para los payloads y no debe pagar ese import);
+servir los payloads solo lee lo guardado.
+"""
+import hashlib
+import io
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from rutaya.models import DestinationImage
+from rutaya.utils import blurhash
+
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# Lado mayor de la miniatura sobre la que se calcula el blurhash
+BLURHASH_SAMPLE_SIZE = 32
+
+
+class ImageProcessingError(Exception):
+    pass
+
+
+def fetch_image(url):
+    """Descarga un original respetando IMAGE_MAX_SOURCE_BYTES."""
+    limit = settings.IMAGE_MAX_SOURCE_BYTES
+    try:
+        with requests.get(url, stream=True, timeout=settings.IMAGE_FETCH_TIMEOUT) as response:
+            response.raise_for_status()
+            data = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                data.extend(chunk)
+                if len(data) > limit:
+                    raise ImageProcessingError(f"La imagen supera {limit} bytes: {url}")
+            return bytes(data)
+    except requests.RequestException as e:
+        raise ImageProcessingError(f"No se pudo descargar {url}: {e}") from e
+
+
+def process_image(data):
+    """
+    (width, height, blurhash, variants) de un original en bytes; variants es
+    una lista de (format, width, height, bytes) sin agrandar la imagen.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:  # pragma: no cover - solo lo necesita el procesamiento
+        raise ImageProcessingError("Procesar imágenes requiere Pillow (pip install Pillow)")
+    try:
+        image = Image.open(io.BytesIO(data))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f"Imagen inválida: {e}") from e
+
+    width, height = image.size
+
+    sample = image.copy()
+    sample.thumbnail((BLURHASH_SAMPLE_SIZE, BLURHASH_SAMPLE_SIZE))
+    placeholder = blurhash.encode(list(sample.getdata()), *sample.size, *settings.IMAGE_BLURHASH_COMPONENTS)
+
+    variants = []
+    for variant_width in sorted({min(size, width) for size in settings.IMAGE_VARIANT_WIDTHS}):
+        variant_height = max(1, round(height * variant_width / width))
+        resized = image if variant_width == width else image.resize(
+            (variant_width, variant_height), Image.Resampling.LANCZOS
+        )
+        for image_format in settings.IMAGE_VARIANT_FORMATS:
+            buffer = io.BytesIO()
+            resized.save(buffer, PIL_FORMATS[image_format], **settings.IMAGE_ENCODER_OPTIONS.get(image_format, {}))
+            variants.append((image_format, variant_width, variant_height, buffer.getvalue()))
+    return width, height, placeholder, variants
+
+
+def save_destination_image(destination, data, source, force=False):
+    """
+    Procesa y guarda la imagen de un destino. Devuelve (DestinationImage,
+    procesada); si el original no cambió y no se fuerza, no se reprocesa.
+    """
+    checksum = hashlib.sha256(data).hexdigest()
+    current = DestinationImage.objects.filter(destination=destination).first()
+    if current is not None and current.checksum == checksum and not force:
+        return current, False
+
+    width, height, placeholder, variants = process_image(data)
+
+    stored = []
+    for image_format, variant_width, variant_height, content in variants:
+        name = f"{settings.IMAGE_STORAGE_PREFIX}/{destination.id}/{checksum[:16]}-{variant_width}.{EXTENSIONS[image_format]}"
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        name = default_storage.save(name, ContentFile(content))
+        stored.append({'format': image_format, 'width': variant_width, 'height': variant_height, 'name': name})
+
+    image, _ = DestinationImage.objects.update_or_create(
+        destination=destination,
+        defaults={
+            'source': source[:500],
+            'checksum': checksum,
+            'width': width,
+            'height': height,
+            'blurhash': placeholder,
+            'variants': stored,
+        }
+    )
+
+    # Variantes de un original anterior que ya no se referencian
+    if current is not None:
+        names = {variant['name'] for variant in stored}
+        for variant in current.variants:
+            if variant['name'] not in names:
+                default_storage.delete(variant['name'])
+    return image, True
+
+
+def variant_url(name):
+    base_url = settings.IMAGE_BASE_URL
+    if base_url:
+        return base_url.rstrip('/') + '/' + name
+    return default_storage.url(name)
+
+
+def image_payload(width, height, placeholder, variants):
+    """
+    Metadatos para los clientes: dimensiones (para reservar el espacio),
+    blurhash, `src` (JPEG del ancho por defecto) y un srcset por formato.
+    None si el destino aún no tiene imagen procesada.
+    """
+    if not variants:
+        return None
+
+    srcset, src = {}, None
+    for variant in sorted(variants, key=lambda variant: variant['width']):
+        url = variant_url(variant['name'])
+        candidates = srcset.setdefault(variant['format'], [])
+        candidates.append(f"{url} {variant['width']}w")
+        if variant['format'] == 'jpeg' and (src is None or variant['width'] <= settings.IMAGE_DEFAULT_WIDTH):
+            src = url
+
+    return {
+        'width': width,
+        'height': height,
+        'blurhash': placeholder,
+        'src': src,
+        'srcset': {image_format: ', '.join(candidates) for image_format, candidates in srcset.items()},
+    }
+
+
+def destination_image_payload(destination):
+    try:
+        image = destination.image
+    except DestinationImage.DoesNotExist:
+        return None
+    return image_payload(image.width, image.height, image.blurhash, image.variants)
@@ -0,0 +1,301 @@
+# rutaya/utils/llm_backends.py
+"""
+Backends de modelos de lenguaje intercambiables.
+
+Cada backend implementa generate(prompt, timeout, json_schema),
+stream(prompt, timeout, json_schema) (iterador de fragmentos de texto) y
+count_tokens(text). Con json_schema el backend pide al modelo JSON que
+cumpla ese esquema (subconjunto de JSON Schema que aceptan Gemini y la API
+de OpenAI: type, properties, items, required, description):
+
+- GeminiBackend: google.generativeai (se importa y configura una sola vez,
+  al primer uso).
+- OpenAICompatibleBackend: cualquier endpoint /v1/chat/completions (ej: un
+  servidor local de llama.cpp o vLLM, o el comando run_fake_llm_server).
+- FakeBackend: respuestas deterministas, para tests y pruebas de carga
+  sin red.
+
+LLM_BACKENDS define los backends por nombre y LLM_ROUTES qué backend usa
+cada tipo de mensaje ('chat' para la conversación, 'package' cuando el
+cliente pide generar el paquete con mode="package"). get_client(route)
+devuelve el backend envuelto en el cliente resiliente
+(rutaya.utils.llm_client).
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+from django.conf import settings
+
+from rutaya.utils.llm_client import CircuitBreaker, ResilientClient
+from rutaya.utils.llm_quota import estimate_tokens
+
+class LLMBackend:
+    retryable_errors = (ConnectionError, TimeoutError)
+
+    def generate(self, prompt, timeout=None, json_schema=None):
+        raise NotImplementedError
+
+    def stream(self, prompt, timeout=None, json_schema=None):
+        # Por defecto, un único fragmento con la respuesta completa
+        yield self.generate(prompt, timeout=timeout, json_schema=json_schema)
+
+    def call(self, prompt, timeout=None, json_schema=None, parser=None):
+        """
+        Lo que envuelve el cliente resiliente. Con `parser` (una clase con
+        feed(texto) y close()) la respuesta se consume en stream y se devuelve
+        parser.close(); cada intento (reintento o hedge) usa su propio parser.
+        """
+        if parser is None:
+            return self.generate(prompt, timeout=timeout, json_schema=json_schema)
+        incremental = parser()
+        for chunk in self.stream(prompt, timeout=timeout, json_schema=json_schema):
+            incremental.feed(chunk)
+        return incremental.close()
+
+    def count_tokens(self, text):
+        return estimate_tokens(text)
+
+
+class GeminiBackend(LLMBackend):
+    _configure_lock = threading.Lock()
+    _configured = False
+
+    def __init__(self, model='gemini-1.5-flash', api_key=None):
+        self.model_name = model
+        self.api_key = api_key
+
+    @property
+    def retryable_errors(self):
+        from google.api_core import exceptions as google_exceptions
+
+        return (
+            google_exceptions.ServerError,
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.DeadlineExceeded,
+            ConnectionError,
+            TimeoutError,
+        )
+
+    def _model(self):
+        import google.generativeai as genai
+
+        if not GeminiBackend._configured:
+            with GeminiBackend._configure_lock:
+                if not GeminiBackend._configured:
+                    genai.configure(api_key=self.api_key or _default_google_api_key())
+                    GeminiBackend._configured = True
+        return genai.GenerativeModel(self.model_name)
+
+    @staticmethod
+    def _generation_config(json_schema):
+        if json_schema is None:
+            return None
+        return {'response_mime_type': 'application/json', 'response_schema': json_schema}
+
+    def generate(self, prompt, timeout=None, json_schema=None):
+        response = self._model().generate_content(
+            prompt, generation_config=self._generation_config(json_schema), request_options={'timeout': timeout}
+        )
+        return response.text.strip()
+
+    def stream(self, prompt, timeout=None, json_schema=None):
+        response = self._model().generate_content(
+            prompt, stream=True, generation_config=self._generation_config(json_schema),
+            request_options={'timeout': timeout}
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def count_tokens(self, text):
+        return self._model().count_tokens(text).total_tokens
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    retryable_errors = (
+        requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError,
+    )
+
+    class ServerError(Exception):
+        """Respuesta 429/5xx del servidor: reintentable."""
+
+    def __init__(self, base_url, model, api_key=None, temperature=0.7, max_tokens=None):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.api_key = api_key
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.retryable_errors = type(self).retryable_errors + (self.ServerError,)
+
+    def _post(self, prompt, timeout, json_schema=None, stream=False):
+        payload = {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'temperature': self.temperature,
+            'stream': stream,
+        }
+        if self.max_tokens:
+            payload['max_tokens'] = self.max_tokens
+        if json_schema is not None:
+            payload['response_format'] = {
+                'type': 'json_schema',
+                'json_schema': {'name': 'respuesta', 'schema': json_schema},
+            }
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        response = requests.post(
+            f'{self.base_url}/chat/completions', json=payload, headers=headers, timeout=timeout, stream=stream
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            raise self.ServerError(f"{response.status_code}: {response.text[:200]}")
+        response.raise_for_status()
+        return response
+
+    def generate(self, prompt, timeout=None, json_schema=None):
+        data = self._post(prompt, timeout, json_schema).json()
+        return data['choices'][0]['message']['content'].strip()
+
+    def stream(self, prompt, timeout=None, json_schema=None):
+        # Server-sent events: líneas "data: {json}" y un "data: [DONE]" final
+        with self._post(prompt, timeout, json_schema, stream=True) as response:
+            # SSE es UTF-8 siempre; requests asumiría latin-1 sin charset
+            for line in response.iter_lines():
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].decode('utf-8').strip()
+                if data == '[DONE]':
+                    break
+                content = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                if content:
+                    yield content
+
+
+class FakeBackend(LLMBackend):
+    """
+    Respuesta fija elegida por hash del prompt; `latency` simula la espera.
+    Con json_schema arma un JSON de ejemplo que cumple el esquema (un
+    paquete a Cusco dentro de 30 días).
+    """
+    RESPONSES = (
+        "¡Hola! ¿A dónde te gustaría viajar? 🌄",
+        "Cusco es ideal para 4 días: Machu Picchu, Valle Sagrado y Pisac. ¿Cuántas personas viajan?",
+        "¿Prefieres playa o montaña para esas fechas?",
+    )
+    SAMPLE_VALUES = {
+        'title': "Cusco mágico en 4 días",
+        'description': "Machu Picchu, Valle Sagrado y el centro histórico de Cusco.",
+        'days': 4,
+        'quantity': 2,
+        'price': 1850.0,
+    }
+    SAMPLE_ACTIVITIES = (
+        "Vuelo Lima - Cusco y check-in en el hotel",
+        "City tour por el centro histórico de Cusco",
+        "Valle Sagrado: Pisac y Ollantaytambo",
+        "Tren a Aguas Calientes y visita a Machu Picchu",
+    )
+
+    def __init__(self, latency=0.0, responses=None):
+        self.latency = latency
+        self.responses = tuple(responses or self.RESPONSES)
+
+    def generate(self, prompt, timeout=None, json_schema=None):
+        if self.latency:
+            if timeout is not None and self.latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError("timeout del backend falso")
+            time.sleep(self.latency)
+        if json_schema is not None:
+            return json.dumps(self._sample(json_schema), ensure_ascii=False)
+        digest = hashlib.sha256(prompt.encode()).digest()
+        return self.responses[digest[0] % len(self.responses)]
+
+    def stream(self, prompt, timeout=None, json_schema=None):
+        answer = self.generate(prompt, timeout=timeout, json_schema=json_schema)
+        for word in re.findall(r'\S+\s*', answer):
+            yield word
+
+    def _sample(self, schema, name=None, index=0, parent=None):
+        kind = schema.get('type')
+        if kind == 'object':
+            return {
+                key: self._sample(sub, key, index, parent=name)
+                for key, sub in schema.get('properties', {}).items()
+            }
+        if kind == 'array':
+            return [self._sample(schema['items'], name, i) for i in range(len(self.SAMPLE_ACTIVITIES))]
+        if name == 'index':
+            return index
+        start = date.today() + timedelta(days=30)
+        if name in ('start_date', 'datetime'):
+            return f"{start + timedelta(days=index // 2):%Y-%m-%d}T{'08:00' if index % 2 == 0 else '15:00'}"
+        if parent == 'itinerary' and name == 'description':
+            return self.SAMPLE_ACTIVITIES[index % len(self.SAMPLE_ACTIVITIES)]
+        if name in self.SAMPLE_VALUES:
+            return self.SAMPLE_VALUES[name]
+        return 0 if kind in ('integer', 'number') else ''
+
+
+BACKEND_CLASSES = {
+    'gemini': GeminiBackend,
+    'openai': OpenAICompatibleBackend,
+    'fake': FakeBackend,
+}
+
+
+def _default_google_api_key():
+    from rutaya.utils.config import GOOGLE_API_KEY
+
+    return GOOGLE_API_KEY
+
+
+def build_backend(config):
+    options = dict(config)
+    return BACKEND_CLASSES[options.pop('class')](**options)
+
+
+def route_for(mode):
+    """
+    'package' solo si el cliente lo pide explícitamente (mode="package", el
+    botón de generar el paquete); cualquier otro mensaje va a 'chat'. No se
+    adivina a partir del texto: una negación o una pregunta sobre el paquete
+    no es una confirmación.
+    """
+    return 'package' if mode == 'package' else 'chat'
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(route='chat'):
+    """Cliente resiliente del backend asignado a la ruta (uno por backend y configuración)."""
+    name = settings.LLM_ROUTES.get(route) or settings.LLM_ROUTES['chat']
+    config = settings.LLM_BACKENDS[name]
+    key = (name, json.dumps(config, sort_keys=True))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                backend = build_backend(config)
+                client = _clients[key] = ResilientClient(
+                    name,
+                    backend.call,
+                    timeout=settings.LLM_TIMEOUT,
+                    retries=settings.LLM_RETRIES,
+                    backoff=settings.LLM_RETRY_BACKOFF,
+                    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+                    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+                    breaker=CircuitBreaker(name, settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET),
+                    retryable=backend.retryable_errors,
+                    max_workers=settings.LLM_CLIENT_WORKERS,
+                )
+                # stream()/count_tokens() van directo al backend, sin reintentos
+                client.backend = backend
+    return client
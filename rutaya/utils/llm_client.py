@@ -0,0 +1,226 @@
+# rutaya/utils/llm_client.py
+"""
+Cliente resiliente para llamadas a modelos de lenguaje.
+
+Envuelve una función `call(prompt, timeout=segundos, **opciones)` con:
+- Plazo por llamada (LLM_TIMEOUT): la llamada corre en un pool de hilos y la
+  petición deja de esperarla al vencer el plazo; el timeout restante se
+  pasa también a la llamada para que corte la conexión.
+- Reintentos con backoff exponencial y jitter completo, solo para errores
+  reintentables y mientras quede plazo.
+- Hedging opcional: si un intento tarda más que el percentil
+  LLM_HEDGE_PERCENTILE de las latencias recientes, se lanza un segundo
+  intento en paralelo y gana el primero que responda.
+- Circuit breaker: tras LLM_BREAKER_FAILURES fallos seguidos se rechaza
+  sin llamar durante LLM_BREAKER_RESET segundos; luego se deja pasar una
+  llamada de prueba.
+- Métricas de latencia, resultados, reintentos y hedges en
+  rutaya.utils.metrics.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rutaya.utils.metrics import registry
+
+registry.describe('rutaya_llm_call_duration_seconds', 'Latencia de las llamadas al modelo (con reintentos)')
+registry.describe('rutaya_llm_calls_total', 'Llamadas al modelo por resultado')
+registry.describe('rutaya_llm_retries_total', 'Reintentos de llamadas al modelo')
+registry.describe('rutaya_llm_hedges_total', 'Intentos paralelos lanzados por latencia alta')
+registry.describe('rutaya_llm_circuit_open_total', 'Aperturas del circuit breaker')
+
+
+class LLMError(Exception):
+    """Error de la capa de cliente; `retryable` indica si vale la pena reintentar."""
+    retryable = False
+
+
+class LLMTimeout(LLMError):
+    retryable = True
+
+
+class LLMUnavailable(LLMError):
+    """El circuit breaker está abierto: el backend se considera caído."""
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise LLMUnavailable(f"{self.name}: circuito abierto")
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN:
+                # Una sola llamada de prueba; el resto falla rápido hasta saber el resultado
+                if self._trial_running:
+                    raise LLMUnavailable(f"{self.name}: circuito en prueba")
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    registry.inc('rutaya_llm_circuit_open_total', {'client': self.name})
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+
+
+class LatencyWindow:
+    """Latencias recientes de intentos exitosos, para decidir cuándo hacer hedging."""
+
+    def __init__(self, size=200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent, min_samples=1):
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class ResilientClient:
+    def __init__(self, name, call, timeout=30.0, retries=2, backoff=(0.5, 4.0),
+                 hedge_percentile=None, hedge_min_samples=20, breaker=None,
+                 retryable=(), max_workers=32):
+        """
+        call: función (prompt, timeout=..., **opciones) -> respuesta; las
+        opciones de cada llamada se le pasan tal cual.
+        retryable: excepciones del backend que se reintentan (además de
+        LLMError con retryable=True). El resto se propaga sin reintentar.
+        """
+        self.name = name
+        self.call = call
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base, self.backoff_max = backoff
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker(name)
+        self.retryable = tuple(retryable)
+        self.latencies = LatencyWindow()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'rutaya-llm-{name}')
+
+    def __call__(self, prompt, timeout=None, **options):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        start = time.perf_counter()
+        labels = {'client': self.name}
+        try:
+            result = self._call_with_retries(prompt, deadline, options)
+        except Exception as e:
+            outcome = 'unavailable' if isinstance(e, LLMUnavailable) else (
+                'timeout' if isinstance(e, LLMTimeout) else 'error'
+            )
+            registry.inc('rutaya_llm_calls_total', {**labels, 'outcome': outcome})
+            registry.observe('rutaya_llm_call_duration_seconds', time.perf_counter() - start,
+                             {**labels, 'outcome': outcome})
+            raise
+        registry.inc('rutaya_llm_calls_total', {**labels, 'outcome': 'ok'})
+        registry.observe('rutaya_llm_call_duration_seconds', time.perf_counter() - start, {**labels, 'outcome': 'ok'})
+        return result
+
+    def is_retryable(self, error):
+        if isinstance(error, LLMError):
+            return error.retryable
+        return isinstance(error, self.retryable)
+
+    def _call_with_retries(self, prompt, deadline, options):
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = self._attempt(prompt, deadline, options)
+            except Exception as e:
+                retryable = self.is_retryable(e)
+                # Los errores del pedido (no reintentables) no indican que el backend esté caído
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if not retryable or attempt >= self.retries:
+                    raise
+                # Jitter completo: evita que los clientes reintenten sincronizados
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                registry.inc('rutaya_llm_retries_total', {'client': self.name})
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _attempt(self, prompt, deadline, options):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMTimeout(f"{self.name}: plazo vencido")
+
+        futures = {self._submit(prompt, remaining, options)}
+        hedge_after = None
+        if self.hedge_percentile is not None:
+            hedge_after = self.latencies.percentile(self.hedge_percentile, self.hedge_min_samples)
+
+        hedged = False
+        error = None
+        while futures:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            if hedge_after is not None and not hedged:
+                wait_for = min(remaining, hedge_after)
+            done, futures = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+            if error is not None and not futures:
+                raise error
+
+            if not done and hedge_after is not None and not hedged:
+                hedged = True
+                registry.inc('rutaya_llm_hedges_total', {'client': self.name})
+                futures.add(self._submit(prompt, deadline - time.monotonic(), options))
+
+        if error is not None:
+            raise error
+        raise LLMTimeout(f"{self.name}: sin respuesta en el plazo")
+
+    def _submit(self, prompt, timeout, options):
+        def run():
+            start = time.perf_counter()
+            result = self.call(prompt, timeout=timeout, **options)
+            self.latencies.add(time.perf_counter() - start)
+            return result
+
+        return self._executor.submit(run)
@@ -0,0 +1,157 @@
+# rutaya/utils/llm_quota.py
+"""
+Cuotas del endpoint de IA (/api/v1/content/generate/):
+
+- Presupuesto diario de tokens por usuario autenticado
+  (LLM_DAILY_TOKEN_BUDGETS), con los tokens estimados por el tamaño del
+  prompt y de la respuesta. Los contadores viven en el cache de Django.
+- Cola con prioridad para las llamadas al modelo: como mucho
+  LLM_MAX_CONCURRENCY a la vez; cuando se libera un lugar lo toman primero
+  los usuarios con paquetes pagados y, entre iguales, el que llegó antes.
+
+La limitación por IP/usuario (contadores compartidos) está en
+rutaya.throttling.LLMRateThrottle.
+"""
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import APIException, Throttled
+
+from rutaya.models import TourPackage
+
+PRIORITY_PAID = 0
+PRIORITY_DEFAULT = 1
+
+# Aproximación habitual para texto en español/inglés
+CHARS_PER_TOKEN = 4
+
+PAID_CACHE_TTL = 300
+
+
+class LLMBusy(APIException):
+    status_code = 503
+    default_detail = 'El asistente está ocupado, intenta nuevamente en unos segundos.'
+    default_code = 'llm_busy'
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def is_priority_user(user_id):
+    """Usuarios con al menos un paquete pagado (cacheado unos minutos)."""
+    key = f'rutaya:llm:paid:{user_id}'
+    paid = cache.get(key)
+    if paid is None:
+        paid = TourPackage.objects.filter(user_id=user_id, is_paid=True).exists()
+        cache.set(key, paid, PAID_CACHE_TTL)
+    return paid
+
+
+# --- Presupuesto diario de tokens
+
+def _usage_key(user_id):
+    return f'rutaya:llm:tokens:{user_id}:{date.today().isoformat()}'
+
+
+def daily_budget(paid):
+    return settings.LLM_DAILY_TOKEN_BUDGETS.get('paid' if paid else 'free')
+
+
+def tokens_used_today(user_id):
+    return cache.get(_usage_key(user_id), 0)
+
+
+def check_budget(user_id, prompt_tokens, paid=False):
+    """Rechaza (429) si el prompt no entra en lo que queda del día."""
+    budget = daily_budget(paid)
+    if budget is not None and tokens_used_today(user_id) + prompt_tokens > budget:
+        raise Throttled(detail='Alcanzaste el límite diario del asistente. Vuelve a intentarlo mañana.')
+
+
+def record_usage(user_id, tokens):
+    key = _usage_key(user_id)
+    # Dos días: la clave incluye la fecha, basta con que dure hasta mañana
+    cache.add(key, 0, timeout=2 * 24 * 3600)
+    try:
+        return cache.incr(key, tokens)
+    except ValueError:
+        # Expulsada entre add e incr
+        cache.set(key, tokens, timeout=2 * 24 * 3600)
+        return tokens
+
+
+# --- Cola con prioridad
+
+class PrioritySemaphore:
+    """
+    Semáforo cuyos lugares liberados se entregan al que espera con menor
+    `priority` (y, a igual prioridad, al más antiguo).
+    """
+
+    def __init__(self, slots):
+        self._free = slots
+        self._waiters = []          # heap de [priority, seq, event, cancelado]
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def acquire(self, priority=PRIORITY_DEFAULT, timeout=None):
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return True
+            waiter = [priority, next(self._sequence), threading.Event(), False]
+            heapq.heappush(self._waiters, waiter)
+
+        if waiter[2].wait(timeout):
+            return True
+        with self._lock:
+            # El lugar pudo llegar justo al vencer el timeout
+            if waiter[2].is_set():
+                return True
+            waiter[3] = True
+            return False
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = heapq.heappop(self._waiters)
+                if not waiter[3]:
+                    # Se entrega el lugar directamente, sin pasar por _free
+                    waiter[2].set()
+                    return
+            self._free += 1
+
+    @property
+    def waiting(self):
+        with self._lock:
+            return sum(1 for waiter in self._waiters if not waiter[3])
+
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def _get_slots():
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = PrioritySemaphore(settings.LLM_MAX_CONCURRENCY)
+    return _slots
+
+
+@contextmanager
+def llm_slot(paid=False):
+    slots = _get_slots()
+    if not slots.acquire(PRIORITY_PAID if paid else PRIORITY_DEFAULT, timeout=settings.LLM_QUEUE_TIMEOUT):
+        raise LLMBusy()
+    try:
+        yield
+    finally:
+        slots.release()
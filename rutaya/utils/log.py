@@ -0,0 +1,162 @@
+# rutaya/utils/log.py
+"""
+Logging estructurado para rutaya: id de petición, muestreo de eventos de
+debug, truncado de payloads y un handler con cola para que la escritura a
+stdout nunca bloquee a los workers que atienden peticiones.
+
+Se configura desde LOGGING en settings.py.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_request_id = ContextVar('rutaya_request_id', default=None)
+
+# Atributos propios de LogRecord; el resto se considera contexto (extra=...)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def set_request_id(request_id=None):
+    """Fija el id de la petición actual y devuelve el token para restaurarlo."""
+    return _request_id.set(request_id or uuid.uuid4().hex)
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+
+def summarize(value, max_chars=None):
+    """
+    Representación acotada de un payload para logs. Evita serializar
+    request.data completo en cada evento: el JSON se genera por partes y se
+    deja de generar al pasar max_chars.
+    """
+    if max_chars is None:
+        max_chars = getattr(settings, 'LOG_PAYLOAD_MAX_CHARS', 500)
+    parts = []
+    size = 0
+    try:
+        for chunk in _summary_encoder.iterencode(value):
+            parts.append(chunk)
+            size += len(chunk)
+            if size > max_chars:
+                return f"{''.join(parts)[:max_chars]}… (truncado)"
+    except (TypeError, ValueError):
+        text = repr(value)
+        if len(text) > max_chars:
+            return f"{text[:max_chars]}… (truncado)"
+        return text
+    return ''.join(parts)
+
+
+_summary_encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Agrega record.request_id con el id de la petición en curso."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Deja pasar solo una fracción (rate) de los eventos de nivel DEBUG.
+    Los niveles superiores no se muestrean nunca.
+    """
+
+    def __init__(self, rate=1.0, name=''):
+        super().__init__(name)
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por evento, con los campos extra incluidos."""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))
+                  + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueStreamHandler(logging.handlers.QueueHandler):
+    """
+    Encola los eventos y los escribe en un hilo aparte (QueueListener).
+    Si la cola está llena el evento se descarta en lugar de bloquear la
+    petición; los descartes se cuentan en `dropped`. Los procesos hijos de un
+    fork (workers de gunicorn con preload_app) no heredan el hilo: arrancan
+    el suyo con una cola nueva.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self._start_listener()
+        atexit.register(self._stop_listener)
+        os.register_at_fork(after_in_child=self._restart_after_fork)
+
+    def _start_listener(self):
+        self.listener = logging.handlers.QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def _stop_listener(self):
+        self.listener.stop()
+
+    def _restart_after_fork(self):
+        # El lock de la cola del padre pudo quedar tomado por su hilo
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self._start_listener()
+
+    def setFormatter(self, fmt):
+        # El formateo (JSON) ocurre en el hilo del listener
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Solo congelar el mensaje y la traza; nada de formatear aquí
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
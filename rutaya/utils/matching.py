@@ -0,0 +1,182 @@
+# rutaya/utils/matching.py
+"""
+Motor de emparejamiento de viajeros: usuarios cuyas fechas disponibles se
+solapan con las mías por al menos N días y que comparten al menos k destinos
+favoritos.
+
+El índice vive en memoria y se reconstruye cada MATCHING_INDEX_TTL segundos:
+- Disponibilidad: un bitset (int) por usuario, bit i = día `hoy + i`, y un
+  bitset por día con los usuarios disponibles ese día (bit j = usuario j).
+- Favoritos: listas invertidas destino -> índices de usuario (array('I')).
+
+Las intersecciones se hacen con AND de enteros y bit_count(), que Python
+ejecuta palabra a palabra en C, en vez de comparar usuario contra usuario.
+"""
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import date
+from itertools import chain
+
+from django.conf import settings
+
+from rutaya.models import Favorite, TravelAvailability, User
+from rutaya.utils.bitsets import at_least, bit_positions, range_bits
+
+
+class MatchIndex:
+    def __init__(self, today, horizon_days):
+        self.today = today
+        self.horizon_days = horizon_days
+        self.built_at = time.monotonic()
+
+        self.user_ids = array('q')        # índice denso -> user_id
+        self.positions = {}               # user_id -> índice denso
+        self.availability = {}            # índice denso -> bitset de días
+        self.day_users = []               # día -> bitset de usuarios
+        self.postings = {}                # destination_id -> array('I') de índices
+
+    @classmethod
+    def build(cls, availability_rows, favorite_rows, today=None, horizon_days=730, excluded_user_ids=()):
+        """
+        Construye el índice a partir de iterables de
+        (user_id, start_date, end_date) y (user_id, destination_id). Los
+        usuarios de excluded_user_ids (desactivados) no entran.
+        """
+        index = cls(today or date.today(), horizon_days)
+        excluded = frozenset(excluded_user_ids)
+
+        for user_id, start, end in availability_rows:
+            if user_id in excluded:
+                continue
+            bits = index.availability_bits([(start, end)])
+            if bits:
+                position = index._position(user_id)
+                index.availability[position] = index.availability.get(position, 0) | bits
+
+        for user_id, destination_id in favorite_rows:
+            if user_id in excluded:
+                continue
+            posting = index.postings.get(destination_id)
+            if posting is None:
+                posting = index.postings[destination_id] = array('I')
+            posting.append(index._position(user_id))
+
+        index._build_day_users()
+        return index
+
+    def _position(self, user_id):
+        position = self.positions.get(user_id)
+        if position is None:
+            position = self.positions[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+        return position
+
+    def _build_day_users(self):
+        # Encender bits en un bytearray por día y convertir cada día a int una
+        # sola vez (sumar enteros grandes usuario por usuario sería cuadrático)
+        width = (len(self.user_ids) + 7) // 8
+        days = [None] * self.horizon_days
+        for position, bits in self.availability.items():
+            byte, mask = position >> 3, 1 << (position & 7)
+            for day in bit_positions(bits):
+                if days[day] is None:
+                    days[day] = bytearray(width)
+                days[day][byte] |= mask
+        self.day_users = [int.from_bytes(users, 'little') if users else 0 for users in days]
+
+    def availability_bits(self, ranges):
+        """Bitset de días (desde hoy, dentro del horizonte) de unos rangos."""
+        bits = 0
+        for start, end in ranges:
+            first = max((start - self.today).days, 0)
+            last = min((end - self.today).days, self.horizon_days - 1)
+            if first <= last:
+                bits |= range_bits(first, last)
+        return bits
+
+    def find(self, user_id, ranges, destination_ids, min_days=1, min_shared=1, limit=20):
+        """
+        Usuarios con al menos `min_days` días en común con `ranges` y al
+        menos `min_shared` destinos de `destination_ids` en favoritos.
+
+        Los datos propios se pasan como argumento (leídos de la base) para no
+        depender de la antigüedad del índice. Devuelve dicts ordenados por
+        favoritos compartidos y días en común.
+        """
+        my_bits = self.availability_bits(ranges)
+        if min_days > 0 and my_bits.bit_count() < min_days:
+            return []
+
+        shared = Counter(chain.from_iterable(
+            self.postings.get(destination_id, ()) for destination_id in destination_ids
+        ))
+
+        if min_shared > 0:
+            candidates = [position for position, count in shared.items() if count >= min_shared]
+        else:
+            day_bitsets = [self.day_users[day] for day in bit_positions(my_bits)]
+            candidates = bit_positions(at_least(day_bitsets, min_days, len(self.user_ids)))
+
+        me = self.positions.get(user_id)
+        matches = []
+        for position in candidates:
+            if position == me:
+                continue
+            overlap = (my_bits & self.availability.get(position, 0)).bit_count()
+            if overlap >= min_days:
+                matches.append((shared.get(position, 0), overlap, position))
+
+        matches.sort(key=lambda match: (-match[0], -match[1], self.user_ids[match[2]]))
+        return [
+            {'userId': self.user_ids[position], 'shared_favorites': count, 'overlap_days': overlap}
+            for count, overlap, position in matches[:limit]
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def load_match_index():
+    """Construye el índice desde la base (solo disponibilidad futura)."""
+    today = date.today()
+    availability_rows = (
+        TravelAvailability.objects.filter(end_date__gte=today)
+        .values_list('user_id', 'start_date', 'end_date')
+        .iterator(chunk_size=10000)
+    )
+    favorite_rows = Favorite.objects.values_list('user_id', 'destination_id').iterator(chunk_size=10000)
+    inactive = User.objects.filter(is_active=False).values_list('id', flat=True)
+    return MatchIndex.build(
+        availability_rows, favorite_rows, today=today, horizon_days=settings.MATCHING_HORIZON_DAYS,
+        excluded_user_ids=inactive,
+    )
+
+
+def get_match_index():
+    """
+    Índice compartido por el proceso; se reconstruye al vencer el TTL o
+    cambiar el día. Mientras un hilo lo reconstruye, el resto sigue usando
+    el anterior en vez de esperar.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_match_index()
+    elif _is_stale(_index) and _index_lock.acquire(blocking=False):
+        try:
+            if _is_stale(_index):
+                _index = load_match_index()
+        finally:
+            _index_lock.release()
+    return _index
+
+
+def _is_stale(index):
+    return (
+        time.monotonic() - index.built_at > settings.MATCHING_INDEX_TTL
+        or index.today != date.today()
+    )
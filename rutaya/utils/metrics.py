@@ -0,0 +1,172 @@
+# rutaya/utils/metrics.py
+"""
+Registro de métricas en memoria del proceso (contadores e histogramas) con
+exportación en formato de texto de Prometheus, y medición por secciones
+(db, serializer, llm, ...) de la petición en curso.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Buckets por defecto de Prometheus (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Tiempos por sección de la petición en curso: {'db': 0.012, 'llm': 1.3}. Los
+# hilos de rutaya.utils.parallel comparten el dict de la petición
+_request_timings = ContextVar('rutaya_request_timings', default=None)
+_timings_lock = threading.Lock()
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # El último es +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def inc(self, name, labels=None, amount=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def value(self, name, labels=None):
+        """Valor actual de un contador (0 si no existe)."""
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        """Exportar todas las métricas en el formato de texto 0.0.4 de Prometheus."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            histograms = [(key, _copy_histogram(h)) for key, h in histograms]
+
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.extend(self._header(name, 'counter'))
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                seen.add(name)
+                lines.extend(self._header(name, 'histogram'))
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name, kind):
+        header = []
+        if name in self._help:
+            header.append(f"# HELP {name} {self._help[name]}")
+        header.append(f"# TYPE {name} {kind}")
+        return header
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _copy_histogram(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.total = histogram.total
+    copy.count = histogram.count
+    return copy
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
+registry.describe('rutaya_request_duration_seconds', 'Latencia total por ruta')
+registry.describe('rutaya_request_queries', 'Consultas SQL por petición')
+registry.describe('rutaya_section_duration_seconds', 'Tiempo por sección (db, serializer, llm, render)')
+registry.describe('rutaya_requests_total', 'Peticiones atendidas por ruta y estado')
+
+
+def start_request():
+    """Inicia la medición por secciones de la petición actual."""
+    return _request_timings.set({})
+
+
+def finish_request(token):
+    """Termina la medición y devuelve los tiempos acumulados por sección."""
+    with _timings_lock:
+        timings = dict(_request_timings.get() or {})
+    _request_timings.reset(token)
+    return timings
+
+
+def add_timing(section, seconds):
+    """Suma tiempo a una sección de la petición actual (si hay una en curso)."""
+    timings = _request_timings.get()
+    if timings is not None:
+        with _timings_lock:
+            timings[section] = timings.get(section, 0.0) + seconds
+
+
+@contextmanager
+def timed(section):
+    """
+    Mide un bloque como parte de la sección indicada de la petición actual.
+
+        with timed('llm'):
+            answer = send_message(data)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(section, time.perf_counter() - start)
@@ -0,0 +1,456 @@
+# rutaya/utils/package_output.py
+"""
+Salida estructurada del asistente cuando el usuario pide generar el paquete
+(mode="package") o cuando, en la conversación, el modelo responde con el
+JSON del paquete (package_from_reply).
+
+1. El modelo recibe PACKAGE_SCHEMA (JSON restringido por esquema en Gemini y
+   en la API de OpenAI) y la respuesta se lee en stream con
+   PackageStreamParser, que va separando los campos del paquete y cada
+   elemento del itinerario a medida que se completan.
+2. Se corrigen los errores de formato habituales (fechas que no están en
+   YYYY-MM-DDTHH:MM, "4 días", "S/ 1,850.00") y se valida con
+   TourPackageSerializer / ItineraryItemSerializer.
+3. Solo lo que sigue siendo inválido (los campos, los elementos del
+   itinerario o el final de un itinerario truncado) se vuelve a pedir al
+   modelo, con un prompt corto y el esquema de ese fragmento: como mucho un
+   pedido de cada tipo por ronda, hasta LLM_PACKAGE_REPAIR_ROUNDS rondas y
+   LLM_PACKAGE_REPAIR_TIMEOUT segundos entre todos.
+"""
+import json
+import re
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+from rutaya.serializers import ItineraryItemSerializer, TourPackageSerializer
+from rutaya.utils.llm_backends import get_client
+from rutaya.utils.llm_client import LLMError, LLMTimeout
+from rutaya.utils.llm_quota import estimate_tokens
+
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M'
+
+ITEM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'datetime': {'type': 'string', 'description': 'Fecha y hora en formato YYYY-MM-DDTHH:MM'},
+        'description': {'type': 'string', 'description': 'Actividad'},
+    },
+    'required': ['datetime', 'description'],
+}
+
+PACKAGE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string', 'description': 'Título atractivo del paquete'},
+        'description': {'type': 'string', 'description': 'Descripción general del viaje'},
+        'start_date': {'type': 'string', 'description': 'Fecha y hora de inicio en formato YYYY-MM-DDTHH:MM'},
+        'days': {'type': 'integer', 'description': 'Número de días del viaje'},
+        'quantity': {'type': 'integer', 'description': 'Número de personas'},
+        'price': {'type': 'number', 'description': 'Precio total en soles peruanos'},
+        'itinerary': {'type': 'array', 'items': ITEM_SCHEMA},
+    },
+    'required': ['title', 'description', 'start_date', 'days', 'quantity', 'price', 'itinerary'],
+}
+
+# Pedido de reparación de varios elementos del itinerario a la vez
+ITEMS_REPAIR_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'index': {'type': 'integer', 'description': 'Posición del elemento en el itinerario'},
+            **ITEM_SCHEMA['properties'],
+        },
+        'required': ['index', *ITEM_SCHEMA['required']],
+    },
+}
+
+PACKAGE_FIELDS = ('title', 'description', 'start_date', 'days', 'quantity', 'price')
+
+# Formatos que el modelo suele devolver en lugar de YYYY-MM-DDTHH:MM
+DATETIME_INPUT_FORMATS = (
+    '%Y-%m-%d %H:%M',
+    '%Y/%m/%d %H:%M',
+    '%d/%m/%Y %H:%M',
+    '%d-%m-%Y %H:%M',
+    '%d/%m/%Y %I:%M %p',
+    '%Y-%m-%d %I:%M %p',
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+)
+
+
+class PackageStreamParser:
+    """
+    Lector incremental del objeto JSON del paquete: feed() recibe fragmentos
+    de texto y, sin esperar al final, deja en `fields` cada miembro del
+    objeto raíz ya cerrado y en `items` cada elemento del itinerario ya
+    cerrado (None si ese elemento no es JSON válido, con su texto en
+    `raw_items`). Ignora lo que venga antes de la primera llave (texto o
+    bloques ```json).
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.items = []
+        self.raw_items = []
+        self.itinerary_closed = False
+        self.complete = False
+        self._buffer = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._item_start = None
+
+    @property
+    def text(self):
+        return self._buffer
+
+    @property
+    def started(self):
+        return self._depth > 0 or self.complete
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            if self.complete:
+                break
+            self._scan(buffer, i, buffer[i])
+        self._pos = len(buffer)
+
+    def close(self):
+        return self
+
+    def _scan(self, buffer, i, char):
+        if self._depth == 0:
+            if char == '{':
+                self._depth = 1
+            return
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == '\\':
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._key_start is not None:
+                    self._key = json.loads(buffer[self._key_start:i + 1])
+                    self._key_start = None
+            return
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._value_start is None:
+                self._key_start = i
+            return
+        if self._depth == 1:
+            if char == ':':
+                self._value_start = i + 1
+                return
+            if char in ',}':
+                if self._value_start is not None:
+                    self._member(self._key, buffer[self._value_start:i])
+                    self._key = self._value_start = None
+                if char == '}':
+                    self._depth = 0
+                    self.complete = True
+                return
+        if char in '{[':
+            self._depth += 1
+            if self._depth == 3 and char == '{' and self._key == 'itinerary':
+                self._item_start = i
+        elif char in '}]':
+            self._depth -= 1
+            if self._depth == 2 and char == '}' and self._item_start is not None:
+                self._item(buffer[self._item_start:i + 1])
+                self._item_start = None
+            elif self._depth == 1 and char == ']' and self._key == 'itinerary':
+                self.itinerary_closed = True
+
+    def _member(self, key, raw):
+        if key == 'itinerary':
+            # Sus elementos ya se leyeron uno por uno
+            return
+        try:
+            self.fields[key] = json.loads(raw)
+        except ValueError:
+            self.fields[key] = raw.strip()
+
+    def _item(self, raw):
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            item = None
+        self.items.append(item if isinstance(item, dict) else None)
+        self.raw_items.append(raw)
+
+
+# --- Corrección y validación
+
+def normalize_datetime(value):
+    """YYYY-MM-DDTHH:MM a partir de los formatos habituales; None si no se reconoce."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = re.sub(r'\s+', ' ', value.strip()).replace('a.m.', 'AM').replace('p.m.', 'PM')
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).strftime(DATETIME_FORMAT)
+    except ValueError:
+        pass
+    for input_format in DATETIME_INPUT_FORMATS:
+        try:
+            return datetime.strptime(text, input_format).strftime(DATETIME_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+def _to_int(value):
+    if isinstance(value, str):
+        match = re.search(r'\d+', value)
+        return int(match.group()) if match else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _to_price(value):
+    if not isinstance(value, str):
+        return value
+    # "S/. 1,850.00": fuera la moneda y los separadores sueltos
+    digits = re.sub(r'[^\d.,]', '', value).strip('.,')
+    # "1,850.00" / "1.850,00" / "1850"
+    if ',' in digits and '.' in digits:
+        digits = digits.replace('.', '').replace(',', '.') if digits.rfind(',') > digits.rfind('.') \
+            else digits.replace(',', '')
+    elif ',' in digits:
+        whole, _, decimals = digits.rpartition(',')
+        digits = f'{whole.replace(",", "")}.{decimals}' if len(decimals) <= 2 else digits.replace(',', '')
+    elif '.' in digits:
+        # "1.850" / "1.850.000": punto de miles, como se escribe en el Perú
+        whole, _, decimals = digits.rpartition('.')
+        if len(decimals) == 3 or '.' in whole:
+            digits = digits.replace('.', '')
+    return digits or value
+
+
+def repair_fields(fields):
+    repaired = dict(fields)
+    if 'start_date' in repaired:
+        repaired['start_date'] = normalize_datetime(repaired['start_date']) or repaired['start_date']
+    for name in ('days', 'quantity'):
+        if name in repaired:
+            repaired[name] = _to_int(repaired[name])
+    if 'price' in repaired:
+        repaired['price'] = _to_price(repaired['price'])
+    return repaired
+
+
+def validate_fields(fields, user_id):
+    """Errores por campo del paquete (sin el itinerario), ya corregido."""
+    serializer = TourPackageSerializer(data={**fields, 'user_id': user_id})
+    serializer.is_valid()
+    errors = {name: messages for name, messages in serializer.errors.items() if name in PACKAGE_FIELDS}
+    if 'start_date' not in errors and normalize_datetime(fields.get('start_date')) is None:
+        errors['start_date'] = ['Debe estar en formato YYYY-MM-DDTHH:MM']
+    return errors
+
+
+def repair_item(item):
+    if not isinstance(item, dict):
+        return item
+    return {**item, 'datetime': normalize_datetime(item.get('datetime')) or item.get('datetime')}
+
+
+def validate_item(item, order):
+    if not isinstance(item, dict):
+        return {'non_field_errors': ['No es un objeto JSON válido']}
+    serializer = ItineraryItemSerializer(data={**item, 'order': order})
+    serializer.is_valid()
+    errors = dict(serializer.errors)
+    if 'datetime' not in errors and normalize_datetime(item.get('datetime')) is None:
+        errors['datetime'] = ['Debe estar en formato YYYY-MM-DDTHH:MM']
+    return errors
+
+
+# --- Generación
+
+class PackageOutput:
+    """
+    package: el paquete validado (dict listo para TourPackageSerializer, sin
+    user_id) o None si no se logró. text: lo que se devuelve como botMessage.
+    extra_tokens: tokens estimados de los pedidos de reparación.
+    """
+
+    def __init__(self, package, text, extra_tokens=0, repairs=0):
+        self.package = package
+        self.text = text
+        self.extra_tokens = extra_tokens
+        self.repairs = repairs
+
+
+class _Repairer:
+    def __init__(self, client, fields, timeout):
+        self.client = client
+        self.fields = fields
+        self.tokens = 0
+        self.requests = 0
+        # Un solo plazo para todos los pedidos de reparación
+        self.deadline = time.monotonic() + timeout
+
+    def _context(self):
+        summary = {name: self.fields[name] for name in ('title', 'start_date', 'days') if name in self.fields}
+        return json.dumps(summary, ensure_ascii=False)
+
+    def ask(self, instructions, schema):
+        prompt = (
+            "Estás corrigiendo un fragmento de un paquete turístico por el Perú generado antes.\n"
+            f"Paquete: {self._context()}\n{instructions}\n"
+            "Las fechas van en formato YYYY-MM-DDTHH:MM. Responde solo con el JSON pedido."
+        )
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMTimeout("plazo de reparación vencido")
+        self.requests += 1
+        answer = self.client(prompt, timeout=remaining, json_schema=schema)
+        self.tokens += estimate_tokens(prompt) + estimate_tokens(answer)
+        try:
+            return json.loads(answer)
+        except ValueError:
+            return None
+
+    def fix_fields(self, errors):
+        schema = {
+            'type': 'object',
+            'properties': {name: PACKAGE_SCHEMA['properties'][name] for name in errors},
+            'required': list(errors),
+        }
+        current = {name: self.fields.get(name) for name in errors}
+        fixed = self.ask(
+            f"Estos campos faltan o son inválidos: {json.dumps(current, ensure_ascii=False, default=str)}\n"
+            f"Errores: {json.dumps(errors, ensure_ascii=False, default=str)}\n"
+            "Devuelve solo esos campos corregidos.",
+            schema,
+        )
+        return fixed if isinstance(fixed, dict) else {}
+
+    def fix_items(self, invalid):
+        """
+        invalid: [{'index', 'item' (dict o texto), 'errors', 'previous'}].
+        Devuelve {índice: elemento corregido} con los que vinieron en la respuesta.
+        """
+        indexes = {entry['index'] for entry in invalid}
+        fixed = self.ask(
+            "Estos elementos del itinerario son inválidos (con la actividad anterior de cada uno): "
+            f"{json.dumps(invalid, ensure_ascii=False, default=str)}\n"
+            "Devuelve solo esos elementos corregidos, cada uno con su index.",
+            ITEMS_REPAIR_SCHEMA,
+        )
+        result = {}
+        for item in fixed if isinstance(fixed, list) else ():
+            if isinstance(item, dict) and _to_int(item.get('index')) in indexes:
+                result[_to_int(item.pop('index'))] = item
+        return result
+
+    def continue_itinerary(self, items):
+        last = items[-1] if items else None
+        rest = self.ask(
+            f"El itinerario quedó incompleto. Última actividad: {json.dumps(last, ensure_ascii=False)}\n"
+            "Devuelve solo las actividades que faltan, desde la siguiente hasta el final del viaje.",
+            {'type': 'array', 'items': ITEM_SCHEMA},
+        )
+        return rest if isinstance(rest, list) else []
+
+
+def generate_package(prompt, user_id, route='package'):
+    """
+    Pide el paquete como JSON con esquema, lo lee en stream, lo corrige y
+    valida, y vuelve a pedir solo los fragmentos inválidos.
+    """
+    client = get_client(route)
+    parsed = client(prompt, json_schema=PACKAGE_SCHEMA, parser=PackageStreamParser)
+    if not parsed.started:
+        # El modelo no devolvió JSON: se entrega el texto como antes
+        return PackageOutput(None, parsed.text.strip())
+    return _finish_package(client, parsed, user_id)
+
+
+def package_from_reply(answer, user_id, route='chat'):
+    """
+    El prompt pide al modelo responder con el JSON del paquete cuando el
+    usuario confirma en la conversación. Si la respuesta de la ruta 'chat'
+    trae ese JSON (un objeto con itinerario), se corrige y valida igual que
+    en generate_package; si no, None y la respuesta es texto normal.
+    """
+    parsed = PackageStreamParser()
+    parsed.feed(answer)
+    if not parsed.started or not (parsed.items or parsed.itinerary_closed):
+        return None
+    return _finish_package(get_client(route), parsed, user_id)
+
+
+def _finish_package(client, parsed, user_id):
+    fields = repair_fields(parsed.fields)
+    items = [repair_item(item) for item in parsed.items]
+    raw_items = list(parsed.raw_items)
+    itinerary_closed = parsed.itinerary_closed
+    repairer = _Repairer(client, fields, settings.LLM_PACKAGE_REPAIR_TIMEOUT)
+
+    rounds = 0
+    while True:
+        missing = {name: ['Campo requerido'] for name in PACKAGE_FIELDS if name not in fields}
+        field_errors = {**validate_fields(fields, user_id), **missing}
+        item_errors = {
+            index: errors for index, item in enumerate(items)
+            if (errors := validate_item(item, index))
+        }
+        complete = itinerary_closed and bool(items)
+        if (not field_errors and not item_errors and complete) or rounds >= settings.LLM_PACKAGE_REPAIR_ROUNDS:
+            break
+        rounds += 1
+
+        try:
+            if field_errors:
+                fields.update(repair_fields(repairer.fix_fields(field_errors)))
+            if item_errors:
+                fixed = repairer.fix_items([
+                    {
+                        'index': index,
+                        'item': raw_items[index] if items[index] is None else items[index],
+                        'errors': errors,
+                        'previous': items[index - 1] if index > 0 else None,
+                    }
+                    for index, errors in item_errors.items()
+                ])
+                for index, item in fixed.items():
+                    items[index] = repair_item(item)
+            if not complete:
+                rest = [repair_item(item) for item in repairer.continue_itinerary(items)]
+                items.extend(rest)
+                raw_items.extend(json.dumps(item, ensure_ascii=False) for item in rest)
+                itinerary_closed = True
+        except LLMError:
+            # Sin plazo o sin modelo: se valida lo que haya y no se pide más
+            rounds = settings.LLM_PACKAGE_REPAIR_ROUNDS
+
+    if field_errors or item_errors or not complete:
+        return PackageOutput(None, parsed.text.strip(), repairer.tokens, repairer.requests)
+
+    package = {
+        'title': fields['title'],
+        'description': fields['description'],
+        'start_date': normalize_datetime(fields['start_date']),
+        'days': int(fields['days']),
+        'quantity': int(fields['quantity']),
+        'price': float(fields['price']),
+        'itinerary': [
+            {'datetime': normalize_datetime(item['datetime']), 'description': item['description'], 'order': index}
+            for index, item in enumerate(items)
+        ],
+    }
+    return PackageOutput(package, json.dumps(package, ensure_ascii=False), repairer.tokens, repairer.requests)
@@ -0,0 +1,86 @@
+# rutaya/utils/parallel.py
+"""
+Ejecución concurrente de partes independientes de una misma petición
+(ej: el endpoint de bootstrap) sobre un pool de hilos compartido.
+
+Las consultas de los hilos pasan por los mismos execute_wrapper que tenía
+la conexión del hilo que llamó (el contador de RequestMetricsMiddleware, el
+de run_benchmarks), así cuentan como parte de la petición.
+
+Cada hilo del pool mantiene su conexión entre tareas (hasta
+PARALLEL_CONN_MAX_AGE segundos, aunque CONN_MAX_AGE sea 0): abrir y cerrar
+una por sección costaría más de lo que ahorra ejecutarlas a la vez. La
+primera tarea corre en el hilo que llamó, que de otro modo solo esperaría.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+_executor = None
+_executor_lock = threading.Lock()
+_pool_thread = threading.local()
+
+
+def _init_worker():
+    _pool_thread.persistent = True
+
+
+def _keep_pool_connection(sender, connection, **kwargs):
+    # Django fija close_at con CONN_MAX_AGE al conectar; en los hilos del pool
+    # se usa PARALLEL_CONN_MAX_AGE
+    if getattr(_pool_thread, 'persistent', False):
+        max_age = getattr(settings, 'PARALLEL_CONN_MAX_AGE', 300)
+        connection.close_at = None if max_age is None else time.monotonic() + max_age
+
+
+connection_created.connect(_keep_pool_connection)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'PARALLEL_MAX_WORKERS', 4),
+                    thread_name_prefix='rutaya-parallel',
+                    initializer=_init_worker,
+                )
+    return _executor
+
+
+def _run_in_worker(func, wrappers):
+    # Descarta la conexión del hilo solo si quedó inutilizable o venció
+    connection.close_if_unusable_or_obsolete()
+    with ExitStack() as stack:
+        for wrapper in wrappers:
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        return func()
+
+
+def run_parallel(tasks):
+    """
+    Ejecuta {nombre: callable} y devuelve {nombre: resultado}. Las excepciones
+    se propagan. Con PARALLEL_MAX_WORKERS = 0 se ejecuta secuencialmente (útil
+    en tests, donde otros hilos no ven la transacción en curso).
+    """
+    if getattr(settings, 'PARALLEL_MAX_WORKERS', 4) <= 0 or len(tasks) <= 1:
+        return {name: func() for name, func in tasks.items()}
+
+    executor = _get_executor()
+    wrappers = list(connection.execute_wrappers)
+    (first_name, first), *rest = tasks.items()
+    # Copiar el contexto para conservar request_id y tiempos por sección en los hilos
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run_in_worker, func, wrappers)
+        for name, func in rest
+    }
+    results = {first_name: first()}
+    results.update((name, future.result()) for name, future in futures.items())
+    return {name: results[name] for name in tasks}
@@ -0,0 +1,91 @@
+# rutaya/utils/rate_limit.py
+"""
+Límites de operaciones caras (login, hashing, LLM) por clave (IP, cuenta,
+usuario), con los contadores en el cache de Django (CACHES): todos los
+workers y hosts que comparten el cache comparten el límite, y un reinicio
+no lo vuelve a llenar.
+
+Cada límite es (operaciones, segundos) con una ventana deslizante aproximada:
+se cuenta en ventanas fijas de `seconds` y lo usado es lo de la ventana
+actual más la parte de la anterior que todavía cae dentro de los últimos
+`seconds`. Solo se usan get_many, add e incr, que todos los backends tienen
+(incr es atómico en Redis y Memcached). Entre check() y consume() otro
+proceso puede consumir: con mucha concurrencia el límite se pasa como mucho
+en las peticiones que entraron a la vez.
+"""
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'rutaya:rate:'
+
+
+class RateLimiter:
+    """`requests` operaciones cada `seconds` segundos por clave, con la misma tasa para todas."""
+
+    def __init__(self, scope, requests, seconds):
+        self.scope = scope
+        self.requests = requests
+        self.seconds = seconds
+
+    def _keys(self, key, now):
+        # La clave puede traer lo que mande el cliente (un email): al cache va un hash
+        digest = hashlib.sha256(str(key).encode()).hexdigest()[:32]
+        window = int(now // self.seconds)
+        elapsed = now / self.seconds - window
+        return f'{KEY_PREFIX}{self.scope}:{digest}:{window}', f'{KEY_PREFIX}{self.scope}:{digest}:{window - 1}', elapsed
+
+    def check(self, key, amount=1, now=None):
+        """0 si hay lugar para `amount` operaciones; si no, segundos de espera. No consume."""
+        now = time.time() if now is None else now
+        current_key, previous_key, elapsed = self._keys(key, now)
+        counts = cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        free = self.requests - amount
+        if previous * (1 - elapsed) + current <= free:
+            return 0.0
+        if free < 0:
+            return float('inf')
+        if current <= free:
+            # Alcanza con que se desvanezca parte de la ventana anterior
+            return (1 - (free - current) / previous - elapsed) * self.seconds
+        # Hay que esperar a la próxima ventana y a que la actual pese menos
+        return (1 - elapsed + 1 - free / current) * self.seconds
+
+    def consume(self, key, amount=1, now=None):
+        """Como check(), pero si hay lugar cuenta las operaciones."""
+        now = time.time() if now is None else now
+        wait = self.check(key, amount, now)
+        if not wait:
+            current_key, _, _ = self._keys(key, now)
+            # Dos ventanas: mientras es la actual y mientras es la anterior
+            cache.add(current_key, 0, timeout=2 * self.seconds + 1)
+            try:
+                cache.incr(current_key, amount)
+            except ValueError:
+                # Expulsada entre add e incr
+                cache.set(current_key, amount, timeout=2 * self.seconds + 1)
+        return wait
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_registry(scope, rate):
+    """
+    Limitador de (scope, tasa); la tasa es (operaciones, segundos) como en
+    los settings *_RATES. Cambiar la tasa crea otro limitador (y otras claves).
+    """
+    key = (scope, tuple(rate))
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                requests, seconds = rate
+                limiter = _limiters[key] = RateLimiter(f'{scope}:{requests}-{seconds}', requests, seconds)
+    return limiter
@@ -0,0 +1,165 @@
+# rutaya/utils/server_profile.py
+"""
+Tamaño de los grupos de workers del servidor (SERVER_POOLS).
+
+Un worker sync atiende una petición a la vez y, mientras espera a la base de
+datos o al modelo, su CPU queda libre. Con W = espera / CPU por petición,
+hacen falta unas cpus * (1 + W) peticiones en curso para ocupar los CPUs sin
+apilar procesos de más:
+
+- grupos sync: esa cantidad de workers (hasta max_workers);
+- grupos gthread: un worker por CPU y el resto como hilos (hasta max_threads).
+
+W se observa: RequestMetricsMiddleware suma por grupo el tiempo total y el
+tiempo de CPU del hilo de cada petición, y cada worker al salir (reciclado
+por max_requests o reemplazado en una recarga) agrega sus totales a
+SERVER_STATS_FILE. Cuentan las últimas SERVER_STATS_WINDOWS salidas; sin
+observaciones suficientes se usa el 'io_wait' del grupo. rutaya.gunicorn_conf
+recalcula el tamaño al arrancar y en cada recarga (SIGHUP).
+"""
+import json
+import logging
+import math
+import os
+
+from django.conf import settings
+
+from rutaya.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+WALL_METRIC = 'rutaya_pool_wall_seconds_total'
+CPU_METRIC = 'rutaya_pool_cpu_seconds_total'
+REQUESTS_METRIC = 'rutaya_pool_requests_total'
+
+# Con menos peticiones observadas la relación es ruido
+MIN_OBSERVED_REQUESTS = 50
+
+metrics.registry.describe(WALL_METRIC, 'Tiempo total de las peticiones por grupo de workers')
+metrics.registry.describe(CPU_METRIC, 'Tiempo de CPU de las peticiones por grupo de workers')
+metrics.registry.describe(REQUESTS_METRIC, 'Peticiones por grupo de workers')
+
+
+def cpu_count():
+    """CPUs que puede usar el proceso: SERVER_CPUS, o afinidad y cuota del cgroup."""
+    if settings.SERVER_CPUS:
+        return settings.SERVER_CPUS
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        # cgroup v2: "max 100000" (sin límite) o "200000 100000" (2 CPUs)
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def pool_for(path):
+    """Grupo que atiende una ruta: el primero cuyas 'routes' la cubren, o el de routes vacío."""
+    default = None
+    for name, pool in settings.SERVER_POOLS.items():
+        if not pool['routes']:
+            default = default or name
+        elif path.startswith(tuple(pool['routes'])):
+            return name
+    return default
+
+
+def record_request(path, wall, cpu):
+    labels = {'pool': pool_for(path)}
+    metrics.registry.inc(WALL_METRIC, labels, wall)
+    metrics.registry.inc(CPU_METRIC, labels, cpu)
+    metrics.registry.inc(REQUESTS_METRIC, labels)
+
+
+def _read_stats(f):
+    f.seek(0)
+    try:
+        return json.loads(f.read() or '{}')
+    except ValueError:
+        return {}
+
+
+def save_observations():
+    """Agrega los totales de este proceso a SERVER_STATS_FILE (lo llama cada worker al salir)."""
+    import fcntl
+
+    windows = {}
+    for name in settings.SERVER_POOLS:
+        labels = {'pool': name}
+        requests = metrics.registry.value(REQUESTS_METRIC, labels)
+        if requests:
+            windows[name] = {
+                'wall': metrics.registry.value(WALL_METRIC, labels),
+                'cpu': metrics.registry.value(CPU_METRIC, labels),
+                'requests': requests,
+            }
+    if not windows:
+        return
+
+    try:
+        with open(settings.SERVER_STATS_FILE, 'a+') as f:
+            # Varios workers pueden salir a la vez (recarga)
+            fcntl.flock(f, fcntl.LOCK_EX)
+            stats = _read_stats(f)
+            for name, window in windows.items():
+                stats[name] = (stats.get(name, []) + [window])[-settings.SERVER_STATS_WINDOWS:]
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(stats))
+    except OSError as e:
+        logger.warning("No se pudieron guardar las observaciones del servidor: %s", e)
+
+
+def observed_wait_ratio(name):
+    """Espera / CPU de las peticiones del grupo según SERVER_STATS_FILE, o None."""
+    try:
+        with open(settings.SERVER_STATS_FILE) as f:
+            windows = _read_stats(f).get(name, [])
+    except OSError:
+        return None
+    if sum(w['requests'] for w in windows) < MIN_OBSERVED_REQUESTS:
+        return None
+    wall = sum(w['wall'] for w in windows)
+    cpu = sum(w['cpu'] for w in windows)
+    return max(0.0, wall - cpu) / max(cpu, 1e-6)
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def tune(name):
+    """Configuración del grupo para gunicorn con el tamaño calculado."""
+    pool = settings.SERVER_POOLS[name]
+    cpus = cpu_count()
+    observed = observed_wait_ratio(name)
+    io_wait = pool['io_wait'] if observed is None else observed
+    concurrency = math.ceil(cpus * (1 + io_wait))
+
+    if pool['worker_class'] == 'gthread':
+        workers = _clamp(cpus, 1, pool['max_workers'])
+        threads = _clamp(math.ceil(concurrency / workers), 1, pool['max_threads'])
+    else:
+        workers = _clamp(concurrency, 1, pool['max_workers'])
+        threads = 1
+
+    return {
+        'pool': name,
+        'bind': pool['bind'],
+        'worker_class': pool['worker_class'],
+        'workers': workers,
+        'threads': threads,
+        'cpus': cpus,
+        'io_wait': round(io_wait, 2),
+        'observed': observed is not None,
+        'timeout': pool['timeout'],
+        'graceful_timeout': settings.SERVER_GRACEFUL_TIMEOUT,
+        'max_requests': pool['max_requests'],
+        'max_requests_jitter': int(pool['max_requests'] * settings.SERVER_MAX_REQUESTS_JITTER),
+    }
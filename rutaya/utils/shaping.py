@@ -0,0 +1,137 @@
+# rutaya/utils/shaping.py
+"""
+Forma de los payloads de listas: campos a incluir (`?fields=id,name`) y
+textos largos recortados (`?preview=1`).
+
+Las consultas se ajustan a la forma pedida: un texto que no se devuelve se
+difiere (`defer`) y una vista previa se lee con SUBSTR en la base, así la
+columna completa no viaja hasta Python. El texto completo se obtiene en los
+endpoints de detalle.
+"""
+import unicodedata
+
+from django.conf import settings
+from django.db.models.functions import Substr
+from rest_framework import serializers
+
+
+ZWJ = '\u200d'
+
+
+def _continues_cluster(char):
+    """El carácter se dibuja junto con el anterior: no se puede cortar antes de él."""
+    return (
+        unicodedata.combining(char)
+        or char == ZWJ
+        or '\ufe00' <= char <= '\ufe0f'          # selectores de variación
+        or '\U0001f3fb' <= char <= '\U0001f3ff'  # tonos de piel
+    )
+
+
+def query_flag(request, name):
+    return request.query_params.get(name, '').lower() in ('1', 'true')
+
+
+class Shape:
+    def __init__(self, fields=None, preview=False, preview_chars=None):
+        # 'id' siempre se incluye para poder pedir el detalle después
+        self.fields = frozenset(fields) | {'id'} if fields is not None else None
+        self.preview = preview
+        self.preview_chars = preview_chars or settings.DESCRIPTION_PREVIEW_CHARS
+
+    @classmethod
+    def from_request(cls, request):
+        """Forma pedida en la query, o None si es la respuesta completa."""
+        fields = request.query_params.get('fields')
+        if fields is not None:
+            fields = {name.strip() for name in fields.split(',') if name.strip()}
+        preview = query_flag(request, 'preview')
+        if fields is None and not preview:
+            return None
+        return cls(fields, preview)
+
+    @property
+    def key(self):
+        return (self.fields, self.preview, self.preview_chars)
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def truncate(self, value):
+        """
+        (texto, has_more) con el texto recortado a preview_chars caracteres.
+        El corte retrocede para no separar un carácter de sus marcas
+        combinantes ni partir un emoji compuesto (ZWJ, tono de piel).
+        """
+        if value is None or len(value) <= self.preview_chars:
+            return value, False
+        end = self.preview_chars
+        while end > 0 and (_continues_cluster(value[end]) or value[end - 1] == ZWJ):
+            end -= 1
+        return value[:end].rstrip() + '…', True
+
+    def shape_dict(self, data, text_fields=('description',)):
+        """Copia de `data` con los campos pedidos y las vistas previas."""
+        shaped = {}
+        for name, value in data.items():
+            if not self.includes(name):
+                continue
+            if self.preview and name in text_fields:
+                shaped[name], shaped[f'{name}_has_more'] = self.truncate(value)
+            else:
+                shaped[name] = value
+        return shaped
+
+    def queryset(self, queryset, text_field='description', path='', include=None):
+        """
+        Difiere `path + text_field` si no se pide, o lo reemplaza por la
+        anotación `preview_alias(...)` con solo los primeros caracteres.
+        `include` fuerza la inclusión para textos de objetos anidados, que no
+        figuran en ?fields=.
+        """
+        lookup = path + text_field
+        include = self.includes(text_field) if include is None else include
+        if not include or self.preview:
+            queryset = queryset.defer(lookup)
+        if include and self.preview:
+            # Un carácter extra para saber si hay más
+            queryset = queryset.annotate(**{
+                preview_alias(text_field, path): Substr(lookup, 1, self.preview_chars + 1)
+            })
+        return queryset
+
+
+def preview_alias(text_field='description', path=''):
+    return path.replace('__', '_') + text_field + '_preview'
+
+
+class ShapedSerializerMixin:
+    """
+    Aplica context['shape'] a un ModelSerializer: quita los campos no
+    pedidos y, con preview, lee el texto de la anotación de
+    Shape.queryset() en vez de la columna diferida.
+    """
+    shaped_text_fields = ('description',)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        shape = self.context.get('shape')
+        if shape is None:
+            return fields
+        for name in list(fields):
+            if not fields[name].write_only and not shape.includes(name):
+                fields.pop(name)
+        if shape.preview:
+            for name in self.shaped_text_fields:
+                if name in fields:
+                    fields[name] = serializers.CharField(source=preview_alias(name), read_only=True)
+        return fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        shape = self.context.get('shape')
+        if shape is not None and shape.preview:
+            for name in self.shaped_text_fields:
+                if name in data:
+                    data[name], data[f'{name}_has_more'] = shape.truncate(data[name])
+        return data
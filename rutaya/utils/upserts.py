@@ -0,0 +1,42 @@
+# rutaya/utils/upserts.py
+"""
+Inserts de una sola sentencia que delegan la detección de duplicados en los
+unique_together de los modelos (INSERT ... ON CONFLICT DO NOTHING).
+"""
+from django.db import IntegrityError, connection, transaction
+
+
+def insert_ignore(model, **values):
+    """
+    Inserta una fila con `values` (nombres de campo del modelo; para FKs usar
+    `user_id`, `destination_id`, ...) sin cargar objetos relacionados.
+
+    Devuelve la pk de la fila creada, o None si ya existía una fila que viola
+    una restricción unique (ON CONFLICT DO NOTHING). Las violaciones de FK no
+    se ignoran: el llamador debe validar la existencia antes.
+    """
+    opts = model._meta
+    # get_field acepta tanto 'user' como 'user_id'
+    fields = [(opts.get_field(name), value) for name, value in values.items()]
+
+    if not connection.features.can_return_columns_from_insert:
+        # SQLite < 3.35 no soporta RETURNING: savepoint + create
+        try:
+            with transaction.atomic():
+                return model.objects.create(**values).pk
+        except IntegrityError:
+            return None
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field, _ in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    params = [field.get_db_prep_save(value, connection) for field, value in fields]
+
+    sql = (
+        f"INSERT INTO {quote(opts.db_table)} ({columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT DO NOTHING RETURNING {quote(opts.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return row[0] if row else None
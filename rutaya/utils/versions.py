@@ -0,0 +1,48 @@
+# rutaya/utils/versions.py
+"""
+Contadores de versión en el cache de Django para invalidar datos derivados
+(catálogo en memoria, respuestas cacheadas). Las señales de rutaya.signals
+los incrementan al escribir; los lectores comparan la versión con la que
+construyeron su copia.
+
+Con el LocMemCache por defecto la versión es por proceso; con varios
+procesos hay que configurar un cache compartido (Redis, Memcached) en
+CACHES para que la invalidación llegue a todos.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = 'rutaya:version:'
+
+
+def get_version(name, timeout=None):
+    """
+    Versión actual de `name`. Con timeout (para versiones por usuario) la
+    clave vence si nadie la usa; al recrearla la versión es otra, así que
+    los lectores solo reconstruyen de más.
+    """
+    version = cache.get(KEY_PREFIX + name)
+    if version is None:
+        # Inicial basada en el reloj: tras un reinicio del cache no se repite
+        # una versión anterior
+        version = int(time.time() * 1000)
+        if not cache.add(KEY_PREFIX + name, version, timeout=timeout):
+            version = cache.get(KEY_PREFIX + name, version)
+    return version
+
+
+def bump_version(name, timeout=None):
+    # Dentro de una transacción se incrementa al confirmarla: antes, un lector
+    # podría cachear los datos viejos bajo la versión nueva
+    transaction.on_commit(lambda: _increment(name, timeout))
+
+
+def _increment(name, timeout=None):
+    try:
+        return cache.incr(KEY_PREFIX + name)
+    except ValueError:
+        # La clave no existía (cache reiniciado o expulsada)
+        get_version(name, timeout)
+        return cache.incr(KEY_PREFIX + name)
@@ -0,0 +1,201 @@
+# rutaya/utils/warmup.py
+"""
+Precalentamiento del proceso antes de recibir tráfico, para que la primera
+petición de cada worker cueste lo mismo que las siguientes.
+
+Cada warmer es una función registrada con @warmer; WARMUP_WARMERS elige
+cuáles corren y en qué orden. Los incluidos:
+
+- db: abre la conexión a la base de datos
+- catalog: catálogo de destinos en memoria (rutaya.utils.catalog)
+- popular: conteo de "más populares" del home
+- urls: compila el resolver de URLs e importa las vistas perezosas
+- serializers: arma los campos de los serializers de rutaya.serializers
+- openapi: carga la documentación precalculada (rutaya.utils.api_docs)
+- requests: GET a WARMUP_REQUEST_PATHS por toda la pila (middleware, DRF,
+  ORM, render), que deja armado lo que se inicializa en la primera petición
+
+Cuándo corren:
+
+- gunicorn con preload_app (rutaya.gunicorn_conf): prepare_fork() corre en
+  el master los warmers compartibles y congela los objetos creados; los
+  workers los heredan por copy-on-write. Los marcados per_process (la
+  conexión, que no sirve en otro proceso) corren en cada worker antes de
+  aceptar conexiones, igual que todos cuando no hay preload.
+- /api/v1/ready/ corre los pendientes y responde 503 hasta que terminen.
+
+Un warmer que falla queda pendiente y se reintenta en la siguiente llamada.
+"""
+import gc
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WARMERS = {}
+
+
+def warmer(name, per_process=False):
+    """
+    Registra una función de precalentamiento. per_process=True si lo que
+    prepara no sobrevive a un fork (conexiones, hilos).
+    """
+    def register(func):
+        func.per_process = per_process
+        WARMERS[name] = func
+        return func
+    return register
+
+
+@warmer('db', per_process=True)
+def warm_db():
+    from django.db import connection
+
+    connection.ensure_connection()
+
+
+@warmer('catalog')
+def warm_catalog():
+    from rutaya.utils.catalog import get_catalog
+
+    get_catalog()
+
+
+@warmer('popular')
+def warm_popular():
+    from rutaya.utils.catalog import get_popular
+
+    get_popular(4)  # Los que muestra el home
+
+
+@warmer('urls')
+def warm_urls():
+    from django.urls import get_resolver
+
+    from rutaya.views import preload
+
+    resolver = get_resolver()
+    resolver.reverse_dict  # Compila los patrones
+    preload(resolver.url_patterns)
+
+
+@warmer('serializers')
+def warm_serializers():
+    from rest_framework import serializers
+
+    from rutaya import serializers as app_serializers
+
+    for value in vars(app_serializers).values():
+        if (
+            isinstance(value, type)
+            and issubclass(value, serializers.Serializer)
+            and value.__module__ == app_serializers.__name__
+        ):
+            value().fields
+
+
+@warmer('openapi')
+def warm_openapi():
+    from rutaya.utils.api_docs import get_document
+
+    get_document('json')
+
+
+@warmer('requests')
+def warm_requests():
+    import io
+    import sys
+
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    for path in settings.WARMUP_REQUEST_PATHS:
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0), 'wsgi.multithread': False,
+            'wsgi.multiprocess': True, 'wsgi.run_once': False,
+        }
+        response = handler(environ, lambda status, headers, exc_info=None: None)
+        try:
+            b''.join(response)
+        finally:
+            response.close()  # request_finished: cierra la conexión como al final de una petición
+        if response.status_code >= 500:
+            raise RuntimeError(f"GET {path} respondió {response.status_code}")
+
+
+# Segundos de cada warmer que ya corrió bien en este proceso, y errores del último intento
+_timings = {}
+_errors = {}
+_lock = threading.Lock()
+
+
+def _pending(shared_only=False):
+    return [
+        name for name in settings.WARMUP_WARMERS
+        if name not in _timings and not (shared_only and WARMERS[name].per_process)
+    ]
+
+
+def is_ready():
+    return not _pending()
+
+
+def report():
+    """{'ready': bool, 'timings': {warmer: segundos}, 'errors': {warmer: mensaje}}"""
+    return {'ready': is_ready(), 'timings': dict(_timings), 'errors': dict(_errors)}
+
+
+def warm_up(shared_only=False):
+    """Corre los warmers pendientes (solo los compartibles con shared_only) y devuelve report()."""
+    if _pending(shared_only):
+        with _lock:
+            # Otro hilo pudo correrlos mientras esperábamos el lock
+            for name in _pending(shared_only):
+                start = time.perf_counter()
+                try:
+                    WARMERS[name]()
+                except Exception as e:
+                    logger.exception("Falló el warmer '%s'", name)
+                    _errors[name] = str(e)
+                    continue
+                _timings[name] = time.perf_counter() - start
+                _errors.pop(name, None)
+                logger.info(
+                    "Warmer %s: %.1f ms", name, _timings[name] * 1000,
+                    extra={'warmer': name, 'pid': os.getpid()},
+                )
+    return report()
+
+
+def prepare_fork():
+    """
+    Para un master que crea workers por fork: corre los warmers compartibles,
+    cierra las conexiones a la base de datos (cada worker abre la suya) y
+    congela los objetos creados hasta aquí. gc.freeze() los saca de las
+    generaciones del recolector, que así no escribe en sus páginas desde los
+    workers y estas siguen compartidas.
+    """
+    from django.db import connections
+
+    result = warm_up(shared_only=True)
+    connections.close_all()
+    gc.freeze()
+    return result
+
+
+def _after_fork_in_child():
+    global _lock
+    _lock = threading.Lock()
+    for name in list(_timings):
+        if WARMERS[name].per_process:
+            del _timings[name]
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
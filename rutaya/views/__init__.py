@@ -0,0 +1,73 @@
+# rutaya/views/__init__.py
+"""
+Vistas de la API, un módulo por funcionalidad:
+
+- auth: registro, login, logout, perfil y contraseña
+- catalog: categorías, home y detalle de destino
+- favorites, travels, preferences, packages, rates: CRUD de cada recurso
+- content: asistente de IA
+- batch, bootstrap: mutaciones agrupadas y carga inicial de la app
+- docs: Swagger / ReDoc (drf_yasg)
+- metrics: métricas de Prometheus
+- health: readiness para el balanceador
+
+rutaya.urls no importa los módulos: cada ruta apunta a un LazyView que
+importa su módulo en la primera petición. Así un cold start serverless que
+atiende /home/ no paga el import del asistente de IA ni de drf_yasg. Con
+LAZY_VIEWS=False se importan todas al cargar las URLs (servidores de larga
+vida, donde conviene pagarlo antes de recibir tráfico).
+"""
+from importlib import import_module
+
+VIEW_MODULES = (
+    'auth', 'catalog', 'favorites', 'travels', 'preferences', 'packages',
+    'rates', 'content', 'batch', 'bootstrap', 'docs', 'metrics', 'health',
+)
+
+
+class LazyView:
+    """
+    Vista 'modulo.nombre' dentro de rutaya.views, importada en la primera
+    petición. Si el nombre es una clase se usa su .as_view().
+    """
+    # Atributos que leen el middleware de CSRF (al atender) y los
+    # generadores de esquema de DRF/drf_yasg: leerlos resuelve la vista
+    RESOLVED_ATTRIBUTES = frozenset({'csrf_exempt', 'cls', 'initkwargs', 'actions'})
+
+    def __init__(self, path):
+        module, _, name = path.rpartition('.')
+        self.module_name = f'{__name__}.{module}'
+        self.view_name = name
+        # Para URLPattern.lookup_str, sin importar el módulo
+        self.__module__ = self.module_name
+        self.__name__ = self.__qualname__ = name
+        self._view = None
+
+    def resolve(self):
+        view = self._view
+        if view is None:
+            view = getattr(import_module(self.module_name), self.view_name)
+            if isinstance(view, type):
+                view = view.as_view()
+            self._view = view
+        return view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        if name in LazyView.RESOLVED_ATTRIBUTES:
+            return getattr(self.resolve(), name)
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return f'<LazyView {self.module_name}.{self.view_name}>'
+
+
+def preload(patterns):
+    """Resuelve los LazyView de una lista de URL patterns (y de sus include)."""
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            preload(pattern.url_patterns)
+        elif isinstance(pattern.callback, LazyView):
+            pattern.callback.resolve()
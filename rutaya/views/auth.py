@@ -0,0 +1,214 @@
+# rutaya/views/auth.py
+from rest_framework import generics
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rutaya.serializers import UserLoginSerializer, UserRegistrationSerializer, UserSerializer
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
+from rutaya.models import User
+from rutaya.authentication import ClaimsRefreshToken, maybe_prune_expired_tokens
+from rutaya.throttling import PasswordRateThrottle
+from rutaya.utils.hashing import hashing_slot
+from rutaya.utils.shaping import query_flag
+from rutaya.views.bootstrap import build_bootstrap_payload, parse_bootstrap_sections
+from rutaya.views.common import wants_compact
+
+
+class UserRegistrationView(generics.CreateAPIView):
+    """
+    Vista para registro de usuarios
+    """
+    queryset = User.objects.all()
+    serializer_class = UserRegistrationSerializer
+    permission_classes = (AllowAny,)
+    throttle_classes = (PasswordRateThrottle,)
+
+    @swagger_auto_schema(
+        operation_description="Registrar un nuevo usuario",
+        responses={
+            201: openapi.Response(
+                description="Usuario creado exitosamente",
+                schema=UserSerializer
+            ),
+            400: "Error de validación"
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if serializer.is_valid():
+            user = serializer.save()
+
+            # Generar tokens JWT
+            refresh = ClaimsRefreshToken.for_user(user)
+
+            return Response({
+                'message': 'Usuario registrado exitosamente',
+                'user': UserSerializer(user).data,
+                'tokens': {
+                    'refresh': str(refresh),
+                    'access': str(refresh.access_token),
+                },
+                'preferences': {}
+            }, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UserLoginView(generics.GenericAPIView):
+    serializer_class = UserLoginSerializer
+    permission_classes = (AllowAny,)
+    throttle_classes = (PasswordRateThrottle,)
+
+    @swagger_auto_schema(
+        operation_description="Iniciar sesión de usuario",
+        responses={
+            200: openapi.Response(
+                description="Login exitoso",
+                examples={
+                    "application/json": {
+                        "message": "Login exitoso",
+                        "user": {
+                            "id": 1,
+                            "username": "usuario",
+                            "email": "usuario@example.com"
+                        },
+                        "tokens": {
+                            "refresh": "token_refresh",
+                            "access": "token_access"
+                        }
+                    }
+                }
+            ),
+            400: "Credenciales inválidas"
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if serializer.is_valid():
+            user = serializer.validated_data['user']
+
+            # Generar tokens JWT
+            refresh = ClaimsRefreshToken.for_user(user)
+
+            response_data = {
+                'message': 'Login exitoso',
+                'user': UserSerializer(user).data,
+                'tokens': {
+                    'refresh': str(refresh),
+                    'access': str(refresh.access_token),
+                },
+            }
+
+            # ?include=home,travels,packages agrega esas secciones al login y
+            # evita las llamadas que la app hace inmediatamente después
+            sections = parse_bootstrap_sections(request.query_params.get('include'), default=())
+            response_data.update(build_bootstrap_payload(
+                user, {'preferences', *sections},
+                compact=wants_compact(request), preview=query_flag(request, 'preview')
+            ))
+
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UserUpdateView(generics.UpdateAPIView):
+    """
+    Vista para actualizar información del perfil del usuario
+    """
+    queryset = User.objects.all()
+    serializer_class = UserSerializer
+    permission_classes = [AllowAny]  # IMPRESCINDIBLE como indicas
+
+    @swagger_auto_schema(
+        operation_description="Actualizar perfil de usuario",
+        responses={
+            200: openapi.Response(
+                description="Perfil actualizado exitosamente",
+                schema=UserSerializer
+            ),
+            400: "Error de validación",
+            404: "Usuario no encontrado"
+        }
+    )
+    def put(self, request, *args, **kwargs):
+        user_id = self.kwargs.get('pk')
+        user = get_object_or_404(User, pk=user_id)
+
+        serializer = self.get_serializer(user, data=request.data, partial=True)
+
+        if serializer.is_valid():
+            serializer.save()
+            return Response({
+                'message': 'Perfil actualizado exitosamente',
+                'user': serializer.data
+            }, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ChangePasswordView(APIView):
+    """
+    Vista para cambiar la contraseña del usuario
+    """
+    permission_classes = [AllowAny]  # IMPRESCINDIBLE como indicas
+    throttle_classes = [PasswordRateThrottle]
+
+    @swagger_auto_schema(
+        operation_description="Cambiar la contraseña del usuario",
+        manual_parameters=[
+            openapi.Parameter(
+                'user_id',
+                openapi.IN_PATH,
+                description="ID del usuario",
+                type=openapi.TYPE_INTEGER,
+                required=True
+            )
+        ],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['new_password'],
+            properties={
+                'new_password': openapi.Schema(type=openapi.TYPE_STRING, description='Nueva contraseña'),
+            }
+        ),
+        responses={
+            200: "Contraseña actualizada exitosamente",
+            400: "Error de validación",
+            404: "Usuario no encontrado"
+        }
+    )
+    def put(self, request, user_id):
+        user = get_object_or_404(User, pk=user_id)
+
+        new_password = request.data.get('new_password')
+        if not new_password:
+            return Response({'error': 'La nueva contraseña es obligatoria.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with hashing_slot():
+            user.set_password(new_password)
+        user.save()
+
+        return Response({'message': 'Contraseña actualizada exitosamente'}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@swagger_auto_schema(
+    operation_description="Cerrar sesión (logout)",
+    responses={200: "Logout exitoso"}
+)
+def logout_view(request):
+    try:
+        refresh_token = request.data["refresh"]
+        token = ClaimsRefreshToken(refresh_token)
+        token.blacklist()
+        maybe_prune_expired_tokens()
+        return Response({"message": "Logout exitoso"}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": "Token inválido"}, status=status.HTTP_400_BAD_REQUEST)
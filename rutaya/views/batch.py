@@ -0,0 +1,86 @@
+# rutaya/views/batch.py
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+import logging
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rutaya.serializers import BatchRequestSerializer
+from rest_framework import status
+from rest_framework.response import Response
+from rutaya.models import User
+from django.db import IntegrityError
+from rutaya.utils.batch import BatchExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BatchOperationsView(APIView):
+    """
+    Vista para ejecutar varias mutaciones de un usuario en una sola petición
+    (favoritos, calificaciones y disponibilidad), en una sola transacción.
+    """
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['userId', 'operations'],
+            properties={
+                'userId': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID del usuario'),
+                'operations': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    description=(
+                        "Operaciones en orden. op: favorite.add, favorite.remove, "
+                        "destination_rate.create, destination_rate.delete, package_rate.create, "
+                        "package_rate.delete, availability.set"
+                    ),
+                    items=openapi.Schema(type=openapi.TYPE_OBJECT)
+                ),
+            }
+        ),
+        operation_description="Ejecutar un lote de operaciones con resultado por operación",
+        responses={
+            200: openapi.Response(
+                description="Lote procesado",
+                examples={
+                    "application/json": {
+                        "message": "Lote procesado",
+                        "userId": 1,
+                        "results": [
+                            {"index": 0, "op": "favorite.add", "status": 201, "destinationId": 5, "id": 12},
+                            {"index": 1, "op": "destination_rate.create", "status": 400,
+                             "error": "Ya has calificado este destino"}
+                        ],
+                        "summary": {"succeeded": 1, "failed": 1}
+                    }
+                }
+            ),
+            400: "Error de validación",
+            404: "Usuario no encontrado",
+            409: "Conflicto con otra escritura concurrente"
+        }
+    )
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = serializer.validated_data['userId']
+        if not User.objects.filter(id=user_id).exists():
+            return Response({'error': 'Usuario no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            results = BatchExecutor(user_id, serializer.validated_data['operations']).run()
+        except IntegrityError:
+            logger.warning("Conflicto al aplicar el lote", extra={'user_id': user_id})
+            return Response({
+                'error': 'Conflicto con otra operación concurrente, reintenta el lote'
+            }, status=status.HTTP_409_CONFLICT)
+
+        succeeded = sum(1 for result in results if result['status'] < 400)
+        return Response({
+            'message': 'Lote procesado',
+            'userId': user_id,
+            'results': results,
+            'summary': {'succeeded': succeeded, 'failed': len(results) - succeeded}
+        }, status=status.HTTP_200_OK)
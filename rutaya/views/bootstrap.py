@@ -0,0 +1,130 @@
+# rutaya/views/bootstrap.py
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import AllowAny
+import logging
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
+from rutaya.models import User
+from django.http import Http404
+from rutaya.utils.parallel import run_parallel
+from rutaya.utils.shaping import Shape, query_flag
+from rutaya.views.common import PREVIEW_PARAM, wants_compact
+from rutaya.views.catalog import get_home_payload
+from rutaya.views.preferences import get_preferences_data
+from rutaya.views.packages import get_tour_packages_data
+from rutaya.views.travels import get_travel_data
+
+logger = logging.getLogger(__name__)
+
+
+BOOTSTRAP_SECTIONS = ('preferences', 'home', 'travels', 'packages')
+
+
+def parse_bootstrap_sections(value, default=BOOTSTRAP_SECTIONS):
+    """Convierte '?include=home,packages' en el set de secciones válidas."""
+    if not value:
+        return set(default)
+    return {section.strip() for section in value.split(',') if section.strip() in BOOTSTRAP_SECTIONS}
+
+
+def build_bootstrap_payload(user, sections, compact=False, preview=False):
+    """
+    Construye las secciones pedidas para un usuario ya resuelto. Las
+    secciones son independientes entre sí y se ejecutan en paralelo. Con
+    `preview` las descripciones se recortan (?fields= no aplica: las
+    secciones tienen campos distintos).
+    """
+    shape = Shape(preview=True) if preview else None
+    tasks = {}
+    if 'preferences' in sections:
+        tasks['preferences'] = lambda: get_preferences_data(user.id)
+    if 'home' in sections:
+        tasks['home'] = lambda: get_home_payload(user.id, shape)
+    if 'travels' in sections:
+        tasks['travels'] = lambda: get_travel_data(user.id, compact)
+    if 'packages' in sections:
+        tasks['packages'] = lambda: get_tour_packages_data(user.id, shape)
+    return run_parallel(tasks)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_description=(
+        "Obtener en una sola llamada los datos iniciales de la app: preferencias, home, "
+        "fechas disponibles y paquetes. Con ?include=home,packages se limita a esas secciones."
+    ),
+    manual_parameters=[
+        openapi.Parameter(
+            'user_id',
+            openapi.IN_PATH,
+            description="ID del usuario",
+            type=openapi.TYPE_INTEGER,
+            required=True
+        ),
+        openapi.Parameter(
+            'include',
+            openapi.IN_QUERY,
+            description="Secciones separadas por coma: preferences, home, travels, packages",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'compact',
+            openapi.IN_QUERY,
+            description="Con compact=1 la sección travels trae solo los rangos",
+            type=openapi.TYPE_BOOLEAN,
+            required=False
+        ),
+        PREVIEW_PARAM
+    ],
+    responses={
+        200: openapi.Response(
+            description="Datos iniciales obtenidos exitosamente",
+            examples={
+                "application/json": {
+                    "message": "Datos iniciales obtenidos exitosamente",
+                    "userId": 5,
+                    "preferences": {"travel_interests": ["Aventura", "Cultura"], "adrenaline_level": 7},
+                    "home": {"suggestions": [], "popular": [], "categories": []},
+                    "travels": {"ranges": [{"start": "2024-07-01", "end": "2024-07-02"}],
+                                "dates": ["2024-07-01", "2024-07-02"]},
+                    "packages": []
+                }
+            }
+        ),
+        404: "Usuario no encontrado",
+        500: "Error interno del servidor"
+    }
+)
+def get_bootstrap_data(request, user_id):
+    """
+    Vista que agrupa /home/, /preferences/, /travels/user/ y /tour/user/
+    para evitar varios round trips al abrir la app.
+    """
+    try:
+        user = get_object_or_404(User, id=user_id)
+        sections = parse_bootstrap_sections(request.query_params.get('include'))
+
+        return Response({
+            'message': 'Datos iniciales obtenidos exitosamente',
+            'userId': user.id,
+            **build_bootstrap_payload(
+                user, sections, compact=wants_compact(request), preview=query_flag(request, 'preview')
+            )
+        }, status=status.HTTP_200_OK)
+
+    except Http404:
+        return Response({
+            'error': 'Usuario no encontrado'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.exception("Error al obtener los datos iniciales: %s", e)
+        return Response({
+            "error": "Error interno del servidor",
+            "message": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,274 @@
+# rutaya/views/catalog.py
+import random
+
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import AllowAny
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rutaya.models import Destination, Favorite, User
+from rutaya.utils.catalog import get_catalog, get_popular
+from rutaya.utils.home_feed import get_home_feed
+from rutaya.utils.shaping import Shape
+from rutaya.utils.compression import precompressed_response
+from rutaya.utils.images import destination_image_payload
+from rutaya.views.common import FIELDS_PARAM, PREVIEW_PARAM
+
+
+# Agregar esta vista a tu views.py
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_description="Obtener categorías con destinos y estado de favoritos por usuario",
+    manual_parameters=[
+        openapi.Parameter(
+            'user_id',
+            openapi.IN_PATH,
+            description="ID del usuario para verificar favoritos",
+            type=openapi.TYPE_INTEGER,
+            required=True
+        ),
+        FIELDS_PARAM,
+        PREVIEW_PARAM
+    ],
+    responses={
+        200: openapi.Response(
+            description="Categorías con destinos obtenidas exitosamente"
+        ),
+        404: "Usuario no encontrado"
+    }
+)
+def get_categories_with_destinations(request, user_id):
+    """
+    Vista para obtener categorías con destinos y estado de favoritos
+    """
+    try:
+        # Verificar que el usuario existe
+        user = get_object_or_404(User, id=user_id)
+
+        # Destinos favoritos del usuario como bitmap sobre el catálogo en memoria
+        catalog = get_catalog()
+        favorites = catalog.favorites_bitmap(get_favorite_destination_ids(user.id))
+
+        shape = Shape.from_request(request)
+
+        def build():
+            return {
+                'message': 'Categorías obtenidas exitosamente',
+                'categories': catalog.categories(favorites, order_by='name', shape=shape)
+            }
+
+        if not favorites:
+            # Sin favoritos la respuesta es la misma para todos: se sirve
+            # ya comprimida desde el cache
+            key = ('categories', catalog.version, catalog.built_at, shape.key if shape else None)
+            return precompressed_response(request, key, build)
+
+        return Response(build(), status=status.HTTP_200_OK)
+
+    except (User.DoesNotExist, Http404):
+        return Response({
+            'error': 'Usuario no encontrado'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({
+            'error': 'Error interno del servidor'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_description="Obtener todos los datos necesarios para la pantalla Home",
+    manual_parameters=[
+        openapi.Parameter(
+            'user_id',
+            openapi.IN_PATH,
+            description="ID del usuario para personalizar la experiencia",
+            type=openapi.TYPE_INTEGER,
+            required=True
+        ),
+        FIELDS_PARAM,
+        PREVIEW_PARAM
+    ],
+    responses={
+        200: openapi.Response(
+            description="Datos del home obtenidos exitosamente",
+            examples={
+                "application/json": {
+                    "message": "Datos del home obtenidos exitosamente",
+                    "suggestions": [
+                        {
+                            "id": 1,
+                            "name": "Playa Bonita",
+                            "location": "Cancún",
+                            "description": "Una hermosa playa...",
+                            "image_url": "https://example.com/playa.jpg",
+                            "isFavorite": True
+                        }
+                    ],
+                    "popular": [
+                        {
+                            "id": 2,
+                            "name": "Machu Picchu",
+                            "location": "Cusco",
+                            "description": "Ciudadela inca...",
+                            "image_url": "https://example.com/machu.jpg",
+                            "isFavorite": False,
+                            "favorites_count": 25
+                        }
+                    ],
+                    "categories": [
+                        {
+                            "id": 1,
+                            "name": "Playas",
+                            "destinations": [
+                                {
+                                    "id": 1,
+                                    "name": "Playa Bonita",
+                                    "location": "Cancún",
+                                    "description": "Una hermosa playa...",
+                                    "image_url": "https://example.com/playa.jpg",
+                                    "isFavorite": True
+                                }
+                            ]
+                        }
+                    ]
+                }
+            }
+        ),
+        404: "Usuario no encontrado"
+    }
+)
+def get_home_data(request, user_id):
+    try:
+        def load_favorites():
+            # Verificar que el usuario existe (solo si su home no está en cache)
+            user = get_object_or_404(User, id=user_id)
+            return get_favorite_destination_ids(user.id)
+
+        return Response({
+            'message': 'Datos del home obtenidos exitosamente',
+            **get_home_payload(user_id, Shape.from_request(request), load_favorites)
+        }, status=status.HTTP_200_OK)
+
+    except (User.DoesNotExist, Http404):
+        return Response({
+            'error': 'Usuario no encontrado'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({
+            'error': 'Error interno del servidor'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def get_favorite_destination_ids(user_id):
+    """IDs de los destinos favoritos del usuario (compartido entre home, categorías y bootstrap)."""
+    return set(
+        Favorite.objects.filter(user_id=user_id).values_list('destination_id', flat=True)
+    )
+
+
+def get_home_payload(user_id, shape=None, load_favorites=None):
+    """
+    Home del usuario desde el cache por usuario (rutaya.utils.home_feed);
+    load_favorites() solo se llama si no está.
+    """
+    return get_home_feed(
+        user_id, shape, load_favorites or (lambda: get_favorite_destination_ids(user_id)), build_home_payload
+    )
+
+
+def build_home_payload(favorite_destination_ids, shape=None, rng=random):
+    """
+    Sugerencias, populares y categorías del home con el flag isFavorite
+    calculado a partir de favorite_destination_ids. Los destinos al azar
+    salen de `rng`.
+    """
+    catalog = get_catalog()
+    favorites = catalog.favorites_bitmap(favorite_destination_ids)
+
+    # 1. SUGERENCIAS PARA TI - 8 destinos random
+    suggestions_data = [catalog.destination(row, favorites, shape) for row in catalog.random_rows(8, rng)]
+
+    # 2. MÁS POPULARES - 4 destinos más agregados a favoritos
+    popular_counts = [
+        (catalog.rows[destination_id], count)
+        for destination_id, count in get_popular(4)
+        if destination_id in catalog.rows
+    ]
+
+    # Si faltan destinos, completar con randoms: si hay menos de 4 con
+    # favoritos, el resto tiene 0
+    if len(popular_counts) < 4:
+        used_rows = {row for row, _ in popular_counts}
+        available_rows = [row for row in catalog.random_rows(4 + len(used_rows), rng) if row not in used_rows]
+        popular_counts.extend((row, 0) for row in available_rows[:4 - len(popular_counts)])
+
+    # Copia: los dicts del catálogo se comparten entre peticiones
+    popular_data = [
+        {**catalog.destination(row, favorites, shape), 'favorites_count': count}
+        for row, count in popular_counts
+    ]
+
+    # 3. CATEGORÍAS CON DESTINOS - ordenadas por ID ascendente
+    return {
+        'suggestions': suggestions_data,
+        'popular': popular_data,
+        'categories': catalog.categories(favorites, order_by='id', shape=shape)
+    }
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_description="Obtener un destino con su descripción completa",
+    responses={
+        200: openapi.Response(
+            description="Destino obtenido exitosamente",
+            examples={
+                "application/json": {
+                    "id": 2,
+                    "name": "Machu Picchu",
+                    "location": "Cusco",
+                    "description": "Ciudadela inca...",
+                    "image_url": "https://example.com/machu.jpg",
+                    "image": {
+                        "width": 1600,
+                        "height": 1067,
+                        "blurhash": "LEHV6nWB2yk8pyo0adR*.7kCMdnj",
+                        "src": "/media/destinations/2/3f2a9c1e7b4d5a60-640.jpg",
+                        "srcset": {
+                            "webp": "/media/destinations/2/3f2a9c1e7b4d5a60-320.webp 320w, /media/destinations/2/3f2a9c1e7b4d5a60-640.webp 640w",
+                            "jpeg": "/media/destinations/2/3f2a9c1e7b4d5a60-320.jpg 320w, /media/destinations/2/3f2a9c1e7b4d5a60-640.jpg 640w"
+                        }
+                    },
+                    "category": {"id": 1, "name": "Sitios Arqueológicos"}
+                }
+            }
+        ),
+        404: "Destino no encontrado"
+    }
+)
+def get_destination_detail(request, pk):
+    """
+    Vista de detalle de un destino: los listados con ?preview=1 o sin
+    'description' en ?fields= piden aquí el texto completo.
+    """
+    destination = Destination.objects.select_related('category', 'image').filter(id=pk).first()
+    if destination is None:
+        return Response({'error': 'Destino no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'id': destination.id,
+        'name': destination.name,
+        'location': destination.location,
+        'description': destination.description,
+        'image_url': destination.image_url,
+        'image': destination_image_payload(destination),
+        'category': {'id': destination.category.id, 'name': destination.category.name}
+    }, status=status.HTTP_200_OK)
@@ -0,0 +1,55 @@
+# rutaya/views/common.py
+from drf_yasg import openapi
+from rest_framework import status
+from rest_framework.response import Response
+from rutaya.models import User
+from django.db.models import Subquery
+
+
+# Parámetros comunes de los listados (rutaya.utils.shaping)
+FIELDS_PARAM = openapi.Parameter(
+    'fields',
+    openapi.IN_QUERY,
+    description="Campos a incluir separados por coma (ej: id,name,image_url). 'id' siempre se incluye",
+    type=openapi.TYPE_STRING,
+    required=False
+)
+PREVIEW_PARAM = openapi.Parameter(
+    'preview',
+    openapi.IN_QUERY,
+    description="Con preview=1 las descripciones se recortan y se agrega description_has_more",
+    type=openapi.TYPE_BOOLEAN,
+    required=False
+)
+
+
+def lookup_user_and_target(user_id, target_param, target_model, target_id, target_field):
+    """
+    Valida en una sola consulta que existan el usuario y el objeto destino
+    (destino o paquete) y devuelve (email del usuario, target_field del objeto).
+    Si alguno no existe devuelve la Response 400 con el mismo formato de
+    errores que los serializers.
+    """
+    not_found = {
+        'destinationId': "Destino no encontrado.",
+        'tourPackageId': "Paquete turístico no encontrado.",
+    }
+    row = User.objects.filter(id=user_id).annotate(
+        target_value=Subquery(target_model.objects.filter(id=target_id).values(target_field)[:1])
+    ).values_list('email', 'target_value').first()
+
+    errors = {}
+    if row is None:
+        errors['userId'] = ["Usuario no encontrado."]
+        if not target_model.objects.filter(id=target_id).exists():
+            errors[target_param] = [not_found[target_param]]
+    elif row[1] is None:
+        errors[target_param] = [not_found[target_param]]
+
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+    return row
+
+
+def wants_compact(request):
+    return request.query_params.get('compact', '').lower() in ('1', 'true')
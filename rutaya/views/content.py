@@ -0,0 +1,66 @@
+# rutaya/views/content.py
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import APIException, PermissionDenied
+from rutaya.serializers import messageInputSerializer
+from rest_framework import status
+from rest_framework.response import Response
+from rutaya.throttling import LLMRateThrottle
+from rutaya.utils.gemini_api import build_prompt, generate
+from rutaya.utils.llm_backends import route_for
+from rutaya.utils.llm_client import LLMTimeout, LLMUnavailable
+from rutaya.utils.package_output import generate_package, package_from_reply
+from rutaya.utils.llm_quota import check_budget, estimate_tokens, is_priority_user, llm_slot, record_usage
+from rutaya.utils.metrics import timed
+
+
+class ProcessIaMessageView(generics.CreateAPIView):
+    serializer_class = messageInputSerializer
+    # Las cuotas son por usuario: se toma el del JWT, no el userId del cuerpo
+    permission_classes = [IsAuthenticated]
+    # Por IP y por usuario (LLM_THROTTLE_RATES); el presupuesto diario y la
+    # cola con prioridad se aplican abajo (rutaya.utils.llm_quota)
+    throttle_classes = [LLMRateThrottle]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if serializer.is_valid():
+            user_id = request.user.id
+            if serializer.validated_data['userId'] != user_id:
+                raise PermissionDenied("userId no corresponde al usuario autenticado.")
+            try:
+                prompt = build_prompt(serializer.validated_data)
+                route = route_for(serializer.validated_data.get('mode'))
+                prompt_tokens = estimate_tokens(prompt)
+                paid = is_priority_user(user_id)
+                check_budget(user_id, prompt_tokens, paid)
+
+                if route == 'package':
+                    # JSON con esquema, validado; botMessage lleva el mismo JSON
+                    with llm_slot(paid), timed('llm'):
+                        output = generate_package(prompt, user_id, route=route)
+                    record_usage(user_id, prompt_tokens + estimate_tokens(output.text) + output.extra_tokens)
+                    return Response({"botMessage": output.text, "package": output.package}, status=status.HTTP_200_OK)
+
+                with llm_slot(paid), timed('llm'):
+                    answer = generate(prompt, route=route)
+                    # El modelo puede responder con el JSON del paquete si el usuario ya lo confirmó
+                    output = package_from_reply(answer, user_id, route=route)
+                if output is not None:
+                    record_usage(user_id, prompt_tokens + estimate_tokens(answer) + output.extra_tokens)
+                    return Response({"botMessage": output.text, "package": output.package}, status=status.HTTP_200_OK)
+                record_usage(user_id, prompt_tokens + estimate_tokens(answer))
+                return Response({"botMessage": answer}, status=status.HTTP_200_OK)
+            except APIException:
+                raise
+            except LLMUnavailable:
+                return Response({
+                    "error": "El asistente no está disponible en este momento, intenta más tarde."
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            except LLMTimeout:
+                return Response({
+                    "error": "El asistente tardó demasiado en responder, intenta nuevamente."
+                }, status=status.HTTP_504_GATEWAY_TIMEOUT)
+            except Exception as e:
+                return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
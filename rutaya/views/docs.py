@@ -0,0 +1,38 @@
+# rutaya/views/docs.py
+from django.conf import settings
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from rutaya.utils.api_docs import get_document
+from rutaya.utils.compression import payload_response
+
+SCHEMA_FORMATS = {'.json': 'json', '.yaml': 'yaml'}
+
+
+def serve_document(request, name):
+    """Documento precalculado con ETag y Cache-Control; 304 si el cliente ya lo tiene."""
+    document = get_document(name)
+    not_modified = get_conditional_response(request, etag=document.etag)
+    response = not_modified or payload_response(request, document)
+    response['ETag'] = document.etag
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_CACHE_MAX_AGE)
+    return response
+
+
+def schema_json(request, format):
+    if format not in SCHEMA_FORMATS:
+        raise Http404()
+    return serve_document(request, SCHEMA_FORMATS[format])
+
+
+def _ui_view(name):
+    def view(request):
+        # La página pide el esquema a su propia URL con ?format=openapi
+        if request.GET.get('format') == 'openapi':
+            return serve_document(request, 'json')
+        return serve_document(request, name)
+    return view
+
+
+swagger_ui = _ui_view('swagger')
+redoc_ui = _ui_view('redoc')
@@ -0,0 +1,126 @@
+# rutaya/views/favorites.py
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rutaya.serializers import FavoriteActionSerializer
+from rest_framework import status
+from rest_framework.response import Response
+from rutaya.models import Destination, Favorite
+from rutaya.utils.home_feed import invalidate_home_feed
+from rutaya.utils.upserts import insert_ignore
+from rutaya.views.common import lookup_user_and_target
+
+
+class AddToFavoritesView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        request_body=FavoriteActionSerializer,
+        operation_description="Agregar destino a favoritos",
+        responses={
+            201: openapi.Response(
+                description="Destino agregado a favoritos exitosamente",
+                examples={
+                    "application/json": {
+                        "message": "Destino agregado a favoritos exitosamente",
+                        "favorite": {
+                            "id": 1,
+                            "userId": 1,
+                            "destinationId": 5,
+                            "destination_name": "Playa Bonita",
+                            "user_email": "usuario@example.com"
+                        }
+                    }
+                }
+            ),
+            400: "Error de validación o destino ya está en favoritos",
+        }
+    )
+    def post(self, request):
+        serializer = FavoriteActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = serializer.validated_data['userId']
+        destination_id = serializer.validated_data['destinationId']
+
+        found = lookup_user_and_target(user_id, 'destinationId', Destination, destination_id, 'name')
+        if isinstance(found, Response):
+            return found
+        user_email, destination_name = found
+
+        # Una sola sentencia: el unique_together (user, destination) detecta el duplicado
+        favorite_id = insert_ignore(Favorite, user_id=user_id, destination_id=destination_id)
+        if favorite_id is None:
+            return Response({
+                'error': 'Este destino ya está en favoritos'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        # insert_ignore no dispara señales
+        invalidate_home_feed(user_id)
+
+        return Response({
+            'message': 'Destino agregado a favoritos exitosamente',
+            'favorite': {
+                'id': favorite_id,
+                'userId': user_id,
+                'destinationId': destination_id,
+                'destination_name': destination_name,
+                'user_email': user_email
+            }
+        }, status=status.HTTP_201_CREATED)
+
+class RemoveFromFavoritesView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        request_body=FavoriteActionSerializer,
+        operation_description="Eliminar destino de favoritos",
+        responses={
+            200: openapi.Response(
+                description="Destino eliminado de favoritos exitosamente",
+                examples={
+                    "application/json": {
+                        "message": "Destino eliminado de favoritos exitosamente",
+                        "removed": {
+                            "userId": 1,
+                            "destinationId": 5,
+                            "destination_name": "Playa Bonita",
+                            "user_email": "usuario@example.com"
+                        }
+                    }
+                }
+            ),
+            400: "Error de validación",
+            404: "Favorito no encontrado"
+        }
+    )
+    def delete(self, request):
+        serializer = FavoriteActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = serializer.validated_data['userId']
+        destination_id = serializer.validated_data['destinationId']
+
+        found = lookup_user_and_target(user_id, 'destinationId', Destination, destination_id, 'name')
+        if isinstance(found, Response):
+            return found
+        user_email, destination_name = found
+
+        deleted, _ = Favorite.objects.filter(user_id=user_id, destination_id=destination_id).delete()
+        if not deleted:
+            return Response({
+                'error': 'Este destino no está en favoritos'
+            }, status=status.HTTP_404_NOT_FOUND)
+        invalidate_home_feed(user_id)
+
+        return Response({
+            'message': 'Destino eliminado de favoritos exitosamente',
+            'removed': {
+                'userId': user_id,
+                'destinationId': destination_id,
+                'destination_name': destination_name,
+                'user_email': user_email
+            }
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,20 @@
+# rutaya/views/health.py
+import os
+
+from django.http import JsonResponse
+
+from rutaya.utils.warmup import warm_up
+
+
+def readiness_view(request):
+    """
+    200 cuando el proceso tiene los cachés cargados y puede recibir tráfico,
+    503 mientras no. Si el worker no se preparó al arrancar, lo hace ahora.
+    """
+    report = warm_up()
+    return JsonResponse({
+        'ready': report['ready'],
+        'pid': os.getpid(),
+        'timings': {name: round(seconds * 1000, 1) for name, seconds in report['timings'].items()},
+        'errors': report['errors'],
+    }, status=200 if report['ready'] else 503)
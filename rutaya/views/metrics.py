@@ -0,0 +1,18 @@
+# rutaya/views/metrics.py
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rutaya.utils.metrics import registry
+
+
+def metrics_view(request):
+    """
+    Métricas del proceso en formato de texto de Prometheus.
+    Solo accesible desde las IPs de METRICS_ALLOWED_IPS.
+    """
+    if request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', ()):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        registry.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
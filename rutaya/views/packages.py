@@ -0,0 +1,181 @@
+# rutaya/views/packages.py
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import AllowAny
+import logging
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rutaya.serializers import TourPackageSerializer
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
+from rutaya.models import TourPackage, User
+from rutaya.utils.metrics import timed
+from rutaya.utils.log import summarize
+from rutaya.utils.shaping import Shape
+from rutaya.views.common import FIELDS_PARAM, PREVIEW_PARAM
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def save_tour_package(request):
+    try:
+        # Muestreado (DEBUG) y truncado: no volcar el payload completo en cada request
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Paquete recibido", extra={'payload': summarize(request.data)})
+
+        serializer = TourPackageSerializer(data=request.data)
+        if serializer.is_valid():
+            package = serializer.save()
+            logger.info("Paquete guardado", extra={'package_id': package.id})
+
+            return Response({
+                "message": "Paquete turístico guardado exitosamente",
+                "package": TourPackageSerializer(package).data
+            }, status=status.HTTP_201_CREATED)
+        else:
+            logger.info("Paquete con errores de validación", extra={'errors': summarize(serializer.errors)})
+            return Response({
+                "error": "Datos inválidos",
+                "details": serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    except User.DoesNotExist:
+        logger.info("Paquete para usuario inexistente")
+        return Response({
+            "error": "Usuario no encontrado",
+            "message": "El usuario especificado no existe"
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    except Exception as e:
+        logger.exception("Error inesperado: %s", e)
+        return Response({
+            "error": "Error interno del servidor",
+            "message": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_description="Obtener paquetes turísticos de un usuario",
+    manual_parameters=[
+        openapi.Parameter(
+            'user_id',
+            openapi.IN_PATH,
+            description="ID del usuario",
+            type=openapi.TYPE_INTEGER,
+            required=True
+        ),
+        FIELDS_PARAM,
+        PREVIEW_PARAM
+    ],
+    responses={
+        200: openapi.Response(
+            description="Lista de paquetes turísticos obtenidos exitosamente"
+        ),
+        404: "Usuario no encontrado",
+        500: "Error interno del servidor"
+    }
+)
+def get_user_tour_packages(request, user_id):
+    """
+    Vista para obtener los paquetes turísticos de un usuario.
+    Retorna directamente la lista de paquetes sin wrapper.
+    """
+    try:
+        # Verificar que el usuario existe
+        user = get_object_or_404(User, id=user_id)
+
+        # Retornar directamente la lista sin wrapper
+        return Response(get_tour_packages_data(user.id, Shape.from_request(request)), status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.exception("Error al obtener paquetes: %s", e)
+        return Response({
+            "error": "Error interno del servidor",
+            "message": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def get_tour_packages_data(user_id, shape=None):
+    """Paquetes del usuario con su itinerario, serializados."""
+    packages = TourPackage.objects.filter(user_id=user_id)
+    if shape is None or shape.includes('itinerary'):
+        packages = packages.prefetch_related('itinerary')
+    if shape is not None:
+        packages = shape.queryset(packages)
+
+    serializer = TourPackageSerializer(packages, many=True, context={'shape': shape})
+    with timed('serializer'):
+        return serializer.data
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_description="Obtener un paquete turístico con su descripción completa e itinerario",
+    responses={
+        200: openapi.Response(description="Paquete turístico obtenido exitosamente"),
+        404: "Paquete no encontrado"
+    }
+)
+def get_tour_package_detail(request, pk):
+    """Vista de detalle de un paquete turístico (texto completo e itinerario)."""
+    package = TourPackage.objects.prefetch_related('itinerary').filter(id=pk).first()
+    if package is None:
+        return Response({'error': 'Paquete no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(TourPackageSerializer(package).data, status=status.HTTP_200_OK)
+
+
+@api_view(['PUT'])
+@permission_classes([AllowAny])
+def mark_package_as_paid(request, pk):
+    """
+    Vista para actualizar el estado de pago de un paquete turístico a True.
+    """
+    try:
+        package = get_object_or_404(TourPackage, pk=pk)
+
+        package.is_paid = True
+        package.save()
+
+        return Response({
+            "message": f"Paquete {pk} marcado como pagado",
+            "package": TourPackageSerializer(package).data
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.exception("Error inesperado: %s", e)
+        return Response({
+            "error": "Error interno del servidor",
+            "message": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+
+
+@api_view(['DELETE'])
+@permission_classes([AllowAny])
+def delete_tour_package(request, pk):
+    """
+    Vista para eliminar un paquete turístico.
+    """
+    try:
+        package = get_object_or_404(TourPackage, pk=pk)
+        package.delete()
+
+        return Response({
+            "message": f"Paquete {pk} eliminado correctamente"
+        }, status=status.HTTP_204_NO_CONTENT)
+
+    except Exception as e:
+        logger.exception("Error inesperado: %s", e)
+        return Response({
+            "error": "Error interno del servidor",
+            "message": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
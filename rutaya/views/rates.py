@@ -0,0 +1,304 @@
+# rutaya/views/rates.py
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rutaya.serializers import (
+    DestinationRateCreateSerializer,
+    DestinationRateSerializer,
+    TourPackageRateCreateSerializer,
+    TourPackageRateSerializer,
+)
+from rest_framework import status
+from rest_framework.response import Response
+from rutaya.models import Destination, DestinationRate, TourPackage, TourPackageRate
+from rutaya.utils.metrics import timed
+from rutaya.utils.upserts import insert_ignore
+from rutaya.utils.shaping import Shape
+from rutaya.utils.versions import bump_version, get_version
+from rutaya.utils.compression import precompressed_response
+from rutaya.views.common import FIELDS_PARAM, PREVIEW_PARAM, lookup_user_and_target
+
+
+class CreateDestinationRateView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        request_body=DestinationRateCreateSerializer,
+        operation_description="Crear calificación para un destino",
+        responses={
+            201: openapi.Response(
+                description="Calificación creada exitosamente"
+            ),
+            400: "Error de validación o calificación ya existe",
+        }
+    )
+    def post(self, request):
+        serializer = DestinationRateCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        user_id = data['userId']
+        destination_id = data['destinationId']
+
+        found = lookup_user_and_target(user_id, 'destinationId', Destination, destination_id, 'name')
+        if isinstance(found, Response):
+            return found
+        user_email, destination_name = found
+
+        rate_id = insert_ignore(
+            DestinationRate,
+            user_id=user_id,
+            destination_id=destination_id,
+            stars=data['stars'],
+            comment=data.get('comment'),
+            created_at=data['created_at']
+        )
+        if rate_id is None:
+            return Response({
+                'error': 'Ya has calificado este destino'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        # insert_ignore no dispara señales
+        bump_version('rates')
+
+        return Response({
+            'message': 'Calificación creada exitosamente',
+            'rate': {
+                'id': rate_id,
+                'userId': user_id,
+                'destinationId': destination_id,
+                'stars': data['stars'],
+                'comment': data.get('comment'),
+                'created_at': data['created_at'],
+                'destination_name': destination_name,
+                'user_email': user_email
+            }
+        }, status=status.HTTP_201_CREATED)
+
+
+class GetAllDestinationRatesView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Obtener todas las calificaciones de destinos",
+        manual_parameters=[FIELDS_PARAM, PREVIEW_PARAM],
+        responses={
+            200: openapi.Response(
+                description="Lista de calificaciones de destinos"
+            )
+        }
+    )
+    def get(self, request):
+        shape = Shape.from_request(request)
+
+        def build():
+            serializer = DestinationRateSerializer(
+                destination_rates_queryset(shape), many=True, context={'shape': shape}
+            )
+            with timed('serializer'):
+                return {'rates': serializer.data}
+
+        return precompressed_response(request, rates_payload_key('destination-rates', shape), build)
+
+
+class DeleteDestinationRateView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Eliminar calificación de un destino por ID",
+        responses={
+            200: openapi.Response(description="Calificación eliminada exitosamente"),
+            404: "Calificación no encontrada"
+        }
+    )
+    def delete(self, request, rate_id):
+        try:
+            rate = DestinationRate.objects.get(id=rate_id)
+            rate.delete()
+            return Response({
+                'message': 'Calificación eliminada exitosamente',
+                'removed': {
+                    'id': rate_id,
+                    'userId': rate.user.id,
+                    'destinationId': rate.destination.id,
+                    'destination_name': rate.destination.name,
+                    'user_email': rate.user.email
+                }
+            }, status=status.HTTP_200_OK)
+        except DestinationRate.DoesNotExist:
+            return Response({'error': 'Calificación no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+
+# Vistas para TourPackageRate
+class CreateTourPackageRateView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        request_body=TourPackageRateCreateSerializer,
+        operation_description="Crear calificación para un paquete turístico",
+        responses={
+            201: openapi.Response(
+                description="Calificación creada exitosamente"
+            ),
+            400: "Error de validación o calificación ya existe",
+        }
+    )
+    def post(self, request):
+        serializer = TourPackageRateCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        user_id = data['userId']
+        tour_package_id = data['tourPackageId']
+
+        found = lookup_user_and_target(user_id, 'tourPackageId', TourPackage, tour_package_id, 'title')
+        if isinstance(found, Response):
+            return found
+        user_email, tour_package_title = found
+
+        rate_id = insert_ignore(
+            TourPackageRate,
+            user_id=user_id,
+            tour_package_id=tour_package_id,
+            stars=data['stars'],
+            comment=data.get('comment'),
+            created_at=data['created_at']
+        )
+        if rate_id is None:
+            return Response({
+                'error': 'Ya has calificado este paquete turístico'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        # insert_ignore no dispara señales
+        bump_version('rates')
+
+        return Response({
+            'message': 'Calificación creada exitosamente',
+            'rate': {
+                'id': rate_id,
+                'userId': user_id,
+                'tourPackageId': tour_package_id,
+                'stars': data['stars'],
+                'comment': data.get('comment'),
+                'created_at': data['created_at'],
+                'tour_package_title': tour_package_title,
+                'user_email': user_email
+            }
+        }, status=status.HTTP_201_CREATED)
+
+
+class GetAllTourPackageRatesView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Obtener todas las calificaciones de paquetes turísticos",
+        manual_parameters=[FIELDS_PARAM, PREVIEW_PARAM],
+        responses={
+            200: openapi.Response(
+                description="Lista de calificaciones de paquetes turísticos"
+            )
+        }
+    )
+    def get(self, request):
+        shape = Shape.from_request(request)
+
+        def build():
+            serializer = TourPackageRateSerializer(
+                package_rates_queryset(shape), many=True, context={'shape': shape}
+            )
+            with timed('serializer'):
+                return {'rates': serializer.data}
+
+        return precompressed_response(request, rates_payload_key('package-rates', shape), build)
+
+
+class DeleteTourPackageRateView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Eliminar calificación de un paquete turístico por ID",
+        responses={
+            200: openapi.Response(description="Calificación eliminada exitosamente"),
+            404: "Calificación no encontrada"
+        }
+    )
+    def delete(self, request, rate_id):
+        try:
+            rate = TourPackageRate.objects.get(id=rate_id)
+            rate.delete()
+            return Response({
+                'message': 'Calificación eliminada exitosamente',
+                'removed': {
+                    'id': rate_id,
+                    'userId': rate.user.id,
+                    'tourPackageId': rate.tour_package.id,
+                    'tour_package_title': rate.tour_package.title,
+                    'user_email': rate.user.email
+                }
+            }, status=status.HTTP_200_OK)
+        except TourPackageRate.DoesNotExist:
+            return Response({'error': 'Calificación no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+
+def rates_payload_key(name, shape=None):
+    """
+    Clave del payload precomprimido de un listado de calificaciones: cambia
+    con las calificaciones/paquetes/usuarios ('rates') y los destinos ('catalog').
+    """
+    return (name, shape.key if shape else None, get_version('rates'), get_version('catalog'))
+
+
+def destination_rates_queryset(shape=None):
+    """Calificaciones de destinos con las relaciones que pide la forma, sin N+1."""
+    rates = DestinationRate.objects.all()
+    if shape is None or shape.includes('user'):
+        rates = rates.select_related('user')
+    if shape is None or shape.includes('destination'):
+        rates = rates.select_related('destination')
+        if shape is not None:
+            rates = shape.queryset(rates, path='destination__', include=True)
+    return rates
+
+
+def package_rates_queryset(shape=None):
+    """Calificaciones de paquetes con las relaciones que pide la forma, sin N+1."""
+    rates = TourPackageRate.objects.all()
+    if shape is None or shape.includes('user'):
+        rates = rates.select_related('user')
+    if shape is None or shape.includes('tour_package'):
+        rates = rates.select_related('tour_package').prefetch_related('tour_package__itinerary')
+        if shape is not None:
+            rates = shape.queryset(rates, path='tour_package__', include=True)
+    return rates
+
+
+class GetAllRatesView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Obtener todas las calificaciones de destinos y paquetes turísticos",
+        manual_parameters=[FIELDS_PARAM, PREVIEW_PARAM],
+        responses={
+            200: openapi.Response(
+                description="Lista de calificaciones de destinos y paquetes turísticos"
+            )
+        }
+    )
+    def get(self, request):
+        shape = Shape.from_request(request)
+
+        def build():
+            destination_serializer = DestinationRateSerializer(
+                destination_rates_queryset(shape), many=True, context={'shape': shape}
+            )
+            package_serializer = TourPackageRateSerializer(
+                package_rates_queryset(shape), many=True, context={'shape': shape}
+            )
+            with timed('serializer'):
+                return {
+                    'destination_rates': destination_serializer.data,
+                    'package_rates': package_serializer.data
+                }
+
+        return precompressed_response(request, rates_payload_key('community', shape), build)
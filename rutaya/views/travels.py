@@ -0,0 +1,240 @@
+# rutaya/views/travels.py
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied
+import logging
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rutaya.serializers import TravelAvailabilitySerializer, TravelMatchQuerySerializer
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
+from rutaya.models import Favorite, TravelAvailability, User
+from django.http import Http404
+from rutaya.utils.metrics import timed
+from rutaya.utils.date_ranges import expand_ranges, serialize_ranges
+from rutaya.utils.matching import get_match_index
+from rutaya.views.catalog import get_favorite_destination_ids
+from rutaya.views.common import wants_compact
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])  # Permitir acceso sin autenticación
+def save_travel_availability(request):
+    """
+    Vista para guardar múltiples fechas de disponibilidad de viaje usando userId.
+    Acepta la lista completa en `dates` o `ranges`, o cambios incrementales en
+    `add`/`remove`.
+    """
+    try:
+
+        # Usar el serializer para validar y procesar los datos
+        serializer = TravelAvailabilitySerializer(data=request.data)
+
+        if serializer.is_valid():
+
+            # El serializer ya maneja toda la lógica
+            validated_data = serializer.save()
+
+            response_data = {
+                "message": f"Fechas guardadas exitosamente para el usuario {validated_data['userId']}",
+                "userId": validated_data['userId'],
+                **build_travel_payload(validated_data['ranges'], compact=wants_compact(request)),
+                "added": serialize_ranges(validated_data['added']),
+                "removed": serialize_ranges(validated_data['removed'])
+            }
+
+            return Response(response_data, status=status.HTTP_201_CREATED)
+
+        else:
+            return Response(
+                {"error": "Datos inválidos", "details": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    except Exception as e:
+        logger.exception("Error inesperado: %s", e)
+        return Response(
+            {"error": "Error interno del servidor", "message": str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@swagger_auto_schema(
+    operation_description="Obtener fechas de disponibilidad de viaje de un usuario",
+    manual_parameters=[
+        openapi.Parameter(
+            'user_id',
+            openapi.IN_PATH,
+            description="ID del usuario",
+            type=openapi.TYPE_INTEGER,
+            required=True
+        ),
+        openapi.Parameter(
+            'compact',
+            openapi.IN_QUERY,
+            description="Con compact=1 se devuelven solo los rangos, sin expandir cada fecha",
+            type=openapi.TYPE_BOOLEAN,
+            required=False
+        )
+    ],
+    responses={
+        200: openapi.Response(
+            description="Fechas obtenidas exitosamente",
+            examples={
+                "application/json": {
+                    "userId": 5,
+                    "ranges": [
+                        {"start": "2024-07-01", "end": "2024-07-03"}
+                    ],
+                    "dates": [
+                        "2024-07-01",
+                        "2024-07-02",
+                        "2024-07-03"
+                    ]
+                }
+            }
+        ),
+        404: "Usuario no encontrado",
+        500: "Error interno del servidor"
+    }
+)
+def get_travel_availability(request, user_id):
+    """
+    Vista para obtener fechas de disponibilidad de viaje de un usuario.
+    """
+    try:
+        user = get_object_or_404(User, id=user_id)
+
+        return Response({
+            "userId": user.id,
+            **get_travel_data(user.id, compact=wants_compact(request))
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({
+            "error": "Error interno del servidor",
+            "message": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def get_travel_ranges(user_id):
+    """Rangos disponibles del usuario como tuplas (inicio, fin), ordenados."""
+    return list(
+        TravelAvailability.objects.filter(user_id=user_id)
+        .order_by('start_date').values_list('start_date', 'end_date')
+    )
+
+
+def build_travel_payload(ranges, compact=False):
+    """
+    `ranges` siempre; `dates` (cada día expandido) solo si no se pidió el
+    formato compacto, por compatibilidad con los clientes existentes.
+    """
+    payload = {'ranges': serialize_ranges(ranges)}
+    if not compact:
+        payload['dates'] = [date.isoformat() for date in expand_ranges(ranges)]
+    return payload
+
+
+def get_travel_data(user_id, compact=False):
+    return build_travel_payload(get_travel_ranges(user_id), compact)
+
+
+@api_view(['GET'])
+# Expone nombres y favoritos de otros usuarios: solo para el propio usuario (JWT)
+@permission_classes([IsAuthenticated])
+@swagger_auto_schema(
+    operation_description=(
+        "Buscar viajeros cuyas fechas disponibles se solapan con las del usuario y que "
+        "comparten destinos favoritos. Requiere el JWT del mismo usuario."
+    ),
+    manual_parameters=[
+        openapi.Parameter('user_id', openapi.IN_PATH, description="ID del usuario",
+                          type=openapi.TYPE_INTEGER, required=True),
+        openapi.Parameter('min_days', openapi.IN_QUERY, description="Mínimo de días en común (por defecto 1)",
+                          type=openapi.TYPE_INTEGER, required=False),
+        openapi.Parameter('min_shared', openapi.IN_QUERY,
+                          description="Mínimo de destinos favoritos en común (por defecto 1)",
+                          type=openapi.TYPE_INTEGER, required=False),
+        openapi.Parameter('limit', openapi.IN_QUERY, description="Máximo de resultados (por defecto 20)",
+                          type=openapi.TYPE_INTEGER, required=False),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Coincidencias obtenidas exitosamente",
+            examples={
+                "application/json": {
+                    "userId": 5,
+                    "count": 1,
+                    "matches": [
+                        {"userId": 8, "first_name": "Ana", "overlap_days": 6, "shared_favorites": 2,
+                         "shared_destination_ids": [3, 11]}
+                    ]
+                }
+            }
+        ),
+        400: "Parámetros inválidos",
+        401: "No autenticado",
+        403: "El user_id no corresponde al usuario autenticado",
+        404: "Usuario no encontrado",
+        500: "Error interno del servidor"
+    }
+)
+def get_travel_matches(request, user_id):
+    """
+    Vista para encontrar compañeros de viaje. Los datos propios se leen de la
+    base; los del resto salen del índice en memoria (rutaya.utils.matching).
+    """
+    if request.user.id != user_id:
+        raise PermissionDenied("user_id no corresponde al usuario autenticado.")
+
+    params = TravelMatchQuerySerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        user = get_object_or_404(User, id=user_id)
+        favorite_ids = get_favorite_destination_ids(user.id)
+
+        with timed('matching'):
+            matches = get_match_index().find(
+                user.id, get_travel_ranges(user.id), favorite_ids, **params.validated_data
+            )
+
+        if matches:
+            match_ids = [match['userId'] for match in matches]
+            # El índice puede ser anterior a una desactivación: solo usuarios activos
+            names = dict(User.objects.filter(id__in=match_ids, is_active=True).values_list('id', 'first_name'))
+            matches = [match for match in matches if match['userId'] in names]
+            shared = {}
+            for match_user_id, destination_id in Favorite.objects.filter(
+                user_id__in=match_ids, destination_id__in=favorite_ids
+            ).values_list('user_id', 'destination_id'):
+                shared.setdefault(match_user_id, []).append(destination_id)
+
+            for match in matches:
+                match['first_name'] = names[match['userId']]
+                match['shared_destination_ids'] = sorted(shared.get(match['userId'], []))
+
+        return Response({
+            'userId': user.id,
+            'count': len(matches),
+            'matches': matches
+        }, status=status.HTTP_200_OK)
+
+    except Http404:
+        return Response({
+            'error': 'Usuario no encontrado'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.exception("Error al buscar coincidencias de viaje: %s", e)
+        return Response({
+            "error": "Error interno del servidor",
+            "message": str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)